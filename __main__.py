@@ -8,53 +8,70 @@ from statics import (
     DE_CROSSREFERENCE_EDGELIST_PATH,
     DE_CROSSREFERENCE_GRAPH_PATH,
     DE_HIERARCHY_GRAPH_PATH,
+    DE_PARSE_CACHE_PATH,
     DE_REFERENCE_PARSED_PATH,
     DE_REG_AUTHORITY_EDGELIST_PATH,
     DE_REG_CROSSREFERENCE_EDGELIST_PATH,
     DE_REG_CROSSREFERENCE_GRAPH_PATH,
     DE_REG_HIERARCHY_GRAPH_PATH,
+    DE_REG_PARSE_CACHE_PATH,
     DE_REG_REFERENCE_PARSED_PATH,
     DE_REG_SNAPSHOT_MAPPING_EDGELIST_PATH,
     DE_REG_SNAPSHOT_MAPPING_INDEX_PATH,
+    DE_REG_TEMPORAL_GRAPH_PATH,
     DE_SNAPSHOT_MAPPING_EDGELIST_PATH,
     DE_SNAPSHOT_MAPPING_INDEX_PATH,
+    DE_TEMPORAL_GRAPH_PATH,
     US_CROSSREFERENCE_EDGELIST_PATH,
     US_CROSSREFERENCE_GRAPH_PATH,
     US_HIERARCHY_GRAPH_PATH,
+    US_PARSE_CACHE_PATH,
     US_REFERENCE_PARSED_PATH,
     US_REG_AUTHORITY_EDGELIST_PATH,
     US_REG_CROSSREFERENCE_EDGELIST_PATH,
     US_REG_CROSSREFERENCE_GRAPH_PATH,
     US_REG_HIERARCHY_GRAPH_PATH,
+    US_REG_PARSE_CACHE_PATH,
     US_REG_REFERENCE_PARSED_PATH,
     US_REG_SNAPSHOT_MAPPING_EDGELIST_PATH,
     US_REG_SNAPSHOT_MAPPING_INDEX_PATH,
+    US_REG_TEMPORAL_GRAPH_PATH,
     US_SNAPSHOT_MAPPING_EDGELIST_PATH,
     US_SNAPSHOT_MAPPING_INDEX_PATH,
+    US_TEMPORAL_GRAPH_PATH,
 )
 from statutes_pipeline_steps.crossreference_graph import CrossreferenceGraphStep
 from statutes_pipeline_steps.de_authority_edgelist import DeAuthorityEdgelist
 from statutes_pipeline_steps.de_crossreference_edgelist import DeCrossreferenceEdgelist
 from statutes_pipeline_steps.de_crossreference_lookup import DeCrossreferenceLookup
+from statutes_pipeline_steps.de_crossreference_lookup_edgelist import (
+    DeCrossreferenceLookupEdgelist,
+)
 from statutes_pipeline_steps.de_law_names import DeLawNamesStep
 from statutes_pipeline_steps.de_prepare_input import de_prepare_input
 from statutes_pipeline_steps.de_reference_areas import DeReferenceAreasStep
 from statutes_pipeline_steps.de_reference_parse import DeReferenceParseStep
 from statutes_pipeline_steps.de_to_xml import DeToXmlStep, get_type_for_doknr_dict
+from statutes_pipeline_steps.graph_summary import GraphSummaryStep
 from statutes_pipeline_steps.hierarchy_graph import HierarchyGraphStep
 from statutes_pipeline_steps.snapshot_mapping_edgelist import (
     SnapshotMappingEdgelistStep,
 )
 from statutes_pipeline_steps.snapshot_mapping_index import SnapshotMappingIndexStep
+from statutes_pipeline_steps.temporal_graph import TemporalGraphStep
 from statutes_pipeline_steps.us_authority_edgelist import UsAuthorityEdgelist
 from statutes_pipeline_steps.us_crossreference_edgelist import UsCrossreferenceEdgelist
 from statutes_pipeline_steps.us_crossreference_lookup import UsCrossreferenceLookup
+from statutes_pipeline_steps.us_crossreference_lookup_edgelist import (
+    UsCrossreferenceLookupEdgelist,
+)
 from statutes_pipeline_steps.us_prepare_input import us_prepare_input
 from statutes_pipeline_steps.us_reference_areas import UsReferenceAreasStep
 from statutes_pipeline_steps.us_reference_parse import UsReferenceParseStep
 from statutes_pipeline_steps.us_reg_prepare_input import us_reg_prepare_input
 from statutes_pipeline_steps.us_reg_to_xml import UsRegsToXmlStep
 from statutes_pipeline_steps.us_to_xml import UsToXmlStep
+from utils.columnar_export import import_pyarrow
 from utils.common import load_law_names, load_law_names_compiled, str_to_bool
 
 
@@ -83,6 +100,14 @@ ALL_STEPS = [
     "snapshot_mapping_edgelist",
 ]
 
+# Steps that are not part of "all"
+OPTIONAL_STEPS = [
+    # summarizes the crossreference graphs, e.g. node counts and degrees
+    "graph_summary",
+    # stores the graphs of all snapshots as deltas with persistent node ids
+    "temporal_graph",
+]
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("dataset", help="select a dataset: DE or US")
@@ -156,6 +181,57 @@ if __name__ == "__main__":
         help="Resolve cross references on the lowest possible level. "
         "Default is to resolve on seqitem level (e.g. sections).",
     )
+
+    parser.add_argument(
+        "--parse-cache",
+        dest="parse_cache",
+        action="store_const",
+        const=True,
+        default=False,
+        help="Only for reference_parse. Store parsed citations on disk to reuse them "
+        "in subsequent runs.",
+    )
+
+    parser.add_argument(
+        "--hierarchy-format",
+        dest="hierarchy_format",
+        choices=["gpickle", "arrays"],
+        default="gpickle",
+        help="Only for hierarchy_graph. File format of the hierarchy graphs. arrays is "
+        "a compact columnar format. crossreference_graph reads both formats.",
+    )
+
+    parser.add_argument(
+        "--snapshot-mapping-lsh",
+        dest="snapshot_mapping_lsh",
+        action="store_const",
+        const=True,
+        default=False,
+        help="Only for snapshot_mapping_edgelist. Additionally map remaining texts to "
+        "similar texts anywhere in the other snapshot using MinHash signatures and "
+        "locality-sensitive hashing.",
+    )
+
+    parser.add_argument(
+        "--compose-intervals",
+        dest="compose_intervals",
+        action="store_const",
+        const=True,
+        default=False,
+        help="Only for snapshot_mapping_edgelist with an interval larger than 1. "
+        "Compose the mappings of the interval-1 pairs in between and only match the "
+        "nodes left unmapped directly. Missing interval-1 mappings are computed first.",
+    )
+
+    parser.add_argument(
+        "--columnar-export",
+        dest="columnar_export",
+        choices=["parquet", "arrow"],
+        default=None,
+        help="Additionally export the tables of crossreference_lookup, "
+        "crossreference_edgelist, authority_edgelist, crossreference_graph and "
+        "snapshot_mapping_edgelist as Parquet or Arrow IPC files. Requires pyarrow.",
+    )
     args = parser.parse_args()
 
     steps = [step.lower() for step in args.steps]
@@ -168,10 +244,18 @@ if __name__ == "__main__":
     selected_items = args.filter or []
     regulations = args.regulations
     detailed_crossreferences = args.detailed_crossreferences
+    parse_cache = args.parse_cache
+    hierarchy_format = args.hierarchy_format
+    columnar_export = args.columnar_export
+    snapshot_mapping_lsh = args.snapshot_mapping_lsh
+    compose_intervals = args.compose_intervals
 
     if dataset not in ["de", "us"]:
         raise Exception(f"{dataset} unsupported dataset. Options: us, de")
 
+    if columnar_export:
+        import_pyarrow()  # Fail before running any steps if pyarrow is missing
+
     if "all" in snapshots or "all-new-years" in snapshots:
         years = ALL_YEARS_REG if regulations else ALL_YEARS
         if dataset == "us":
@@ -185,7 +269,7 @@ if __name__ == "__main__":
     if "all" in steps:
         steps = ALL_STEPS
     else:
-        unknown_steps = [s for s in steps if s not in ALL_STEPS]
+        unknown_steps = [s for s in steps if s not in ALL_STEPS + OPTIONAL_STEPS]
         assert not unknown_steps, unknown_steps
 
     if (
@@ -261,13 +345,30 @@ if __name__ == "__main__":
 
     if "reference_parse" in steps:
         if dataset == "us":
-            step = UsReferenceParseStep(regulations=regulations, processes=processes)
+            parse_cache_path = (
+                (US_REG_PARSE_CACHE_PATH if regulations else US_PARSE_CACHE_PATH)
+                if parse_cache
+                else None
+            )
+            step = UsReferenceParseStep(
+                parse_cache_path=parse_cache_path,
+                regulations=regulations,
+                processes=processes,
+            )
             items = step.get_items(overwrite)
             step.execute_filtered_items(items)
         if dataset == "de":
+            parse_cache_path = (
+                (DE_REG_PARSE_CACHE_PATH if regulations else DE_PARSE_CACHE_PATH)
+                if parse_cache
+                else None
+            )
             law_names = load_law_names_compiled(regulations)
             step = DeReferenceParseStep(
-                law_names=law_names, regulations=regulations, processes=processes
+                law_names=law_names,
+                parse_cache_path=parse_cache_path,
+                regulations=regulations,
+                processes=processes,
             )
             items = step.get_items(overwrite)
             step.execute_filtered_items(items)
@@ -309,16 +410,44 @@ if __name__ == "__main__":
                 source=source,
                 destination=destination,
                 add_subseqitems=subseqitems_conf,
+                graph_format=hierarchy_format,
                 processes=processes,
             )
             items = step.get_items(overwrite)
             step.execute_filtered_items(items)
         print("Make hierarchy graphs: done")
 
-    if "crossreference_lookup" in steps:
+    if "crossreference_lookup" in steps and "crossreference_edgelist" in steps:
+        # Both steps are combined to parse each file only once
+        if dataset == "us":
+            step = UsCrossreferenceLookupEdgelist(
+                detailed_crossreferences=detailed_crossreferences,
+                columnar_format=columnar_export,
+                regulations=regulations,
+                processes=processes,
+            )
+            items = step.get_items(overwrite, snapshots)
+            step.execute_items(items)
+
+        elif dataset == "de":
+            assert not detailed_crossreferences
+            law_names_data = load_law_names(regulations)
+            step = DeCrossreferenceLookupEdgelist(
+                regulations=regulations,
+                law_names_data=law_names_data,
+                columnar_format=columnar_export,
+                processes=processes,
+            )
+            items = step.get_items(overwrite, snapshots)
+            step.execute_items(items)
+
+        print("Create crossreference lookup and edgelist: done")
+
+    elif "crossreference_lookup" in steps:
         if dataset == "us":
             step = UsCrossreferenceLookup(
                 detailed_crossreferences=detailed_crossreferences,
+                columnar_format=columnar_export,
                 regulations=regulations,
                 processes=processes,
             )
@@ -327,16 +456,21 @@ if __name__ == "__main__":
 
         elif dataset == "de":
             assert not detailed_crossreferences
-            step = DeCrossreferenceLookup(regulations=regulations, processes=processes)
+            step = DeCrossreferenceLookup(
+                columnar_format=columnar_export,
+                regulations=regulations,
+                processes=processes,
+            )
             items = step.get_items(snapshots)
             step.execute_items(items)
 
         print("Create crossreference lookup: done")
 
-    if "crossreference_edgelist" in steps:
+    elif "crossreference_edgelist" in steps:
         if dataset == "us":
             step = UsCrossreferenceEdgelist(
                 detailed_crossreferences=detailed_crossreferences,
+                columnar_format=columnar_export,
                 regulations=regulations,
                 processes=processes,
             )
@@ -349,6 +483,7 @@ if __name__ == "__main__":
             step = DeCrossreferenceEdgelist(
                 regulations=regulations,
                 law_names_data=law_names_data,
+                columnar_format=columnar_export,
                 processes=processes,
             )
             items = step.get_items(overwrite, snapshots)
@@ -360,7 +495,9 @@ if __name__ == "__main__":
         if dataset == "de" and regulations:
             law_names_data = load_law_names(regulations)
             step = DeAuthorityEdgelist(
-                law_names_data=law_names_data, processes=processes
+                law_names_data=law_names_data,
+                columnar_format=columnar_export,
+                processes=processes,
             )
             items = step.get_items(overwrite, snapshots)
             step.execute_items(items)
@@ -368,6 +505,7 @@ if __name__ == "__main__":
             assert not detailed_crossreferences
             step = UsAuthorityEdgelist(
                 detailed_crossreferences=detailed_crossreferences,
+                columnar_format=columnar_export,
                 processes=processes,
                 regulations=regulations,
             )
@@ -416,6 +554,7 @@ if __name__ == "__main__":
             edgelist_folder=edgelist_folder,
             dataset=dataset,
             authority_edgelist_folder=authority_edgelist_folder,
+            columnar_format=columnar_export,
             processes=processes,
         )
         items = step.get_items(overwrite, snapshots)
@@ -423,6 +562,32 @@ if __name__ == "__main__":
 
         print("Make crossreference graph: done")
 
+    if "graph_summary" in steps:
+        if dataset == "us":
+            source = (
+                US_REG_CROSSREFERENCE_GRAPH_PATH
+                if regulations
+                else US_CROSSREFERENCE_GRAPH_PATH
+            ) + ("/detailed" if detailed_crossreferences else "")
+        elif dataset == "de":
+            assert not detailed_crossreferences
+            source = (
+                DE_REG_CROSSREFERENCE_GRAPH_PATH
+                if regulations
+                else DE_CROSSREFERENCE_GRAPH_PATH
+            )
+
+        step = GraphSummaryStep(
+            source,
+            os.path.join(source, "summary"),
+            columnar_format=columnar_export,
+            processes=processes,
+        )
+        items = step.get_items(overwrite, snapshots)
+        step.execute_items(items)
+
+        print("Summarize crossreference graphs: done")
+
     if "snapshot_mapping_index" in steps:
         assert not detailed_crossreferences
         if dataset == "us":
@@ -498,9 +663,72 @@ if __name__ == "__main__":
             destination,
             interval,
             dataset,
+            columnar_format=columnar_export,
+            lsh=snapshot_mapping_lsh,
+            compose_intervals=compose_intervals,
             processes=processes,
         )
         items = step.get_items(overwrite, snapshots)
+        if step.compose_intervals:
+            adjacent_step = SnapshotMappingEdgelistStep(
+                source,
+                destination,
+                1,
+                dataset,
+                columnar_format=columnar_export,
+                lsh=snapshot_mapping_lsh,
+                processes=processes,
+            )
+            required_items = set(step.get_adjacent_items(items))
+            adjacent_step.execute_items(
+                [
+                    adjacent_item
+                    for adjacent_item in adjacent_step.get_items(overwrite, None)
+                    if adjacent_item in required_items
+                ]
+            )
         step.execute_items(items)
 
         print("Make snapshot mapping: done")
+
+    if "temporal_graph" in steps:
+        assert not detailed_crossreferences
+        if dataset == "us":
+            graph_folder = (
+                US_REG_CROSSREFERENCE_GRAPH_PATH
+                if regulations
+                else US_CROSSREFERENCE_GRAPH_PATH
+            )
+            mapping_folder = (
+                US_REG_SNAPSHOT_MAPPING_EDGELIST_PATH
+                if regulations
+                else US_SNAPSHOT_MAPPING_EDGELIST_PATH
+            )
+            destination = (
+                US_REG_TEMPORAL_GRAPH_PATH if regulations else US_TEMPORAL_GRAPH_PATH
+            )
+        elif dataset == "de":
+            graph_folder = (
+                DE_REG_CROSSREFERENCE_GRAPH_PATH
+                if regulations
+                else DE_CROSSREFERENCE_GRAPH_PATH
+            )
+            mapping_folder = (
+                DE_REG_SNAPSHOT_MAPPING_EDGELIST_PATH
+                if regulations
+                else DE_SNAPSHOT_MAPPING_EDGELIST_PATH
+            )
+            destination = (
+                DE_REG_TEMPORAL_GRAPH_PATH if regulations else DE_TEMPORAL_GRAPH_PATH
+            )
+
+        step = TemporalGraphStep(
+            graph_folder,
+            os.path.join(mapping_folder, "subseqitems"),
+            destination,
+            processes=processes,
+        )
+        items = step.get_items(overwrite, snapshots)
+        step.execute_items(items)
+
+        print("Make temporal graph: done")
@@ -6,7 +6,6 @@ import traceback
 from bs4 import BeautifulSoup
 from quantlaw.de_extract.statutes_areas import StatutesExtractor
 from quantlaw.de_extract.statutes_parse import StatutesParser
-from quantlaw.utils.beautiful_soup import save_soup
 from quantlaw.utils.files import ensure_exists, list_dir
 
 from statics import (
@@ -20,7 +19,7 @@ from statutes_pipeline_steps.de_reference_parse import (
     identify_reference_law_name_in_soup,
     parse_reference_content_in_soup,
 )
-from utils.common import get_stemmed_law_names, load_law_names_compiled
+from utils.common import get_stemmed_law_names, load_law_names_compiled, save_soup
 
 
 def get_lawnames_date(requested_date):
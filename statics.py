@@ -16,10 +16,12 @@ US_CROSSREFERENCE_EDGELIST_PATH = f"{US_TEMP_DATA_PATH}/32_crossreference_edgeli
 US_CROSSREFERENCE_GRAPH_PATH = f"{US_DATA_PATH}/4_crossreference_graph"
 US_SNAPSHOT_MAPPING_INDEX_PATH = f"{US_TEMP_DATA_PATH}/41_snapshot_mapping_index"
 US_SNAPSHOT_MAPPING_EDGELIST_PATH = f"{US_DATA_PATH}/5_snapshot_mapping_edgelist"
+US_TEMPORAL_GRAPH_PATH = f"{US_DATA_PATH}/6_temporal_graph"
 
 US_HELPERS_PATH = f"{US_TEMP_DATA_PATH}/helpers"
 US_REFERENCE_AREAS_LOG_PATH = f"{US_HELPERS_PATH}/us_extract_reference_areas.log"
 US_REFERENCE_PARSED_LOG_PATH = f"{US_HELPERS_PATH}/us_extract_reference_parsed.log"
+US_PARSE_CACHE_PATH = f"{US_HELPERS_PATH}/us_parse_cache.sqlite"
 
 US_REG_DATA_PATH = f"{DATA_PATH}/us_reg"
 US_REG_TEMP_DATA_PATH = "temp/us_reg"
@@ -43,6 +45,7 @@ US_REG_SNAPSHOT_MAPPING_INDEX_PATH = (
 US_REG_SNAPSHOT_MAPPING_EDGELIST_PATH = (
     f"{US_REG_DATA_PATH}/5_snapshot_mapping_edgelist"
 )
+US_REG_TEMPORAL_GRAPH_PATH = f"{US_REG_DATA_PATH}/6_temporal_graph"
 
 US_REG_HELPERS_PATH = f"{US_REG_TEMP_DATA_PATH}/helpers"
 US_REG_REFERENCE_AREAS_LOG_PATH = (
@@ -51,6 +54,7 @@ US_REG_REFERENCE_AREAS_LOG_PATH = (
 US_REG_REFERENCE_PARSED_LOG_PATH = (
     f"{US_REG_HELPERS_PATH}/us_extract_reference_parsed.log"
 )
+US_REG_PARSE_CACHE_PATH = f"{US_REG_HELPERS_PATH}/us_parse_cache.sqlite"
 
 
 DE_DATA_PATH = f"{DATA_PATH}/de"
@@ -63,7 +67,7 @@ JURIS_EXPORT_RVO_LIST_PATH = f"{DE_DATA_PATH}/1_juris_gii_xml_rvo.txt"
 DE_ORIGINAL_PATH = f"{DE_TEMP_DATA_PATH}/11_gii_xml"
 DE_XML_PATH = f"{DE_TEMP_DATA_PATH}/12_xml"
 DE_LAW_NAMES_PATH = f"{DE_TEMP_DATA_PATH}/12_xml_law_names.csv"
-DE_LAW_NAMES_COMPILED_PATH = f"{DE_TEMP_DATA_PATH}/12_xml_law_names_compiled.pickle"
+DE_LAW_NAMES_COMPILED_PATH = f"{DE_TEMP_DATA_PATH}/12_xml_law_names_compiled"
 DE_REFERENCE_AREAS_PATH = f"{DE_TEMP_DATA_PATH}/13_reference_areas"
 DE_REFERENCE_PARSED_PATH = f"{DE_DATA_PATH}/2_xml"
 DE_HIERARCHY_GRAPH_PATH = f"{DE_DATA_PATH}/3_hierarchy_graph"
@@ -72,10 +76,12 @@ DE_CROSSREFERENCE_EDGELIST_PATH = f"{DE_TEMP_DATA_PATH}/32_crossreference_edgeli
 DE_CROSSREFERENCE_GRAPH_PATH = f"{DE_DATA_PATH}/4_crossreference_graph"
 DE_SNAPSHOT_MAPPING_INDEX_PATH = f"{DE_TEMP_DATA_PATH}/41_snapshot_mapping_index"
 DE_SNAPSHOT_MAPPING_EDGELIST_PATH = f"{DE_DATA_PATH}/5_snapshot_mapping_edgelist"
+DE_TEMPORAL_GRAPH_PATH = f"{DE_DATA_PATH}/6_temporal_graph"
 
 DE_HELPERS_PATH = f"{DE_TEMP_DATA_PATH}/helpers"
 DE_REFERENCE_AREAS_LOG_PATH = f"{DE_HELPERS_PATH}/de_extract_reference_areas.log"
 DE_REFERENCE_PARSED_LOG_PATH = f"{DE_HELPERS_PATH}/de_extract_reference_parsed.log"
+DE_PARSE_CACHE_PATH = f"{DE_HELPERS_PATH}/de_parse_cache.sqlite"
 
 DE_DECISIONS_DATA_PATH = f"{DATA_PATH}/de_decisions"
 DE_DECISIONS_TEMP_DATA_PATH = "temp/de_decisions"
@@ -99,9 +105,7 @@ DE_REG_TEMP_DATA_PATH = "temp/de_reg"
 
 DE_REG_ORIGINAL_PATH = f"{DE_REG_TEMP_DATA_PATH}/11_gii_xml"
 DE_REG_XML_PATH = f"{DE_REG_TEMP_DATA_PATH}/12_xml"
-DE_REG_LAW_NAMES_COMPILED_PATH = (
-    f"{DE_REG_TEMP_DATA_PATH}/12_xml_law_names_compiled.pickle"
-)
+DE_REG_LAW_NAMES_COMPILED_PATH = f"{DE_REG_TEMP_DATA_PATH}/12_xml_law_names_compiled"
 DE_REG_LAW_NAMES_PATH = f"{DE_REG_TEMP_DATA_PATH}/12_xml_law_names.csv"
 DE_REG_REFERENCE_AREAS_PATH = f"{DE_REG_TEMP_DATA_PATH}/13_reference_areas"
 DE_REG_REFERENCE_PARSED_PATH = f"{DE_REG_DATA_PATH}/2_xml"
@@ -118,6 +122,7 @@ DE_REG_SNAPSHOT_MAPPING_INDEX_PATH = (
 DE_REG_SNAPSHOT_MAPPING_EDGELIST_PATH = (
     f"{DE_REG_DATA_PATH}/5_snapshot_mapping_edgelist"
 )
+DE_REG_TEMPORAL_GRAPH_PATH = f"{DE_REG_DATA_PATH}/6_temporal_graph"
 
 DE_REG_HELPERS_PATH = f"{DE_REG_TEMP_DATA_PATH}/helpers"
 DE_REG_REFERENCE_AREAS_LOG_PATH = (
@@ -126,3 +131,4 @@ DE_REG_REFERENCE_AREAS_LOG_PATH = (
 DE_REG_REFERENCE_PARSED_LOG_PATH = (
     f"{DE_REG_HELPERS_PATH}/de_extract_reference_parsed.log"
 )
+DE_REG_PARSE_CACHE_PATH = f"{DE_REG_HELPERS_PATH}/de_parse_cache.sqlite"
@@ -1,15 +1,26 @@
 import multiprocessing
 import os
+from math import isnan
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 from quantlaw.utils.files import ensure_exists, list_dir
-from quantlaw.utils.networkx import load_graph_from_csv_files
 
+from statutes_pipeline_steps.hierarchy_graph import (
+    HIERARCHY_GRAPH_FORMATS,
+    find_hierarchy_graph_file,
+    list_snapshot_hierarchy_graph_files,
+)
+from utils.column_buffers import MISSING, ColumnBuffers
+from utils.columnar_export import export_columnar
 from utils.common import RegulationsPipelineStep, get_snapshot_law_list, load_law_names
+from utils.hierarchy_arrays import HierarchyArrays
 
 
 class CrossreferenceGraphStep(RegulationsPipelineStep):
+    # The peak memory of an item is dominated by the networkx graph of a snapshot and
+    # its pickling rather than by the node and edge tables
     max_number_of_processes = min(2, max(multiprocessing.cpu_count() - 2, 1))
 
     def __init__(
@@ -20,6 +31,7 @@ class CrossreferenceGraphStep(RegulationsPipelineStep):
         edgelist_folder,
         dataset,
         authority_edgelist_folder,
+        columnar_format=None,
         *args,
         **kwargs,
     ):
@@ -29,6 +41,7 @@ class CrossreferenceGraphStep(RegulationsPipelineStep):
         self.edgelist_folder = edgelist_folder
         self.dataset = dataset
         self.authority_edgelist_folder = authority_edgelist_folder
+        self.columnar_format = columnar_format
         super().__init__(*args, **kwargs)
 
     def get_items(self, overwrite, snapshots) -> list:
@@ -59,19 +72,13 @@ class CrossreferenceGraphStep(RegulationsPipelineStep):
         if self.dataset == "us":
             files = []
             for snapshot in snapshots:
-                statute_files = [
-                    f"{self.source}/subseqitems/{x}"
-                    for x in os.listdir(os.path.join(self.source, "subseqitems"))
-                    if str(snapshot) in x
-                ]
+                statute_files = list_snapshot_hierarchy_graph_files(
+                    f"{self.source}/subseqitems", snapshot
+                )
                 regulation_files = (
-                    [
-                        f"{self.source_regulation}/subseqitems/{x}"
-                        for x in os.listdir(
-                            os.path.join(self.source_regulation, "subseqitems")
-                        )
-                        if str(snapshot) in x
-                    ]
+                    list_snapshot_hierarchy_graph_files(
+                        f"{self.source_regulation}/subseqitems", snapshot
+                    )
                     if self.regulations
                     else None
                 )
@@ -91,7 +98,7 @@ class CrossreferenceGraphStep(RegulationsPipelineStep):
                     (
                         snapshot,
                         [
-                            f'{self.source}/subseqitems/{x.replace(".xml", ".gpickle")}'
+                            find_hierarchy_graph_file(f"{self.source}/subseqitems", x)
                             for x in graph_files
                         ],
                         None,
@@ -106,124 +113,182 @@ class CrossreferenceGraphStep(RegulationsPipelineStep):
         if self.regulations and files_regulations:
             files += files_regulations
 
-        node_columns = [
-            "key",
-            "level",
-            "citekey",
-            "parent_key",
-            "type",
-            "document_type",
-            "heading",
-            "law_name",
-            "chars_n",
-            "chars_nowhites",
-            "tokens_n",
-            "tokens_unique",
-            "abbr_1",
-            "abbr_2",
-            "subject_areas",
-            "legislators",
-            "contributors",
-            "texts_tokens_n",
-            "texts_chars_n",
-        ]
-        edge_columns = ["u", "v", "edge_type"]
-
-        nodes_csv_path = f"{self.destination}/{year}.nodes.csv.gz"
-        edges_csv_path = f"{self.destination}/{year}.edges.csv.gz"
-
-        pd.DataFrame(
-            [dict(level=-1, key="root", law_name="root")], columns=node_columns
-        ).to_csv(
-            nodes_csv_path,
-            header=True,
-            index=False,
-            columns=node_columns,
-        )
+        # Columns of all nodes and edges are collected in typed buffers. The graph is
+        # built once from these buffers and the csv files are written as side output.
+        nodes = ColumnBuffers(NODE_COLUMNS, NUMERIC_NODE_COLUMNS)
+        edges = ColumnBuffers(EDGE_COLUMNS, interned=nodes)
 
-        pd.DataFrame([], columns=edge_columns).to_csv(
-            edges_csv_path,
-            header=True,
-            index=False,
-            columns=edge_columns,
-        )
+        nodes.add_rows(dict(key=["root"], level=[-1], law_name=["root"]))
 
         for file in files:
-            nG = nx.read_gpickle(file)
-            nx.set_node_attributes(nG, nG.graph.get("name", file), name="law_name")
-
-            nodes_df = pd.DataFrame(
-                [d for n, d in nG.nodes(data=True)], columns=node_columns
-            )
+            if file.endswith(HIERARCHY_GRAPH_FORMATS["arrays"]):
+                arrays = HierarchyArrays.load(file)
+                columns = arrays.get_columns()
+                columns["law_name"] = [arrays.get_graph_name(file)] * len(arrays)
+                hierarchy_edges = arrays.get_edges()
+            else:
+                nG = nx.read_gpickle(file)
+                law_name = nG.graph.get("name", file)
+                columns = {
+                    column: [d.get(column) for n, d in nG.nodes(data=True)]
+                    for column in NODE_COLUMNS
+                }
+                columns["law_name"] = [law_name] * len(nG)
+                hierarchy_edges = nG.edges()
 
             if self.dataset.lower() == "us":
-                nodes_df["document_type"] = [
+                columns["document_type"] = [
                     "regulation" if key.startswith("cfr") else "statute"
-                    for key in nodes_df.key
+                    for key in columns["key"]
                 ]
 
-            nodes_df.to_csv(
-                nodes_csv_path,
-                header=False,
-                index=False,
-                columns=node_columns,
-                mode="a",
-            )
-
-            edges_df = pd.DataFrame(
-                [dict(u=u, v=v, edge_type="containment") for u, v in nG.edges()],
-                columns=edge_columns,
-            )
+            nodes.add_rows(columns)
 
-            for idx, row in nodes_df[nodes_df.level == 0].iterrows():
-                edges_df = edges_df.append(
-                    [dict(u="root", v=row.key, edge_type="containment")]
+            containment_edges = list(hierarchy_edges) + [
+                ("root", key)
+                for key, level in zip(columns["key"], columns["level"])
+                if level == 0
+            ]
+            edges.add_rows(
+                dict(
+                    u=[u for u, v in containment_edges],
+                    v=[v for u, v in containment_edges],
+                    edge_type=["containment"] * len(containment_edges),
                 )
-
-            edges_df.to_csv(
-                edges_csv_path,
-                header=False,
-                index=False,
-                columns=edge_columns,
-                mode="a",
             )
 
         # Get reference edges
         edge_list = pd.read_csv(f"{self.edgelist_folder}/{year}.csv")
-        edges_df = pd.DataFrame(
-            {"u": edge_list.out_node, "v": edge_list.in_node, "edge_type": "reference"},
-            columns=edge_columns,
-        )
-        edges_df.to_csv(
-            edges_csv_path,
-            header=False,
-            index=False,
-            columns=edge_columns,
-            mode="a",
+        edges.add_rows(
+            dict(
+                u=list(edge_list.out_node),
+                v=list(edge_list.in_node),
+                edge_type=["reference"] * len(edge_list),
+            )
         )
 
         # add authority edges
         if self.regulations:
             edge_list = pd.read_csv(f"{self.authority_edgelist_folder}/{year}.csv")
-            edges_df = pd.DataFrame(
-                {
-                    "u": edge_list.out_node,
-                    "v": edge_list.in_node,
-                    "edge_type": "authority",
-                },
-                columns=edge_columns,
-            )
-            edges_df.to_csv(
-                edges_csv_path,
-                header=False,
-                index=False,
-                columns=edge_columns,
-                mode="a",
+            edges.add_rows(
+                dict(
+                    u=list(edge_list.out_node),
+                    v=list(edge_list.in_node),
+                    edge_type=["authority"] * len(edge_list),
+                )
             )
 
+        for columns, path, dictionary_columns in [
+            (
+                nodes,
+                f"{self.destination}/{year}.nodes.csv.gz",
+                ["key", "type", "document_type", "law_name"],
+            ),
+            (
+                edges,
+                f"{self.destination}/{year}.edges.csv.gz",
+                ["u", "v", "edge_type"],
+            ),
+        ]:
+            columns.to_csv(path)
+            export_columnar(columns, path, self.columnar_format, dictionary_columns)
+
         # Create and save seqitem graph
-        G = load_graph_from_csv_files(
-            self.destination, year, filter="exclude_subseqitems"
-        )
+        G = build_seqitem_graph(year, nodes, edges)
+        del nodes, edges
 
         nx.write_gpickle(G, f"{self.destination}/seqitems/{year}.gpickle.gz")
+
+
+###########
+# Functions
+###########
+
+NODE_COLUMNS = [
+    "key",
+    "level",
+    "citekey",
+    "parent_key",
+    "type",
+    "document_type",
+    "heading",
+    "law_name",
+    "chars_n",
+    "chars_nowhites",
+    "tokens_n",
+    "tokens_unique",
+    "abbr_1",
+    "abbr_2",
+    "subject_areas",
+    "legislators",
+    "contributors",
+    "texts_tokens_n",
+    "texts_chars_n",
+]
+NUMERIC_NODE_COLUMNS = {
+    "level",
+    "chars_n",
+    "chars_nowhites",
+    "tokens_n",
+    "tokens_unique",
+}
+EDGE_COLUMNS = ["u", "v", "edge_type"]
+
+
+def is_missing(value):
+    return value is None or value == "" or (isinstance(value, float) and isnan(value))
+
+
+def build_seqitem_graph(name, nodes, edges):
+    """
+    Builds the crossreference graph excluding subseqitems from the buffers of the
+    node and edge columns. Both buffers must share their interned values. The result
+    equals load_graph_from_csv_files applied to the csv files written from the same
+    buffers: Empty values are omitted and numeric columns with missing values contain
+    floats.
+    """
+    G = nx.MultiDiGraph(name=str(name))
+
+    # Nodes without a type are included, also if there are no subseqitems
+    subseqitem_code = nodes.get_code("subseqitem")
+    included = (nodes.get_codes("type") != subseqitem_code) | (
+        subseqitem_code == MISSING
+    )
+    key_codes = nodes.get_codes("key")[included]
+    keys = nodes.decode(key_codes).tolist()
+    G.add_nodes_from(keys)
+
+    # Whether each interned value is missing. The last element is for the code -1.
+    value_is_missing = np.array([is_missing(v) for v in nodes.values] + [True])
+
+    for column in NODE_COLUMNS:
+        if column in NUMERIC_NODE_COLUMNS:
+            missing = nodes.get_missing(column)
+            values = nodes.get_ints(column)[included].tolist()
+            if missing.any():
+                values = [float(v) for v in values]
+            present = ~missing[included]
+        else:
+            codes = nodes.get_codes(column)[included]
+            values = nodes.decode(codes).tolist()
+            present = ~value_is_missing[codes]
+        attrs_dict = {
+            k: v
+            for k, v, is_present in zip(keys, values, present.tolist())
+            if is_present
+        }
+        nx.set_node_attributes(G, attrs_dict, column)
+
+    u_codes = edges.get_codes("u")
+    v_codes = edges.get_codes("v")
+    included_edges = np.isin(u_codes, key_codes) & np.isin(v_codes, key_codes)
+    G.add_edges_from(
+        (u, v, {"edge_type": edge_type})
+        for u, v, edge_type in zip(
+            edges.decode(u_codes[included_edges]).tolist(),
+            edges.decode(v_codes[included_edges]).tolist(),
+            edges.decode(edges.get_codes("edge_type")[included_edges]).tolist(),
+        )
+    )
+
+    return G
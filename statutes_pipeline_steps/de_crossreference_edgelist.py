@@ -1,25 +1,24 @@
 import json
 import os
 
-import numpy
-import pandas as pd
-from quantlaw.utils.beautiful_soup import create_soup
 from quantlaw.utils.files import ensure_exists
 
 from statics import (
     DE_CROSSREFERENCE_EDGELIST_PATH,
     DE_CROSSREFERENCE_LOOKUP_PATH,
-    DE_REFERENCE_PARSED_PATH,
     DE_REG_CROSSREFERENCE_EDGELIST_PATH,
     DE_REG_CROSSREFERENCE_LOOKUP_PATH,
-    DE_REG_REFERENCE_PARSED_PATH,
 )
+from statutes_pipeline_steps.de_crossreference_lookup import parse_file
+from utils.citekey_resolver import CitekeyResolver, print_resolver_stats
 from utils.common import RegulationsPipelineStep, get_snapshot_law_list
+from utils.edgelist_writer import EdgelistWriter
 
 
 class DeCrossreferenceEdgelist(RegulationsPipelineStep):
-    def __init__(self, law_names_data, *args, **kwargs):
+    def __init__(self, law_names_data, columnar_format=None, *args, **kwargs):
         self.law_names_data = law_names_data
+        self.columnar_format = columnar_format
         super().__init__(*args, **kwargs)
 
     def get_items(self, overwrite, snapshots) -> list:
@@ -45,70 +44,66 @@ class DeCrossreferenceEdgelist(RegulationsPipelineStep):
             if self.regulations
             else DE_CROSSREFERENCE_LOOKUP_PATH
         )
-        target_folder = (
-            DE_REG_CROSSREFERENCE_EDGELIST_PATH
-            if self.regulations
-            else DE_CROSSREFERENCE_EDGELIST_PATH
-        )
-        key_df = (
-            pd.read_csv(f"{source_folder}/{item}.csv").dropna().set_index("citekey")
-        )
-        df = None
-        for file in files:
-            edge_df = make_edge_list(file, key_df, self.regulations)
-            df = edge_df if df is None else df.append(edge_df, ignore_index=True)
-        df.to_csv(f"{target_folder}/{item}.csv", index=False)
+        resolver = CitekeyResolver.load(f"{source_folder}/{item}.csv")
+        with get_edgelist_writer(
+            item, self.regulations, self.columnar_format
+        ) as writer:
+            for file in files:
+                references = get_references(parse_file(file, self.regulations))
+                writer.add_edges(resolve_references(references, resolver))
+        return item, resolver.get_stats()
+
+    def finish_execution(self, results):
+        print_resolver_stats(results)
 
 
 def get_filename(date):
     return f"{date}.csv"
 
 
-def make_edge_list(file, key_df, regulations):
-    soup = create_soup(
-        os.path.join(
-            DE_REG_REFERENCE_PARSED_PATH if regulations else DE_REFERENCE_PARSED_PATH,
-            file,
-        )
-    )
+def get_references(soup):
+    """
+    Returns: a list of tuples of the key of the referencing seqitem and the parsed
+        reference for all references to laws
+    """
+    references = []
+    for item in soup.find_all("seqitem"):
+        node_out = item.get("key")
+        for node in item.find_all("reference"):
+            if node.lawname and node.lawname.get("type") in [
+                "dict",
+                "sgb",
+                "internal",
+            ]:
+                for ref in json.loads(node.attrs["parsed"]):
+                    references.append((node_out, ref))
+    return references
+
+
+def resolve_references(references, resolver):
+    """
+    Resolves references by the first two components of the citekey. Unresolved
+    references are omitted.
+
+    Args:
+        references: list of tuples of the referencing node and citekey components
+        resolver: CitekeyResolver of the snapshot
+
+    Returns: a list of (out_node, in_node)
+    """
     edges = []
+    for node_out, ref in references:
+        node_in = resolver.resolve("_".join(ref[:2]))
+        if node_in is not None:
+            edges.append((node_out, node_in))
+            assert len(ref) > 1
+    return edges
 
-    # # FOR DEBUG
-    # problem_matches = set()
-    # problem_keys = set()
 
-    for item in soup.find_all("seqitem"):
-        references = item.find_all("reference")
-        if references:
-            node_out = item.get("key")
-            for node in references:
-                if node.lawname and node.lawname.get("type") in [
-                    "dict",
-                    "sgb",
-                    "internal",
-                ]:
-                    refs = json.loads(node.attrs["parsed"])
-                    for ref in refs:
-                        try:
-                            key = "_".join(ref[:2])
-                            matches = key_df.at[key, "key"]
-                            if type(matches) == numpy.ndarray:
-                                print(f"Multiple matches for {key}")
-                                matches = matches[0]
-                            # # FOR DEBUG
-                            # if type(matches) is not str:
-                            #     problem_matches.add(tuple(matches))
-                            node_in = matches if type(matches) == str else matches[0]
-                            edges.append((node_out, node_in))
-                            assert len(ref) > 1
-                        except KeyError:
-                            pass
-                            # # FOR DEBUG
-                            # problem_keys.add(key)
-
-    # FOR DEBUG
-    # if len(problem_matches) > 0:
-    #     print(f"{file} Problem Matches:\n", sorted(list(problem_matches)))
-    # if len(problem_keys) > 0:
-    #     print(f"{file} Problem Matches:\n", sorted(list(problem_keys)))
-    return pd.DataFrame(edges, columns=["out_node", "in_node"])
+def get_edgelist_writer(date, regulations, columnar_format):
+    target_folder = (
+        DE_REG_CROSSREFERENCE_EDGELIST_PATH
+        if regulations
+        else DE_CROSSREFERENCE_EDGELIST_PATH
+    )
+    return EdgelistWriter(f"{target_folder}/{get_filename(date)}", columnar_format)
@@ -8,10 +8,15 @@ from statics import (
     DE_REG_CROSSREFERENCE_LOOKUP_PATH,
     DE_REG_REFERENCE_PARSED_PATH,
 )
+from utils.columnar_export import export_columnar
 from utils.common import RegulationsPipelineStep, get_snapshot_law_list, load_law_names
 
 
 class DeCrossreferenceLookup(RegulationsPipelineStep):
+    def __init__(self, columnar_format=None, *args, **kwargs):
+        self.columnar_format = columnar_format
+        super().__init__(*args, **kwargs)
+
     def get_items(self, snapshots) -> list:
         ensure_exists(
             DE_REG_CROSSREFERENCE_LOOKUP_PATH
@@ -27,20 +32,35 @@ class DeCrossreferenceLookup(RegulationsPipelineStep):
     def execute_item(self, item):
         date, files = item
         data = []
-        source_folder = (
-            DE_REG_REFERENCE_PARSED_PATH
-            if self.regulations
-            else DE_REFERENCE_PARSED_PATH
-        )
-        target_folder = (
-            DE_REG_CROSSREFERENCE_LOOKUP_PATH
-            if self.regulations
-            else DE_CROSSREFERENCE_LOOKUP_PATH
-        )
         for file in files:
-            soup = create_soup(f"{source_folder}/{file}")
-            for tag in soup.find_all(citekey=True):
-                data.append([tag.attrs["key"], tag.attrs["citekey"]])
-        df = pd.DataFrame(data, columns=["key", "citekey"])
-        destination_file = f"{target_folder}/{date}.csv"
-        df.to_csv(destination_file, index=False)
+            soup = parse_file(file, self.regulations)
+            data.extend(get_lookup_rows(soup))
+        save_lookup(data, date, self.regulations, self.columnar_format)
+
+
+def parse_file(file, regulations):
+    source_folder = (
+        DE_REG_REFERENCE_PARSED_PATH if regulations else DE_REFERENCE_PARSED_PATH
+    )
+    return create_soup(f"{source_folder}/{file}")
+
+
+def get_lookup_rows(soup):
+    """
+    Returns: a list of [key, citekey] of all tags with a citekey
+    """
+    return [
+        [tag.attrs["key"], tag.attrs["citekey"]] for tag in soup.find_all(citekey=True)
+    ]
+
+
+def save_lookup(data, date, regulations, columnar_format):
+    target_folder = (
+        DE_REG_CROSSREFERENCE_LOOKUP_PATH
+        if regulations
+        else DE_CROSSREFERENCE_LOOKUP_PATH
+    )
+    df = pd.DataFrame(data, columns=["key", "citekey"])
+    destination_file = f"{target_folder}/{date}.csv"
+    df.to_csv(destination_file, index=False)
+    export_columnar(df, destination_file, columnar_format, ["key"])
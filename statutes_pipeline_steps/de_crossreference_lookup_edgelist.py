@@ -0,0 +1,81 @@
+import os
+
+from quantlaw.utils.files import ensure_exists
+
+from statics import (
+    DE_CROSSREFERENCE_EDGELIST_PATH,
+    DE_CROSSREFERENCE_LOOKUP_PATH,
+    DE_REG_CROSSREFERENCE_EDGELIST_PATH,
+    DE_REG_CROSSREFERENCE_LOOKUP_PATH,
+)
+from statutes_pipeline_steps.de_crossreference_edgelist import (
+    get_edgelist_writer,
+    get_filename,
+    get_references,
+    resolve_references,
+)
+from statutes_pipeline_steps.de_crossreference_lookup import (
+    get_lookup_rows,
+    parse_file,
+    save_lookup,
+)
+from utils.citekey_resolver import CitekeyResolver, print_resolver_stats
+from utils.common import RegulationsPipelineStep, get_snapshot_law_list
+
+
+class DeCrossreferenceLookupEdgelist(RegulationsPipelineStep):
+    """
+    Combines DeCrossreferenceLookup and DeCrossreferenceEdgelist. Each file is parsed
+    once: Citekeys and references are collected from all files of a snapshot and the
+    references are resolved after the lookup of the snapshot is complete. The lookup
+    and the edgelist are written like by the separate steps.
+    """
+
+    def __init__(self, law_names_data, columnar_format=None, *args, **kwargs):
+        self.law_names_data = law_names_data
+        self.columnar_format = columnar_format
+        super().__init__(*args, **kwargs)
+
+    def get_items(self, overwrite, snapshots) -> list:
+        lookup_folder = (
+            DE_REG_CROSSREFERENCE_LOOKUP_PATH
+            if self.regulations
+            else DE_CROSSREFERENCE_LOOKUP_PATH
+        )
+        edgelist_folder = (
+            DE_REG_CROSSREFERENCE_EDGELIST_PATH
+            if self.regulations
+            else DE_CROSSREFERENCE_EDGELIST_PATH
+        )
+        ensure_exists(lookup_folder)
+        ensure_exists(edgelist_folder)
+
+        if not overwrite:
+            existing_files = set(os.listdir(lookup_folder)) & set(
+                os.listdir(edgelist_folder)
+            )
+            snapshots = [s for s in snapshots if get_filename(s) not in existing_files]
+
+        return snapshots
+
+    def execute_item(self, item):
+        data = []
+        references = []
+        for file in get_snapshot_law_list(item, self.law_names_data):
+            soup = parse_file(file, self.regulations)
+            data.extend(get_lookup_rows(soup))
+            references.extend(get_references(soup))
+        save_lookup(data, item, self.regulations, self.columnar_format)
+
+        # Rows with empty values are skipped like missing values of the lookup csv
+        resolver = CitekeyResolver(
+            (key, citekey) for key, citekey in data if key and citekey
+        )
+        with get_edgelist_writer(
+            item, self.regulations, self.columnar_format
+        ) as writer:
+            writer.add_edges(resolve_references(references, resolver))
+        return item, resolver.get_stats()
+
+    def finish_execution(self, results):
+        print_resolver_stats(results)
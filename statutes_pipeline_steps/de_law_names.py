@@ -1,5 +1,3 @@
-import pickle
-
 import pandas as pd
 from quantlaw.de_extract.stemming import stem_law_name
 from quantlaw.utils.beautiful_soup import create_soup
@@ -14,6 +12,7 @@ from statics import (
     DE_XML_PATH,
 )
 from utils.common import RegulationsPipelineStep, load_law_names
+from utils.law_names_store import LawNamesStore
 
 
 class DeLawNamesStep(RegulationsPipelineStep):
@@ -62,8 +61,7 @@ class DeLawNamesStep(RegulationsPipelineStep):
         df.to_csv(dest_csv, index=False)
 
         dated_law_names = compile_law_names(self.regulations)
-        with open(dest_compiled, "wb") as f:
-            pickle.dump(dated_law_names, f)
+        LawNamesStore.write(dest_compiled, dated_law_names)
 
 
 def compile_law_names(regulations):
@@ -17,7 +17,11 @@ from statics import (
     DE_REG_XML_PATH,
     DE_XML_PATH,
 )
-from utils.common import RegulationsPipelineStep, get_stemmed_law_names_for_filename
+from utils.common import (
+    RegulationsPipelineStep,
+    get_stemmed_law_names_for_filename,
+    save_soup,
+)
 
 
 class DeReferenceAreasStep(RegulationsPipelineStep):
@@ -88,12 +92,7 @@ class DeReferenceAreasStep(RegulationsPipelineStep):
 
 
 def save_soup_with_style(soup, path):
-    output_lines = str(soup).replace("\n\n", "\n").split("\n")
-    output_lines.insert(1, '<?xml-stylesheet href="../../xml-styles.css"?>')
-    output = "\n".join(output_lines)
-
-    with open(path, "w") as f:
-        f.write(output)
+    save_soup(soup, path, stylesheet="../../xml-styles.css", collapse_newlines=True)
 
 
 def analyze_type_of_headings(soup):
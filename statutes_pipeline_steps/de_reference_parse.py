@@ -4,7 +4,7 @@ import os
 
 from quantlaw.de_extract.statutes_parse import StatutesParser, StringCaseException
 from quantlaw.de_extract.stemming import stem_law_name
-from quantlaw.utils.beautiful_soup import create_soup, save_soup
+from quantlaw.utils.beautiful_soup import create_soup
 from quantlaw.utils.files import ensure_exists, list_dir
 
 from statics import (
@@ -24,14 +24,17 @@ from utils.common import (
     RegulationsPipelineStep,
     copy_xml_schema_to_data_folder,
     get_stemmed_law_names_for_filename,
+    save_soup,
 )
+from utils.parse_cache import get_package_version, get_parse_cache
 
 
 class DeReferenceParseStep(RegulationsPipelineStep):
     max_number_of_processes = 2
 
-    def __init__(self, law_names, *args, **kwargs):
+    def __init__(self, law_names, parse_cache_path=None, *args, **kwargs):
         self.law_names = law_names
+        self.parse_cache_path = parse_cache_path
         super().__init__(*args, **kwargs)
 
     def get_items(self, overwrite) -> list:
@@ -76,8 +79,12 @@ class DeReferenceParseStep(RegulationsPipelineStep):
         # for debug
         logs.append(f"Start file - {item}")
 
+        parse_cache = get_parse_cache(PARSE_CACHE_NAMESPACE, self.parse_cache_path)
+
         soup = create_soup(f"{src}/{item}")
-        parse_reference_content_in_soup(soup, parser, debug_context=item)
+        parse_reference_content_in_soup(
+            soup, parser, debug_context=item, parse_cache=parse_cache
+        )
         current_lawid = soup.document.attrs["key"].split("_")[1]
         identify_reference_law_name_in_soup(soup, parser, current_lawid)
         identify_lawreference_law_name_in_soup(soup, laws_lookup)
@@ -85,6 +92,7 @@ class DeReferenceParseStep(RegulationsPipelineStep):
         identify_reference_in_juris_vso_list(soup, parser)
 
         save_soup(soup, f"{dest}/{item}")
+        parse_cache.flush()
         return logs
 
     def finish_execution(self, results):
@@ -99,22 +107,40 @@ class DeReferenceParseStep(RegulationsPipelineStep):
             f.write("\n".join(sorted(logs, key=lambda x: x.lower())))
 
 
-def parse_reference_content(reference, parser):
-    citation = reference.main.get_text()
-    reference_paths = parser.parse_main(citation)
+# StatutesParser.parse_main does not depend on the laws lookup of the parser.
+# Hence, parse results are cached per citation and version of quantlaw.
+PARSE_CACHE_NAMESPACE = f"de_parse_main_{get_package_version('quantlaw')}"
+
 
-    reference["parsed_verbose"] = json.dumps(reference_paths, ensure_ascii=False)
+def parse_citation(citation, parser):
+    reference_paths = parser.parse_main(citation)
     reference_paths_simple = [
         [component[1] for component in path] for path in reference_paths
     ]
-    reference["parsed"] = json.dumps(reference_paths_simple, ensure_ascii=False)
+    return (
+        json.dumps(reference_paths, ensure_ascii=False),
+        json.dumps(reference_paths_simple, ensure_ascii=False),
+    )
+
+
+def parse_reference_content(reference, parser, parse_cache=None):
+    citation = reference.main.get_text()
+    if parse_cache:
+        parsed_verbose, parsed = parse_cache.get_or_compute(
+            (citation,), parse_citation, citation, parser
+        )
+    else:
+        parsed_verbose, parsed = parse_citation(citation, parser)
+
+    reference["parsed_verbose"] = parsed_verbose
+    reference["parsed"] = parsed
 
 
-def parse_reference_content_in_soup(soup, parser, debug_context=None):
+def parse_reference_content_in_soup(soup, parser, debug_context=None, parse_cache=None):
     for reference in soup.find_all("reference", {"pattern": "inline"}):
         if reference.main:
             try:
-                parse_reference_content(reference, parser)
+                parse_reference_content(reference, parser, parse_cache)
             except StringCaseException as error:
                 print(error, "context", debug_context)
 
@@ -0,0 +1,176 @@
+import os
+
+import pandas as pd
+from quantlaw.utils.files import ensure_exists, list_dir
+from quantlaw.utils.pipeline import PipelineStep
+
+from utils.columnar_export import export_columnar
+
+# Tables stored per snapshot and combined for all snapshots
+SUMMARY_TABLES = ["node_counts", "laws", "degrees"]
+
+SUMMARIZED_EDGE_TYPES = ["reference", "authority"]
+
+
+class GraphSummaryStep(PipelineStep):
+    """
+    Summarizes the crossreference graph of each snapshot. The summaries are computed
+    from the node and edge tables of CrossreferenceGraphStep without loading the
+    graphs.
+
+    Per snapshot three tables are stored:
+        node_counts: number of nodes per type and level
+        laws: number of nodes, tokens, characters and edges of each edge type
+            from and to each law
+        degrees: in- and out-degree of each seqitem regarding references
+
+    Additionally, the tables of all snapshots are combined with a column snapshot
+    in the files index.{table}.csv.gz.
+    """
+
+    def __init__(self, source, destination, columnar_format=None, *args, **kwargs):
+        self.source = source
+        self.destination = destination
+        self.columnar_format = columnar_format
+        super().__init__(*args, **kwargs)
+
+    def get_items(self, overwrite, snapshots) -> list:
+        ensure_exists(self.destination)
+        available = sorted(
+            f[: -len(".nodes.csv.gz")] for f in list_dir(self.source, ".nodes.csv.gz")
+        )
+        if snapshots:
+            available = [s for s in available if s in snapshots]
+
+        if not overwrite:
+            # Only summaries that are missing or older than their graph are updated
+            available = [
+                snapshot
+                for snapshot in available
+                if get_mtime(self.get_summary_paths(snapshot))
+                < get_mtime(self.get_graph_paths(snapshot), latest=True)
+            ]
+
+        return available
+
+    def get_graph_paths(self, snapshot):
+        return [
+            f"{self.source}/{snapshot}.nodes.csv.gz",
+            f"{self.source}/{snapshot}.edges.csv.gz",
+        ]
+
+    def get_summary_paths(self, snapshot):
+        return [
+            f"{self.destination}/{snapshot}.{table}.csv.gz" for table in SUMMARY_TABLES
+        ]
+
+    def execute_item(self, item):
+        nodes, edges = [
+            pd.read_csv(path, dtype={"key": str, "u": str, "v": str})
+            for path in self.get_graph_paths(item)
+        ]
+        summary = summarize_graph(nodes, edges)
+        for table, path in zip(SUMMARY_TABLES, self.get_summary_paths(item)):
+            summary[table].to_csv(path, index=False)
+
+    def finish_execution(self, results):
+        # The combined index is rebuilt from all stored summaries, including those
+        # of snapshots that were not updated in this run.
+        snapshots = sorted(
+            f[: -len(".laws.csv.gz")]
+            for f in list_dir(self.destination, ".laws.csv.gz")
+        )
+        for table in SUMMARY_TABLES:
+            path = f"{self.destination}/index.{table}.csv.gz"
+            if snapshots:
+                df = pd.concat(
+                    [
+                        pd.read_csv(
+                            f"{self.destination}/{snapshot}.{table}.csv.gz",
+                            dtype={"key": str, "law_name": str},
+                        ).assign(snapshot=snapshot)
+                        for snapshot in snapshots
+                    ],
+                    ignore_index=True,
+                )
+                df = df[["snapshot"] + [c for c in df.columns if c != "snapshot"]]
+                df.to_csv(path, index=False)
+                export_columnar(
+                    df,
+                    path,
+                    self.columnar_format,
+                    dictionary_columns=["snapshot", "type", "law_name"],
+                )
+        return results
+
+
+###########
+# Functions
+###########
+
+
+def get_mtime(paths, latest=False):
+    """
+    Returns: the earliest or latest modification time of files. Missing files are
+        treated as infinitely old.
+    """
+    mtimes = [os.path.getmtime(p) if os.path.exists(p) else 0 for p in paths]
+    return max(mtimes) if latest else min(mtimes)
+
+
+def summarize_graph(nodes, edges):
+    """
+    Computes the summary tables of a crossreference graph.
+
+    Args:
+        nodes: DataFrame with the node columns of CrossreferenceGraphStep
+        edges: DataFrame with the columns u, v and edge_type
+
+    Returns: a dict of the DataFrames of SUMMARY_TABLES
+    """
+    nodes = nodes[nodes.key != "root"]
+
+    node_counts = (
+        nodes.groupby(["type", "level"]).size().rename("nodes_n").reset_index()
+    )
+
+    documents = nodes[nodes.level == 0]
+    laws = pd.DataFrame(
+        dict(
+            nodes_n=nodes.groupby("law_name").size(),
+            seqitems_n=nodes[nodes.type == "seqitem"].groupby("law_name").size(),
+            # Text statistics of documents cover their whole subtree
+            tokens_n=documents.groupby("law_name").tokens_n.sum(),
+            chars_n=documents.groupby("law_name").chars_n.sum(),
+        )
+    )
+
+    law_names = nodes.drop_duplicates("key").set_index("key").law_name
+    edges = edges.assign(u_law=edges.u.map(law_names), v_law=edges.v.map(law_names))
+    for edge_type in SUMMARIZED_EDGE_TYPES:
+        typed_edges = edges[edges.edge_type == edge_type]
+        laws[f"{edge_type}_edges_out"] = typed_edges.groupby("u_law").size()
+        laws[f"{edge_type}_edges_in"] = typed_edges.groupby("v_law").size()
+    laws = laws.fillna(0).astype(int).rename_axis("law_name").reset_index()
+
+    # Degrees in the seqitem graph, i.e. references between seqitems
+    seqitems = nodes[nodes.type == "seqitem"]
+    graph_keys = set(nodes.key[nodes.type != "subseqitem"])
+    references = edges[
+        (edges.edge_type == "reference")
+        & edges.u.isin(graph_keys)
+        & edges.v.isin(graph_keys)
+    ]
+    degrees = pd.DataFrame(
+        dict(
+            key=seqitems.key.values,
+            law_name=seqitems.law_name.values,
+            in_degree=seqitems.key.map(references.groupby("v").size()).values,
+            out_degree=seqitems.key.map(references.groupby("u").size()).values,
+        )
+    )
+    degrees[["in_degree", "out_degree"]] = (
+        degrees[["in_degree", "out_degree"]].fillna(0).astype(int)
+    )
+
+    return dict(node_counts=node_counts, laws=laws, degrees=degrees)
@@ -1,17 +1,33 @@
 import os
-import re
 
 import networkx as nx
 from lxml import etree
 from quantlaw.utils.files import ensure_exists, list_dir
 from quantlaw.utils.pipeline import PipelineStep
 
+from utils.hierarchy_arrays import HierarchyArrays
+from utils.snapshot_file_index import list_snapshot_files
+
+# File extensions of the formats hierarchy graphs can be saved in. "arrays" is a
+# columnar format (see HierarchyArrays) that is smaller and faster to load.
+HIERARCHY_GRAPH_FORMATS = {"gpickle": ".gpickle", "arrays": ".npz"}
+
 
 class HierarchyGraphStep(PipelineStep):
-    def __init__(self, source, destination, add_subseqitems, *args, **kwargs):
+    def __init__(
+        self,
+        source,
+        destination,
+        add_subseqitems,
+        graph_format="gpickle",
+        *args,
+        **kwargs,
+    ):
         self.source = source
         self.destination = destination
         self.add_subseqitems = add_subseqitems
+        assert graph_format in HIERARCHY_GRAPH_FORMATS
+        self.graph_format = graph_format
         super().__init__(*args, **kwargs)
 
     def get_items(self, overwrite) -> list:
@@ -19,9 +35,15 @@ class HierarchyGraphStep(PipelineStep):
         files = list_dir(self.source, ".xml")
 
         if not overwrite:
-            existing_files = list_dir(self.destination, ".gpickle")
+            existing_files = list_dir(
+                self.destination, HIERARCHY_GRAPH_FORMATS[self.graph_format]
+            )
             files = list(
-                filter(lambda f: get_gpickle_filename(f) not in existing_files, files)
+                filter(
+                    lambda f: get_hierarchy_graph_filename(f, self.graph_format)
+                    not in existing_files,
+                    files,
+                )
             )
 
         return files
@@ -29,8 +51,12 @@ class HierarchyGraphStep(PipelineStep):
     def execute_item(self, item):
         G = build_graph(f"{self.source}/{item}", add_subseqitems=self.add_subseqitems)
 
-        destination_path = f"{self.destination}/{get_gpickle_filename(item)}"
-        nx.write_gpickle(G, destination_path)
+        filename = get_hierarchy_graph_filename(item, self.graph_format)
+        destination_path = f"{self.destination}/{filename}"
+        if self.graph_format == "arrays":
+            HierarchyArrays.from_graph(G).save(destination_path)
+        else:
+            nx.write_gpickle(G, destination_path)
 
 
 ###########
@@ -38,8 +64,57 @@ class HierarchyGraphStep(PipelineStep):
 ###########
 
 
-def get_gpickle_filename(filename):
-    return f"{os.path.splitext(filename)[0]}.gpickle"
+def get_hierarchy_graph_filename(filename, graph_format="gpickle"):
+    return f"{os.path.splitext(filename)[0]}{HIERARCHY_GRAPH_FORMATS[graph_format]}"
+
+
+def find_hierarchy_graph_file(folder, filename):
+    """
+    Returns: the path of the hierarchy graph of a file in the folder. Graphs in the
+        arrays format are preferred. If no graph exists, the gpickle path is returned.
+    """
+    for graph_format in ["arrays", "gpickle"]:
+        path = f"{folder}/{get_hierarchy_graph_filename(filename, graph_format)}"
+        if os.path.exists(path):
+            return path
+    return path
+
+
+def list_hierarchy_graph_files(folder):
+    """
+    Returns: the paths of the hierarchy graphs in the folder. If a graph exists in
+        multiple formats, only the path of the preferred format is returned.
+    """
+    extensions = tuple(HIERARCHY_GRAPH_FORMATS.values())
+    basenames = {
+        os.path.splitext(f)[0]: None
+        for f in os.listdir(folder)
+        if f.endswith(extensions)
+    }
+    return [find_hierarchy_graph_file(folder, f) for f in basenames]
+
+
+def list_snapshot_hierarchy_graph_files(folder, snapshot):
+    """
+    Returns: the paths of the hierarchy graphs of a snapshot in the folder like
+        list_hierarchy_graph_files
+    """
+    extensions = tuple(HIERARCHY_GRAPH_FORMATS.values())
+    basenames = {
+        os.path.splitext(os.path.basename(f))[0]: None
+        for f in list_snapshot_files(folder, extensions, snapshot)
+    }
+    return [find_hierarchy_graph_file(folder, f) for f in basenames]
+
+
+def load_hierarchy_graph(path):
+    """
+    Loads a hierarchy graph in any of the HIERARCHY_GRAPH_FORMATS as networkx DiGraph.
+    """
+    if path.endswith(HIERARCHY_GRAPH_FORMATS["arrays"]):
+        return HierarchyArrays.load(path).to_graph()
+    else:
+        return nx.read_gpickle(path)
 
 
 def add_juris_attrs(item, node_attrs):
@@ -95,29 +170,69 @@ def nest_items(G, items, document_type):
     return G
 
 
-def count_characters(text, whites=False):
+def get_subtree_text_stats(elem, stats):
     """
-    Get character count of a text
+    Computes statistics about the text of an element in a single post-order
+    traversal. They equal those of " ".join(elem.itertext()). Hence, the text of
+    comments and processing instructions is excluded, but their tails are included.
+    The token sets of the children are merged into the largest one instead of
+    splitting the text of each ancestor again.
 
     Args:
-        whites: If True, whitespaces are not counted
+        elem: lxml element
+        stats: dict to which the statistics of elem and its descendants are added.
+            The values are tuples of chars_n, chars_nowhites, tokens_n and
+            tokens_unique.
+
+    Returns: a tuple of the number of text pieces, the number of characters of the
+        pieces, chars_nowhites, tokens_n and the set of tokens of the subtree.
+        The set may be reused by the caller.
     """
-    if whites:
-        return len(text)
-    else:
-        return len(re.sub(r"\s", "", text))
-
-
-def count_tokens(text, unique=False):
-    """
-    Get token count of given text. Tokens are delimited by whitespaces.
-    Args:
-        unique: It True, only unique tokens are counted.
-    """
-    if not unique:
-        return len(text.split())
-    else:
-        return len(set(text.split()))
+    pieces_n = 0
+    chars_n = 0
+    chars_nowhites = 0
+    tokens_n = 0
+    tokens = set()
+
+    texts = [elem.text]
+    for child in elem:
+        if isinstance(child.tag, str):
+            (
+                child_pieces_n,
+                child_chars_n,
+                child_chars_nowhites,
+                child_tokens_n,
+                child_tokens,
+            ) = get_subtree_text_stats(child, stats)
+            pieces_n += child_pieces_n
+            chars_n += child_chars_n
+            chars_nowhites += child_chars_nowhites
+            tokens_n += child_tokens_n
+            if len(child_tokens) > len(tokens):
+                child_tokens.update(tokens)
+                tokens = child_tokens
+            else:
+                tokens.update(child_tokens)
+        texts.append(child.tail)
+
+    for text in texts:
+        if text is not None:
+            # Splitting at whitespaces equals removing whitespaces with regex \s.
+            text_tokens = text.split()
+            pieces_n += 1
+            chars_n += len(text)
+            chars_nowhites += sum(map(len, text_tokens))
+            tokens_n += len(text_tokens)
+            tokens.update(text_tokens)
+
+    stats[elem] = (
+        # Pieces are joined with spaces
+        chars_n + max(pieces_n - 1, 0),
+        chars_nowhites,
+        tokens_n,
+        len(tokens),
+    )
+    return pieces_n, chars_n, chars_nowhites, tokens_n, tokens
 
 
 def build_graph(filename, add_subseqitems=False):
@@ -142,21 +257,24 @@ def build_graph(filename, add_subseqitems=False):
         if add_subseqitems
         else "//document | //item | //seqitem"
     )
+    items = tree.xpath(xpath)
 
     # Create a tree if the elements in the target graph
-    G = nest_items(G, items=tree.xpath(xpath), document_type=document_type)
+    G = nest_items(G, items=items, document_type=document_type)
+
+    stats = {}
+    get_subtree_text_stats(tree.getroot(), stats)
 
     # Add attributes regarding the contained text to the target graoh
-    for item in tree.xpath(xpath):
-        text = " ".join(item.itertext())
-        G.nodes[item.attrib["key"]]["chars_n"] = count_characters(text, whites=True)
-        G.nodes[item.attrib["key"]]["chars_nowhites"] = count_characters(
-            text, whites=False
-        )
-        G.nodes[item.attrib["key"]]["tokens_n"] = count_tokens(text, unique=False)
-        G.nodes[item.attrib["key"]]["tokens_unique"] = count_tokens(text, unique=True)
-
-    items_with_text = {elem.getparent() for elem in tree.xpath("//text")}
+    for item in items:
+        chars_n, chars_nowhites, tokens_n, tokens_unique = stats[item]
+        node = G.nodes[item.attrib["key"]]
+        node["chars_n"] = chars_n
+        node["chars_nowhites"] = chars_nowhites
+        node["tokens_n"] = tokens_n
+        node["tokens_unique"] = tokens_unique
+
+    items_with_text = {elem.getparent() for elem in tree.iter("text")}
     for item in items_with_text:
         all_elems = item.getchildren()
         text_elems = [e for e in all_elems if e.tag == "text"]
@@ -164,9 +282,9 @@ def build_graph(filename, add_subseqitems=False):
             texts_tokens_n = []
             texts_chars_n = []
             for elem in text_elems:
-                text = " ".join(elem.itertext())
-                texts_tokens_n.append(str(count_tokens(text, unique=False)))
-                texts_chars_n.append(str(count_characters(text, whites=False)))
+                _, chars_nowhites, tokens_n, _ = stats[elem]
+                texts_tokens_n.append(str(tokens_n))
+                texts_chars_n.append(str(chars_nowhites))
             G.nodes[item.attrib["key"]]["texts_tokens_n"] = ",".join(texts_tokens_n)
             G.nodes[item.attrib["key"]]["texts_chars_n"] = ",".join(texts_chars_n)
 
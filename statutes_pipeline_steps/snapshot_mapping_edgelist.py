@@ -1,24 +1,54 @@
 import json
 import os
-import pickle
 from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from multiprocessing import Pool
 
 import networkx as nx
-import textdistance
-import tqdm
+import numpy as np
 from quantlaw.utils.beautiful_soup import create_soup
 from quantlaw.utils.files import ensure_exists, list_dir
 from quantlaw.utils.networkx import get_leaves
 from quantlaw.utils.pipeline import PipelineStep
 from regex import regex
 
+from utils.columnar_export import export_columnar
 from utils.common import get_snapshot_law_list, invert_dict_mapping_unique
+from utils.snapshot_cache import SnapshotCache
+from utils.snapshot_texts_store import SnapshotTextsStore
 from utils.string_list_contains import StringContainsAlign
+from utils.text_lsh import get_lsh_candidates, get_minhash_signatures
+from utils.text_similarity import jaro_winkler, jaro_winkler_batch
 
 
 class SnapshotMappingEdgelistStep(PipelineStep):
-    max_number_of_processes = 1
+    """
+    Maps the nodes of snapshots to the nodes of later snapshots.
+
+    Several pairs of snapshots are mapped concurrently in threads of the main
+    process. Only the batches of text similarities of steps 4 and 5 and the MinHash
+    signatures of step 5 are computed in parallel, in a single pool of worker
+    processes shared by all pairs. Steps 1 to 3 and the queue of step 4 run in the
+    threads and are serialized by the GIL.
+
+    The pairs are processed in chains (s_i, s_i+N), (s_i+N, s_i+2N), ... for an
+    interval N. The data of a snapshot and the structures derived from it are
+    cached, so that the later snapshot of a pair is loaded only once for the
+    following pair of the chain.
+
+    Args:
+        concurrent_items: maximum number of pairs of snapshots mapped concurrently.
+            Each pair holds the data of both snapshots in memory.
+        lsh: If True, remaining nodes are additionally mapped to similar nodes
+            anywhere in the other snapshot. Candidates are proposed by MinHash
+            signatures and locality-sensitive hashing.
+        compose_intervals: If True and the interval is larger than 1, the mappings
+            of the interval-1 pairs in between are composed. Only the nodes left
+            unmapped are matched directly. The mappings are stored in the subfolder
+            composed together with a report of the differences to the directly
+            computed mapping, if it exists.
+    """
 
     def __init__(
         self,
@@ -29,6 +59,10 @@ class SnapshotMappingEdgelistStep(PipelineStep):
         min_text_length=50,
         radius=5,
         distance_threshold=0.9,
+        columnar_format=None,
+        concurrent_items=4,
+        lsh=False,
+        compose_intervals=False,
         *args,
         **kwargs,
     ):
@@ -39,12 +73,29 @@ class SnapshotMappingEdgelistStep(PipelineStep):
         self.min_text_length = min_text_length
         self.radius = radius
         self.distance_threshold = distance_threshold
+        self.columnar_format = columnar_format
+        self.concurrent_items = concurrent_items
+        self.lsh = lsh
+        self.compose_intervals = compose_intervals and interval > 1
+        self.snapshot_cache = None
         super().__init__(*args, **kwargs)
 
+    @property
+    def mapping_destination(self):
+        if self.compose_intervals:
+            return os.path.join(self.destination, "composed")
+        return self.destination
+
+    def get_snapshots(self):
+        return sorted(
+            f
+            for f in os.listdir(self.source)
+            if SnapshotTextsStore.exists(os.path.join(self.source, f))
+        )
+
     def get_items(self, overwrite, snapshots) -> list:
-        ensure_exists(self.destination)
-        items = sorted(list_dir(self.source, ".pickle"))
-        items = [i[: -len(".pickle")] for i in items]
+        ensure_exists(self.mapping_destination)
+        items = self.get_snapshots()
 
         # Create mappings to draw the edges
         mappings = [
@@ -56,23 +107,107 @@ class SnapshotMappingEdgelistStep(PipelineStep):
             mappings = list(filter(lambda f: f[0] in snapshots, mappings))
 
         if not overwrite:
-            existing_files = list_dir(self.destination, ".json")
+            existing_files = list_dir(self.mapping_destination, ".json")
             mappings = list(
                 filter(lambda x: mapping_filename(x) not in existing_files, mappings)
             )
 
         return mappings
 
-    def execute_item(self, item):
+    def get_adjacent_items(self, items):
+        """
+        Returns: the sorted interval-1 pairs of snapshots whose mappings are composed
+            to map the given pairs
+        """
+        snapshots = self.get_snapshots()
+        adjacent_items = set()
+        for filename1, filename2 in items:
+            chain = snapshots[
+                snapshots.index(filename1) : snapshots.index(filename2) + 1
+            ]
+            adjacent_items.update(zip(chain[:-1], chain[1:]))
+        return sorted(adjacent_items)
+
+    def compose_mappings(self, item):
+        """
+        Returns: the composition of the interval-1 mappings between the snapshots of
+            a pair
+        """
+        composed = None
+        for adjacent_item in self.get_adjacent_items([item]):
+            path = os.path.join(self.destination, mapping_filename(adjacent_item))
+            if not os.path.exists(path):
+                raise Exception(f"Mapping {path} required to compose {item} missing")
+            with open(path) as f:
+                mapping = json.load(f)
+            if composed is None:
+                composed = mapping
+            else:
+                composed = {k: mapping[v] for k, v in composed.items() if v in mapping}
+        return composed
+
+    def execute_items(self, items):
+        processes = self.processes or self.__class__.max_number_of_processes
+        # Order the pairs into chains, so that the later snapshot of a pair is the
+        # earlier snapshot of the next pair
+        snapshot_index = {s: i for i, s in enumerate(self.get_snapshots())}
+        items = sorted(
+            items,
+            key=lambda item: (
+                snapshot_index[item[0]] % self.interval,
+                snapshot_index[item[0]],
+            ),
+        )
+        # Concurrent pairs of a chain share one snapshot each
+        self.snapshot_cache = SnapshotCache(
+            self.load_snapshot_texts, self.concurrent_items + 1
+        )
+        if processes <= 1:
+            results = [self.execute_item(item) for item in items]
+        else:
+            # Worker processes cannot start pools themselves. Hence, the pairs run in
+            # threads that share one pool.
+            with Pool(processes) as pool, ThreadPoolExecutor(
+                max(min(self.concurrent_items, len(items)), 1)
+            ) as executor:
+                results = list(
+                    executor.map(lambda item: self.execute_item(item, pool), items)
+                )
+        self.snapshot_cache = None
+        return self.finish_execution(results)
+
+    def execute_item(self, item, pool=None):
         filename1, filename2 = item
 
-        data1 = self.load_pickle(filename1)
-        data2 = self.load_pickle(filename2)
+        data1 = self.get_snapshot_texts(filename1)
+        data2 = self.get_snapshot_texts(filename2)
+
+        # STEP 0: composition of interval-1 mappings (optional)
+        if self.compose_intervals:
+            composed_mappings = self.compose_mappings(item)
+            remaining_keys1, remaining_keys2 = get_remaining(
+                data1["keys"],
+                data2["keys"],
+                composed_mappings,
+                printing=f"{item}/Step 0",
+            )
+        else:
+            composed_mappings = {}
+            remaining_keys1, remaining_keys2 = set(data1["keys"]), set(data2["keys"])
 
         # STEP 1: perfect matches unique when considering text
-        new_mappings = map_unique_texts(
+        new_mappings_current_step = map_unique_texts(
             data1, data2, min_text_length=self.min_text_length
         )
+        new_mappings = {
+            **composed_mappings,
+            **{
+                k: v
+                for k, v in new_mappings_current_step.items()
+                if k in remaining_keys1 and v in remaining_keys2
+            },
+        }
+        del new_mappings_current_step
         remaining_keys1, remaining_keys2 = get_remaining(
             data1["keys"], data2["keys"], new_mappings, printing=f"{item}/Step 1"
         )
@@ -100,8 +235,11 @@ class SnapshotMappingEdgelistStep(PipelineStep):
         # STEP 4: neighborhood matching
         data_keys1 = data1["keys"]
         data_keys2 = data2["keys"]
-        data_texts1 = data1["texts"]
-        data_texts2 = data2["texts"]
+        # Only texts of remaining keys are compared in the following steps
+        leaf_texts1 = get_leaf_texts(data1, remaining_keys1)
+        leaf_texts2 = get_leaf_texts(data2, remaining_keys2)
+        key_index_dict1 = data1["key_index"]
+        key_index_dict2 = data2["key_index"]
         del data1
         del data2
 
@@ -109,37 +247,134 @@ class SnapshotMappingEdgelistStep(PipelineStep):
             new_mappings=new_mappings,
             data_keys1=data_keys1,
             data_keys2=data_keys2,
-            data_texts1=data_texts1,
-            data_texts2=data_texts2,
+            leaf_texts1=leaf_texts1,
+            leaf_texts2=leaf_texts2,
             remaining_keys1=remaining_keys1,
             remaining_keys2=remaining_keys2,
+            key_index_dict1=key_index_dict1,
+            key_index_dict2=key_index_dict2,
             radius=self.radius,
             distance_threshold=self.distance_threshold,
         )
 
-        text_distance_cache = map_similar_text_common_neighbors(
-            **common_neighbor_kwargs,
-            printing=str(item),
-            dry_run=True,
-        )
-        text_distance_cache = update_textdistance_cache(text_distance_cache)
         map_similar_text_common_neighbors(
             **common_neighbor_kwargs,
             printing=str(item),
-            text_distance_cache=text_distance_cache,
+            pool=pool,
         )
 
-        dest_path = f"{self.destination}/{mapping_filename(item)}"
+        # STEP 5: global matching of similar texts (optional)
+        if self.lsh:
+            get_remaining(
+                data_keys1, data_keys2, new_mappings, printing=f"{item}/Step 4"
+            )
+            map_similar_text_lsh(
+                new_mappings=new_mappings,
+                data_keys1=data_keys1,
+                data_keys2=data_keys2,
+                leaf_texts1=leaf_texts1,
+                leaf_texts2=leaf_texts2,
+                remaining_keys1=remaining_keys1,
+                remaining_keys2=remaining_keys2,
+                distance_threshold=self.distance_threshold,
+                min_text_length=self.min_text_length,
+                pool=pool,
+            )
+
+        if self.compose_intervals:
+            self.save_compose_report(item, composed_mappings, new_mappings)
+
+        dest_path = f"{self.mapping_destination}/{mapping_filename(item)}"
         with open(dest_path, "w") as f:
             json.dump(new_mappings, f)
+        export_columnar(
+            dict(source=list(new_mappings.keys()), target=list(new_mappings.values())),
+            dest_path,
+            self.columnar_format,
+        )
 
         # only called to print stats
         get_remaining(data_keys1, data_keys2, new_mappings, printing=f"{item}/DONE")
 
-    def load_pickle(self, snapshot):
-        with open(os.path.join(self.source, snapshot + ".pickle"), "rb") as f:
-            raw_data = pickle.load(f)
-        return raw_data
+    def save_compose_report(self, item, composed_mappings, new_mappings):
+        """
+        Saves and prints the number of composed mappings and of the mappings of the
+        direct pass. If a directly computed mapping of the pair exists, the
+        differences to it are added.
+        """
+        report = dict(
+            composed=len(composed_mappings),
+            direct_pass=len(new_mappings) - len(composed_mappings),
+        )
+        direct_path = os.path.join(self.destination, mapping_filename(item))
+        if os.path.exists(direct_path):
+            with open(direct_path) as f:
+                report.update(compare_mappings(new_mappings, json.load(f)))
+        print(f"{item}/Compose report: {report}")
+
+        filename1, filename2 = item
+        report_path = os.path.join(
+            self.mapping_destination, f"{filename1}_{filename2}.report.json"
+        )
+        with open(report_path, "w") as f:
+            json.dump(report, f)
+
+    def get_snapshot_texts(self, snapshot):
+        if self.snapshot_cache:
+            return self.snapshot_cache.get(snapshot)
+        return self.load_snapshot_texts(snapshot)
+
+    def load_snapshot_texts(self, snapshot):
+        """
+        Returns: a dict with the keys, citekeys, text hashes and text lengths of a
+            snapshot as lists, the texts as lazily decoded StringTable and structures
+            derived from them that do not depend on the other snapshot of a pair:
+                key_index: dict of keys and their positions
+                unique_texts: dict of the hashes of unique texts and their keys
+                citekey_texts: dict of keys with a citekey and tuples of their
+                    lowercase citekeys and text hashes
+            The data must not be modified, as it is reused for several pairs.
+        """
+        store = SnapshotTextsStore(os.path.join(self.source, snapshot))
+        keys = list(store.keys)
+        citekeys = store.get_citekeys()
+        text_hashes = store.text_hashes.tolist()
+        return dict(
+            keys=keys,
+            key_index={k: idx for idx, k in enumerate(keys)},
+            citekeys=citekeys,
+            texts=store.texts,
+            text_lengths=store.text_lengths.tolist(),
+            text_hashes=text_hashes,
+            unique_texts=invert_dict_mapping_unique(
+                {k: h for k, h in zip(keys, text_hashes)}
+            ),
+            citekey_texts={
+                k: (c.lower(), h) for k, h, c in zip(keys, text_hashes, citekeys) if c
+            },
+        )
+
+
+def get_leaf_texts(data, keys):
+    """
+    Returns: a dict of the given keys and their texts
+    """
+    return {k: data["texts"][data["key_index"][k]] for k in keys}
+
+
+def compare_mappings(mappings, reference):
+    """
+    Returns: a dict with the number of keys mapped to the same and to different
+        targets in both mappings and of the keys only mapped in one of them
+    """
+    common_keys = mappings.keys() & reference.keys()
+    same = sum(mappings[k] == reference[k] for k in common_keys)
+    return dict(
+        same=same,
+        different=len(common_keys) - same,
+        only_composed=len(mappings.keys() - reference.keys()),
+        only_direct=len(reference.keys() - mappings.keys()),
+    )
 
 
 def mapping_filename(mapping):
@@ -219,14 +454,13 @@ def get_leaf_texts_to_compare(
 def map_unique_texts(data1, data2, min_text_length=50):
     """
     Maps nodes from snapshot t1 to t2 if texts are in each snapshot unique and appear
-    in the both snapshots
+    in the both snapshots. Texts are compared by their hashes.
     """
-    leaf_texts1 = {k: t for k, t in zip(data1["keys"], data1["texts"])}
-    leaf_texts2 = {k: t for k, t in zip(data2["keys"], data2["texts"])}
-
-    # Create dicts with text as keys
-    inverted_unique_leaf_texts1 = invert_dict_mapping_unique(leaf_texts1)
-    inverted_unique_leaf_texts2 = invert_dict_mapping_unique(leaf_texts2)
+    # Dicts with text as keys
+    inverted_unique_leaf_texts1 = data1["unique_texts"]
+    inverted_unique_leaf_texts2 = data2["unique_texts"]
+    text_lengths1 = data1["text_lengths"]
+    key_index1 = data1["key_index"]
 
     # find unique texts in both snapshots
     both_unique_texts = set(inverted_unique_leaf_texts1.keys()) & set(
@@ -234,7 +468,11 @@ def map_unique_texts(data1, data2, min_text_length=50):
     )
 
     # Filter for texts with min length
-    both_unique_texts = {x for x in both_unique_texts if len(x) >= min_text_length}
+    both_unique_texts = {
+        x
+        for x in both_unique_texts
+        if text_lengths1[key_index1[inverted_unique_leaf_texts1[x]]] >= min_text_length
+    }
 
     # Create mapping
     new_mappings = {}
@@ -247,14 +485,10 @@ def map_unique_texts(data1, data2, min_text_length=50):
 
 def map_same_citekey_same_text(data1, data2, remaining_keys1, remaining_keys2):
     text_and_citekeys1 = {
-        k: (c.lower(), t)
-        for k, t, c in zip(data1["keys"], data1["texts"], data1["citekeys"])
-        if c and k in remaining_keys1
+        k: v for k, v in data1["citekey_texts"].items() if k in remaining_keys1
     }
     text_and_citekeys2 = {
-        k: (c.lower(), t)
-        for k, t, c in zip(data2["keys"], data2["texts"], data2["citekeys"])
-        if c and k in remaining_keys2
+        k: v for k, v in data2["citekey_texts"].items() if k in remaining_keys2
     }
     inverted_text_and_citekeys1 = invert_dict_mapping_unique(text_and_citekeys1)
     inverted_text_and_citekeys2 = invert_dict_mapping_unique(text_and_citekeys2)
@@ -285,8 +519,8 @@ def map_text_containment(
 ):
     remaining_keys1_list = sorted(remaining_keys1)
     remaining_keys2_list = sorted(remaining_keys2)
-    leaf_texts1_dict = {k: t for k, t in zip(data1["keys"], data1["texts"])}
-    leaf_texts2_dict = {k: t for k, t in zip(data2["keys"], data2["texts"])}
+    leaf_texts1_dict = get_leaf_texts(data1, remaining_keys1_list)
+    leaf_texts2_dict = get_leaf_texts(data2, remaining_keys2_list)
 
     aligner = StringContainsAlign(min_text_length=min_text_length)
     aligner.text_list_0 = [
@@ -339,79 +573,98 @@ def get_neighborhood(data_keys, node, radius, keys_len, key_index_dict):
     return neighborhood
 
 
-def cached_text_distance(s1, s2, cache, dry_run):
+def cached_text_distance(s1, s2, cache, distance_threshold=None):
     key = (s1, s2)
-    if dry_run:
-        distance = None
-        cache[key] = distance
-    elif key not in cache:
-        distance = textdistance.jaro_winkler(s1, s2)
+    if key not in cache:
+        distance = jaro_winkler(s1, s2, distance_threshold)
         cache[key] = distance
     else:
         distance = cache[key]
     return distance
 
 
-def calc_text_distance(args):
-    return textdistance.jaro_winkler(*args)
+def calc_text_distances(args):
+    pairs, distance_threshold = args
+    return jaro_winkler_batch(pairs, distance_threshold)
 
 
-def update_textdistance_cache(text_distance_cache):
-    text_distance_texts = list(text_distance_cache.keys())
-    with Pool() as p:
-        distances = tqdm.tqdm(
-            p.imap(calc_text_distance, text_distance_texts),
-            total=len(text_distance_texts),
-        )
-        return {k: v for k, v in zip(text_distance_texts, distances)}
+def update_textdistance_cache(
+    text_distance_cache, pairs, distance_threshold=None, pool=None, chunk_size=100
+):
+    """
+    Computes the similarities of text pairs and adds them to the cache. The pairs
+    are scored in chunks in parallel if a pool is given.
+
+    Similarities that cannot exceed the distance_threshold might be stored as 0.0, as
+    only similarities above the threshold are used for mappings.
+    """
+    if pool is None or len(pairs) <= chunk_size:
+        distances = jaro_winkler_batch(pairs, distance_threshold)
+    else:
+        chunks = [
+            (pairs[i : i + chunk_size], distance_threshold)
+            for i in range(0, len(pairs), chunk_size)
+        ]
+        distances = [
+            distance
+            for chunk_distances in pool.imap(calc_text_distances, chunks)
+            for distance in chunk_distances
+        ]
+    text_distance_cache.update(zip(pairs, distances))
 
 
 def map_similar_text_common_neighbors(
     new_mappings,
     data_keys1,
     data_keys2,
-    data_texts1,
-    data_texts2,
+    leaf_texts1,
+    leaf_texts2,
     remaining_keys1,
     remaining_keys2,
+    key_index_dict1=None,
+    key_index_dict2=None,
     radius=5,
     distance_threshold=0.9,
     printing=None,
-    dry_run=False,
     text_distance_cache=None,
+    pool=None,
+    lookahead=1000,
 ):
-    if not text_distance_cache:
+    """
+    Maps remaining nodes to the most similar remaining node in the neighborhood of
+    the mapped nodes in their own neighborhood. Mapping a node requeues its
+    unmapped neighbors.
+
+    Before a node is processed, the similarities of the candidates of the next
+    lookahead nodes in the queue are computed in a batch, in parallel if a pool is
+    given. Candidates that change until a node is processed, e.g. due to a mapping
+    of a neighbor, are scored when needed. Hence, the mappings do not depend on the
+    lookahead.
+
+    Args:
+        leaf_texts1: dict of at least the remaining keys of the first snapshot and
+            their texts
+        leaf_texts2: dict of at least the remaining keys of the second snapshot and
+            their texts
+
+    Returns: the cache of the computed similarities
+    """
+    if text_distance_cache is None:
         text_distance_cache = dict()
 
     keys_len1 = len(data_keys1)
     keys_len2 = len(data_keys2)
-    key_index_dict1 = {k: idx for idx, k in enumerate(data_keys1)}
-    key_index_dict2 = {k: idx for idx, k in enumerate(data_keys2)}
-
-    leaf_texts1 = {k: v for k, v in zip(data_keys1, data_texts1)}
-    leaf_texts2 = {k: v for k, v in zip(data_keys2, data_texts2)}
-
-    key_queue = deque(remaining_keys1)
-    key_queue_set = set(key_queue)
-    i = -1  # only to print the process
-    while key_queue:
-        remaining_key1 = key_queue.popleft()
-        key_queue_set.remove(remaining_key1)
-        i += 1  # only to print the process
-        if i % 100 == 0 and printing:
-            total = len(key_queue) + i
-            print(
-                f"\r{printing} " f"{i/total*100:.2f}% \t ({total} )",
-                end="",
-            )
-
-        remaining_text1 = leaf_texts1[remaining_key1]
+    if key_index_dict1 is None:
+        key_index_dict1 = {k: idx for idx, k in enumerate(data_keys1)}
+    if key_index_dict2 is None:
+        key_index_dict2 = {k: idx for idx, k in enumerate(data_keys2)}
 
+    def get_candidates(key1):
         # Get neighborhood of node in G1
         # Get mapping to G2 for neighborhood nodes
         # Get neighborhood of mapped G2 nodes
         neighborhood_nodes1 = get_neighborhood(
-            data_keys1, remaining_key1, radius, keys_len1, key_index_dict1
+            data_keys1, key1, radius, keys_len1, key_index_dict1
         )
         neighborhood_nodes2 = set()
 
@@ -429,34 +682,129 @@ def map_similar_text_common_neighbors(
 
         # Remove duplicates in G2 neighborhood
         neighborhood_nodes2 = [x for x in neighborhood_nodes2 if x in remaining_keys2]
+        return neighborhood_nodes1, neighborhood_nodes2
+
+    key_queue = deque(remaining_keys1)
+    key_queue_set = set(key_queue)
+    prefetched_keys = set()
+    i = -1  # only to print the process
+    while key_queue:
+        remaining_key1 = key_queue.popleft()
+        key_queue_set.remove(remaining_key1)
+        i += 1  # only to print the process
+        if i % 100 == 0 and printing:
+            total = len(key_queue) + i
+            print(
+                f"\r{printing} " f"{i/total*100:.2f}% \t ({total} )",
+                end="",
+            )
+
+        if remaining_key1 not in prefetched_keys:
+            # Score the current candidates of the next nodes in the queue
+            lookahead_keys = [remaining_key1] + list(islice(key_queue, lookahead - 1))
+            pairs = {}
+            for key1 in lookahead_keys:
+                text1 = leaf_texts1[key1]
+                for key2 in get_candidates(key1)[1]:
+                    text2 = leaf_texts2.get(key2)
+                    if text2 and (text1, text2) not in text_distance_cache:
+                        pairs[(text1, text2)] = None
+            update_textdistance_cache(
+                text_distance_cache, list(pairs), distance_threshold, pool
+            )
+            prefetched_keys.update(lookahead_keys)
+        prefetched_keys.remove(remaining_key1)
+
+        remaining_text1 = leaf_texts1[remaining_key1]
+        neighborhood_nodes1, neighborhood_nodes2 = get_candidates(remaining_key1)
 
         # Find most similar text
         neighborhood_text2 = [leaf_texts2.get(x) for x in neighborhood_nodes2]
         similarity = [
-            cached_text_distance(remaining_text1, x, text_distance_cache, dry_run)
+            cached_text_distance(
+                remaining_text1, x, text_distance_cache, distance_threshold
+            )
             if x
             else 0
             for x in neighborhood_text2
         ]
-        if not dry_run:
-            max_similarity = max(similarity) if similarity else 0
-
-            if max_similarity > distance_threshold:
-                # Add to mapping and update remaining_keys
-                max_index = similarity.index(max_similarity)
-                id2_to_match_to = neighborhood_nodes2[max_index]
-                new_mappings[remaining_key1] = id2_to_match_to
-                remaining_keys2.remove(id2_to_match_to)
-                remaining_keys1.remove(remaining_key1)
-
-                # Requeue neighborhood of newly mapped element
-                neighborhood_to_requeue = [
-                    n
-                    for n in neighborhood_nodes1
-                    if n in remaining_keys1 and n not in key_queue_set
-                ]
-                key_queue.extend(neighborhood_to_requeue)
-                key_queue_set.update(neighborhood_to_requeue)
+        max_similarity = max(similarity) if similarity else 0
+
+        if max_similarity > distance_threshold:
+            # Add to mapping and update remaining_keys
+            max_index = similarity.index(max_similarity)
+            id2_to_match_to = neighborhood_nodes2[max_index]
+            new_mappings[remaining_key1] = id2_to_match_to
+            remaining_keys2.remove(id2_to_match_to)
+            remaining_keys1.remove(remaining_key1)
+
+            # Requeue neighborhood of newly mapped element
+            neighborhood_to_requeue = [
+                n
+                for n in neighborhood_nodes1
+                if n in remaining_keys1 and n not in key_queue_set
+            ]
+            key_queue.extend(neighborhood_to_requeue)
+            key_queue_set.update(neighborhood_to_requeue)
 
     print()
     return text_distance_cache
+
+
+def calc_minhash_signatures(texts, pool=None, chunk_size=1000):
+    if pool is None or len(texts) <= chunk_size:
+        return get_minhash_signatures(texts)
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    return np.concatenate(pool.map(get_minhash_signatures, chunks))
+
+
+def map_similar_text_lsh(
+    new_mappings,
+    data_keys1,
+    data_keys2,
+    leaf_texts1,
+    leaf_texts2,
+    remaining_keys1,
+    remaining_keys2,
+    distance_threshold=0.9,
+    min_text_length=50,
+    pool=None,
+):
+    """
+    Maps remaining nodes to similar remaining nodes regardless of their position.
+    Candidates are proposed by locality-sensitive hashing of MinHash signatures of
+    the texts and verified with the Jaro-Winkler similarity. Candidates are mapped
+    in the order of decreasing similarity if it exceeds the distance_threshold.
+    """
+    # Short texts are too unspecific to be mapped without their neighborhood
+    keys1 = sorted(
+        k for k in remaining_keys1 if len(leaf_texts1[k] or "") >= min_text_length
+    )
+    keys2 = sorted(
+        k for k in remaining_keys2 if len(leaf_texts2[k] or "") >= min_text_length
+    )
+    if not keys1 or not keys2:
+        return
+
+    candidates = get_lsh_candidates(
+        calc_minhash_signatures([leaf_texts1[k] for k in keys1], pool),
+        calc_minhash_signatures([leaf_texts2[k] for k in keys2], pool),
+    )
+    candidates = [(keys1[u], keys2[v]) for u, v in candidates]
+
+    text_distance_cache = {}
+    pairs = list({(leaf_texts1[k1], leaf_texts2[k2]): None for k1, k2 in candidates})
+    update_textdistance_cache(text_distance_cache, pairs, distance_threshold, pool)
+
+    similar = [
+        (text_distance_cache[(leaf_texts1[k1], leaf_texts2[k2])], k1, k2)
+        for k1, k2 in candidates
+    ]
+    similar = [x for x in similar if x[0] > distance_threshold]
+    similar.sort(key=lambda x: (-x[0], x[1], x[2]))
+
+    for _, key1, key2 in similar:
+        if key1 in remaining_keys1 and key2 in remaining_keys2:
+            new_mappings[key1] = key2
+            remaining_keys1.remove(key1)
+            remaining_keys2.remove(key2)
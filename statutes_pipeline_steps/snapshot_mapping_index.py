@@ -1,13 +1,15 @@
 import os
-import pickle
+from multiprocessing import Pool
 
 import networkx as nx
 from lxml import etree
-from quantlaw.utils.files import ensure_exists, list_dir
+from quantlaw.utils.files import ensure_exists
 from quantlaw.utils.pipeline import PipelineStep
 from regex import regex
 
 from utils.common import get_snapshot_law_list
+from utils.snapshot_file_index import list_snapshot_files
+from utils.snapshot_texts_store import SnapshotTextsStore
 
 
 class SnapshotMappingIndexStep(PipelineStep):
@@ -30,11 +32,25 @@ class SnapshotMappingIndexStep(PipelineStep):
         ensure_exists(self.destination)
         items = snapshots
         if not overwrite:
-            existing_files = list_dir(self.destination, ".pickle")
-            items = list(filter(lambda x: (x + ".pickle") not in existing_files, items))
+            items = [
+                item
+                for item in items
+                if not SnapshotTextsStore.exists(os.path.join(self.destination, item))
+            ]
         return items
 
-    def execute_item(self, item):
+    def execute_items(self, items):
+        # The files of a snapshot are processed in parallel. Snapshots are processed
+        # one after another to keep only the texts of one snapshot in memory.
+        processes = self.processes or self.__class__.max_number_of_processes
+        if processes > 1:
+            with Pool(processes) as pool:
+                results = [self.execute_item(item, pool) for item in items]
+        else:
+            results = [self.execute_item(item) for item in items]
+        return self.finish_execution(results)
+
+    def execute_item(self, item, pool=None):
         # Load texts
         item_data = list(
             get_texttags_to_compare(
@@ -42,6 +58,7 @@ class SnapshotMappingIndexStep(PipelineStep):
                 self.source_text,
                 self.law_names_data,
                 self.dataset,
+                pool,
             )
         )
 
@@ -51,10 +68,9 @@ class SnapshotMappingIndexStep(PipelineStep):
 
         keys, citekeys, texts = list(zip(*item_data))
 
-        pickle_path = os.path.join(self.destination, item + ".pickle")
-
-        with open(pickle_path, "wb") as f:
-            pickle.dump(dict(keys=keys, texts=texts, citekeys=citekeys), f)
+        SnapshotTextsStore.write(
+            os.path.join(self.destination, item), keys, citekeys, texts
+        )
 
 
 def load_crossref_graph(item, source):
@@ -63,53 +79,74 @@ def load_crossref_graph(item, source):
     return G
 
 
-def get_texttags_to_compare(snapshot, source_texts, law_names_data, dataset):
-
+def get_snapshot_files(snapshot, source_texts, law_names_data, dataset):
     if dataset == "us":
         if type(source_texts) is str:
             source_texts = [source_texts]
 
         files = sorted(
             [
-                os.path.join(source_text, x)
+                path
                 for source_text in source_texts
-                for x in list_dir(source_text, ".xml")
-                if x.split(".")[0].split("_")[-1] == snapshot
+                for path in list_snapshot_files(source_text, ".xml", snapshot)
             ]
         )
     else:  # is DE
         assert type(source_texts) is str
         files = get_snapshot_law_list(snapshot, law_names_data)
         files = [os.path.join(source_texts, f) for f in files]
-
-    whitespace_pattern = regex.compile(r"[\s\n]+")
-
-    for file in files:
-        tree = etree.parse(file)
-        for text_tag in tree.xpath("//text"):
-            item = text_tag.getparent()
-
-            text_elems = [e for e in item.getchildren() if e.tag == "text"]
-            pos_in_item = text_elems.index(text_tag)
-            text_key = item.attrib["key"] + f"_{pos_in_item}"
-
-            seqitem = get_seqitem(item)
-            if seqitem is not None:
-                citekey = seqitem.attrib.get("citekey")
-            else:
-                citekey = None
-
-            text = etree.tostring(text_tag, method="text", encoding="utf8").decode(
-                "utf-8"
-            )
+    return files
+
+
+def get_texttags_to_compare(snapshot, source_texts, law_names_data, dataset, pool=None):
+    """
+    Yields the texttags of the files of a snapshot in order. The files are
+    processed in parallel if a pool is given.
+    """
+    files = get_snapshot_files(snapshot, source_texts, law_names_data, dataset)
+    files_texttags = (
+        pool.imap(get_file_texttags, files) if pool else map(get_file_texttags, files)
+    )
+    for file_texttags in files_texttags:
+        yield from file_texttags
+
+
+whitespace_pattern = regex.compile(r"[\s\n]+")
+
+
+def get_file_texttags(file):
+    """
+    Returns: a list of tuples of the key, the citekey of the enclosing seqitem and
+        the normalized text of each text element of a file in document order. The
+        key is the key of the parent element and the position of the text among the
+        text elements of the parent.
+
+    The file is traversed once. A stack holds the number of text elements seen so
+    far and the enclosing seqitem of each open element.
+    """
+    tree = etree.parse(file)
+    result = []
+    # Stack of [number of text children, enclosing seqitem] per open element
+    stack = []
+    for event, elem in etree.iterwalk(tree, events=("start", "end")):
+        if event == "end":
+            stack.pop()
+            continue
+
+        seqitem = elem if elem.tag == "seqitem" else (stack[-1][1] if stack else None)
+        stack.append([0, seqitem])
+
+        if elem.tag == "text":
+            parent_state = stack[-2]
+            pos_in_item = parent_state[0]
+            parent_state[0] += 1
+
+            text_key = elem.getparent().attrib["key"] + f"_{pos_in_item}"
+            seqitem = parent_state[1]
+            citekey = seqitem.attrib.get("citekey") if seqitem is not None else None
+
+            text = etree.tostring(elem, method="text", encoding="utf8").decode("utf-8")
             text = whitespace_pattern.sub(" ", text).lower().strip()
 
-            yield text_key, citekey, text
-
-
-def get_seqitem(elem):
-    if elem is None:
-        return None
-    elif elem.tag == "seqitem":
-        return elem
-    return get_seqitem(elem.getparent())
+            result.append((text_key, citekey, text))
+    return result
@@ -0,0 +1,202 @@
+import json
+import os
+from collections import Counter
+
+import networkx as nx
+import pandas as pd
+from quantlaw.utils.files import list_dir
+from quantlaw.utils.pipeline import PipelineStep
+
+from statutes_pipeline_steps.snapshot_mapping_edgelist import mapping_filename
+from utils.temporal_graph_store import INDEX_FILENAME, TemporalGraphStoreWriter
+
+
+class TemporalGraphStep(PipelineStep):
+    """
+    Combines the crossreference graphs of all snapshots and the snapshot mappings
+    between consecutive snapshots into a TemporalGraphStore.
+    """
+
+    max_number_of_processes = 1
+
+    def __init__(self, graph_folder, mapping_folder, destination, *args, **kwargs):
+        self.graph_folder = graph_folder
+        self.mapping_folder = mapping_folder
+        self.destination = destination
+        super().__init__(*args, **kwargs)
+
+    def get_items(self, overwrite, snapshots) -> list:
+        available = [
+            f[: -len(".gpickle.gz")]
+            for f in list_dir(
+                os.path.join(self.graph_folder, "seqitems"), ".gpickle.gz"
+            )
+        ]
+        if snapshots:
+            available = [s for s in available if s in snapshots]
+
+        if not overwrite and os.path.exists(
+            os.path.join(self.destination, INDEX_FILENAME)
+        ):
+            return []
+
+        # The store is built sequentially. Hence, there is a single item.
+        return [sorted(available)] if available else []
+
+    def execute_item(self, item):
+        writer = TemporalGraphStoreWriter(self.destination)
+        next_id = 0
+        previous = None
+        for snapshot in item:
+            G = nx.read_gpickle(f"{self.graph_folder}/seqitems/{snapshot}.gpickle.gz")
+
+            reverse_mapping = {}
+            if previous:
+                previous_snapshot, previous_G, previous_ids = previous
+                mapping_path = os.path.join(
+                    self.mapping_folder, mapping_filename((previous_snapshot, snapshot))
+                )
+                node_mapping = {}
+                if os.path.exists(mapping_path):
+                    with open(mapping_path) as f:
+                        text_mapping = json.load(f)
+                    node_mapping = map_graph_nodes(
+                        text_mapping,
+                        previous_G,
+                        G,
+                        self.load_parent_keys(previous_snapshot),
+                        self.load_parent_keys(snapshot),
+                    )
+                else:
+                    print(f"No snapshot mapping {mapping_path}")
+                node_mapping = add_unchanged_keys(node_mapping, previous_G, G)
+                reverse_mapping = {v: k for k, v in node_mapping.items()}
+
+            ids = {}
+            for key in G.nodes:
+                if key in reverse_mapping:
+                    ids[key] = previous_ids[reverse_mapping[key]]
+                else:
+                    ids[key] = next_id
+                    next_id += 1
+
+            nodes = {ids[key]: dict(attrs) for key, attrs in G.nodes(data=True)}
+            edges = Counter(
+                (ids[u], ids[v], edge_type)
+                for u, v, edge_type in G.edges(data="edge_type")
+            )
+            writer.add_snapshot(snapshot, nodes, edges, G.graph)
+            previous = snapshot, G, ids
+
+        writer.close()
+
+    def load_parent_keys(self, snapshot):
+        """
+        Returns: a dict of keys and parent keys of all nodes including subseqitems
+        """
+        nodes_df = pd.read_csv(
+            f"{self.graph_folder}/{snapshot}.nodes.csv.gz",
+            usecols=["key", "parent_key"],
+            dtype=str,
+        ).dropna()
+        return dict(zip(nodes_df.key, nodes_df.parent_key))
+
+
+###########
+# Functions
+###########
+
+
+def get_text_node_key(text_key):
+    """
+    Returns: the key of the node containing a text. Text keys of the snapshot mapping
+        consist of the key of the node and the position of the text in the node.
+    """
+    return text_key.rsplit("_", 1)[0]
+
+
+def get_graph_node(key, G, parent_keys):
+    """
+    Returns: the key or the nearest ancestor in G. Texts of subseqitems are assigned
+        to their seqitems in this way.
+    """
+    while key is not None and key not in G:
+        key = parent_keys.get(key)
+    return key
+
+
+def select_unique_pairs(votes):
+    """
+    Selects pairs of keys greedily by the number of votes such that each key is
+    selected at most once.
+
+    Args:
+        votes: Counter of (key1, key2) tuples
+
+    Returns: dict mapping key1 to key2
+    """
+    mapping = {}
+    mapped_keys2 = set()
+    for (key1, key2), _ in sorted(votes.items(), key=lambda x: (-x[1], x[0])):
+        if key1 not in mapping and key2 not in mapped_keys2:
+            mapping[key1] = key2
+            mapped_keys2.add(key2)
+    return mapping
+
+
+def get_containment_parents(G):
+    return {
+        v: u
+        for u, v, edge_type in G.edges(data="edge_type")
+        if edge_type == "containment"
+    }
+
+
+def map_graph_nodes(text_mapping, G1, G2, parent_keys1, parent_keys2):
+    """
+    Maps nodes of the crossreference graphs of two snapshots.
+
+    Nodes are mapped if the majority of their mapped texts is mapped to the same node.
+    Afterwards, parents of mapped nodes are mapped by the majority of their mapped
+    children until no further nodes are mapped.
+
+    Returns: dict mapping keys of G1 to keys of G2
+    """
+    votes = Counter()
+    for text_key1, text_key2 in text_mapping.items():
+        key1 = get_graph_node(get_text_node_key(text_key1), G1, parent_keys1)
+        key2 = get_graph_node(get_text_node_key(text_key2), G2, parent_keys2)
+        if key1 is not None and key2 is not None:
+            votes[key1, key2] += 1
+    mapping = select_unique_pairs(votes)
+
+    containment_parents1 = get_containment_parents(G1)
+    containment_parents2 = get_containment_parents(G2)
+    children = mapping
+    while children:
+        mapped_keys2 = set(mapping.values())
+        votes = Counter(
+            (containment_parents1[key1], containment_parents2[key2])
+            for key1, key2 in children.items()
+            if key1 in containment_parents1
+            and key2 in containment_parents2
+            and containment_parents1[key1] not in mapping
+            and containment_parents2[key2] not in mapped_keys2
+        )
+        children = select_unique_pairs(votes)
+        mapping.update(children)
+
+    return mapping
+
+
+def add_unchanged_keys(mapping, G1, G2):
+    """
+    Additionally maps unmapped nodes with the same key in both snapshots, e.g. the
+    root.
+    """
+    mapping = dict(mapping)
+    mapped_keys2 = set(mapping.values())
+    for key in G1.nodes:
+        if key not in mapping and key in G2 and key not in mapped_keys2:
+            mapping[key] = key
+    return mapping
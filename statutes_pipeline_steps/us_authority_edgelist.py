@@ -1,10 +1,9 @@
 import itertools
 import json
 
-import lxml.etree
-
 from statics import US_REG_AUTHORITY_EDGELIST_PATH
 from statutes_pipeline_steps.us_crossreference_edgelist import UsCrossreferenceEdgelist
+from statutes_pipeline_steps.us_crossreference_lookup import parse_file
 
 
 class UsAuthorityEdgelist(UsCrossreferenceEdgelist):
@@ -13,9 +12,8 @@ class UsAuthorityEdgelist(UsCrossreferenceEdgelist):
         assert self.regulations
         return US_REG_AUTHORITY_EDGELIST_PATH
 
-    def make_edge_list(self, yearfile_path, key_dict):
-        with open(yearfile_path, encoding="utf8") as f:
-            file_elem = lxml.etree.parse(f)
+    def make_edge_list(self, yearfile_path, resolver):
+        file_elem = parse_file(yearfile_path)
         edge_list = []
 
         # for debug
@@ -29,7 +27,7 @@ class UsAuthorityEdgelist(UsCrossreferenceEdgelist):
             )
             for ref in refs:
                 key = "_".join(ref[:2])
-                node_in = key_dict.get(key)
+                node_in = resolver.resolve(key)
 
                 if node_in:
                     edge_list.append([node_out, node_in])
@@ -1,24 +1,27 @@
 import json
 import os
 
-import lxml.etree
-import pandas as pd
 from quantlaw.utils.files import ensure_exists, list_dir
 
 from statics import (
     US_CROSSREFERENCE_EDGELIST_PATH,
     US_CROSSREFERENCE_LOOKUP_PATH,
-    US_REFERENCE_PARSED_PATH,
     US_REG_CROSSREFERENCE_EDGELIST_PATH,
     US_REG_CROSSREFERENCE_LOOKUP_PATH,
-    US_REG_REFERENCE_PARSED_PATH,
 )
+from statutes_pipeline_steps.us_crossreference_lookup import (
+    get_snapshot_files,
+    parse_file,
+)
+from utils.citekey_resolver import CitekeyResolver, print_resolver_stats
 from utils.common import RegulationsPipelineStep
+from utils.edgelist_writer import EdgelistWriter
 
 
 class UsCrossreferenceEdgelist(RegulationsPipelineStep):
-    def __init__(self, detailed_crossreferences, *args, **kwargs):
+    def __init__(self, detailed_crossreferences, columnar_format=None, *args, **kwargs):
         self.detailed_crossreferences = detailed_crossreferences
+        self.columnar_format = columnar_format
         super().__init__(*args, **kwargs)
 
     def get_items(self, overwrite, snapshots) -> list:
@@ -53,60 +56,23 @@ class UsCrossreferenceEdgelist(RegulationsPipelineStep):
         ) + ("/detailed" if self.detailed_crossreferences else "")
 
     def execute_item(self, item):
-        yearfiles = [
-            os.path.join(US_REFERENCE_PARSED_PATH, x)
-            for x in list_dir(US_REFERENCE_PARSED_PATH, ".xml")
-            if str(item) in x
-        ]
-        if self.regulations:
-            yearfiles += [
-                os.path.join(US_REG_REFERENCE_PARSED_PATH, x)
-                for x in list_dir(US_REG_REFERENCE_PARSED_PATH, ".xml")
-                if str(item) in x
-            ]
-
-        key_df = pd.read_csv(f"{self.lookup}/{item}.csv").dropna().set_index("citekey")
-        key_dict = {}
-        for idx, val in key_df.key.iteritems():
-            if idx not in key_dict:
-                key_dict[idx] = val
-        edge_list = []
-        for yearfile_path in yearfiles:
-            edge_list_file = self.make_edge_list(yearfile_path, key_dict)
-            edge_list.extend(edge_list_file)
-        if edge_list:
-            df = pd.DataFrame(edge_list, columns=["out_node", "in_node"])
-            df.to_csv(f"{self.dest}/{item}.csv", index=False)
-
-    def make_edge_list(self, yearfile_path, key_dict):
-        with open(yearfile_path, encoding="utf8") as f:
-            file_elem = lxml.etree.parse(f)
-        edge_list = []
-
-        if self.detailed_crossreferences:
-            for ref_elem in file_elem.xpath(".//reference"):
-                node_out = ref_elem.getparent().getparent().attrib.get("key")
-                refs = json.loads(ref_elem.attrib["parsed"])
-                for ref in refs:
-                    for cutoff in range(len(ref), 1, -1):
-                        key = "_".join(ref[:cutoff])
-                        node_in = key_dict.get(key)
-                        if node_in:
-                            edge_list.append([node_out, node_in])
-                            break
-        else:
-            for seqitem_elem in file_elem.xpath("//seqitem"):
-                node_out = seqitem_elem.attrib.get("key")
-                for ref_elem in seqitem_elem.xpath(".//reference"):
-                    refs = json.loads(ref_elem.attrib["parsed"])
-                    for ref in refs:
-                        for cutoff in range(len(ref), 1, -1):
-                            key = "_".join(ref[:cutoff])
-                            node_in = key_dict.get(key)
-                            if node_in:
-                                edge_list.append([node_out, node_in])
-                                break
-        return edge_list
+        resolver = CitekeyResolver.load(f"{self.lookup}/{item}.csv")
+        with EdgelistWriter(
+            f"{self.dest}/{get_filename(item)}",
+            self.columnar_format,
+            write_empty=False,
+        ) as writer:
+            for yearfile_path in get_snapshot_files(item, self.regulations):
+                writer.add_edges(self.make_edge_list(yearfile_path, resolver))
+        return item, resolver.get_stats()
+
+    def finish_execution(self, results):
+        print_resolver_stats(results)
+
+    def make_edge_list(self, yearfile_path, resolver):
+        file_elem = parse_file(yearfile_path)
+        references = get_references(file_elem, self.detailed_crossreferences)
+        return resolve_references(references, resolver)
 
 
 ###########
@@ -116,3 +82,42 @@ class UsCrossreferenceEdgelist(RegulationsPipelineStep):
 
 def get_filename(date):
     return f"{date}.csv"
+
+
+def get_references(file_elem, detailed_crossreferences):
+    """
+    Returns: a list of tuples of the key of the referencing node and the parsed
+        reference, i.e. a list of citekey components
+    """
+    references = []
+    if detailed_crossreferences:
+        for ref_elem in file_elem.xpath(".//reference"):
+            node_out = ref_elem.getparent().getparent().attrib.get("key")
+            for ref in json.loads(ref_elem.attrib["parsed"]):
+                references.append((node_out, ref))
+    else:
+        for seqitem_elem in file_elem.xpath("//seqitem"):
+            node_out = seqitem_elem.attrib.get("key")
+            for ref_elem in seqitem_elem.xpath(".//reference"):
+                for ref in json.loads(ref_elem.attrib["parsed"]):
+                    references.append((node_out, ref))
+    return references
+
+
+def resolve_references(references, resolver):
+    """
+    Resolves references to the node with the longest matching citekey prefix
+    consisting of at least two components. Unresolved references are omitted.
+
+    Args:
+        references: list of tuples of the referencing node and citekey components
+        resolver: CitekeyResolver of the snapshot
+
+    Returns: a list of [out_node, in_node]
+    """
+    edge_list = []
+    for node_out, ref in references:
+        node_in = resolver.resolve_longest_prefix(ref)
+        if node_in:
+            edge_list.append([node_out, node_in])
+    return edge_list
@@ -2,7 +2,7 @@ import os
 
 import lxml.etree
 import pandas as pd
-from quantlaw.utils.files import ensure_exists, list_dir
+from quantlaw.utils.files import ensure_exists
 
 from statics import (
     US_CROSSREFERENCE_LOOKUP_PATH,
@@ -10,12 +10,15 @@ from statics import (
     US_REG_CROSSREFERENCE_LOOKUP_PATH,
     US_REG_REFERENCE_PARSED_PATH,
 )
+from utils.columnar_export import export_columnar
 from utils.common import RegulationsPipelineStep
+from utils.snapshot_file_index import get_snapshot_file_index, list_snapshot_files
 
 
 class UsCrossreferenceLookup(RegulationsPipelineStep):
-    def __init__(self, detailed_crossreferences, *args, **kwargs):
+    def __init__(self, detailed_crossreferences, columnar_format=None, *args, **kwargs):
         self.detailed_crossreferences = detailed_crossreferences
+        self.columnar_format = columnar_format
         super().__init__(*args, **kwargs)
 
     def get_items(self, overwrite, snapshots) -> list:
@@ -24,12 +27,7 @@ class UsCrossreferenceLookup(RegulationsPipelineStep):
         # If snapshots not set, create list of all years
         if not snapshots:
             snapshots = sorted(
-                set(
-                    [
-                        x.split(".")[0].split("_")[-1]
-                        for x in list_dir(US_REFERENCE_PARSED_PATH, ".xml")
-                    ]
-                )
+                get_snapshot_file_index(US_REFERENCE_PARSED_PATH, ".xml")
             )
 
         if not overwrite:
@@ -49,31 +47,48 @@ class UsCrossreferenceLookup(RegulationsPipelineStep):
         ) + ("/detailed" if self.detailed_crossreferences else "")
 
     def execute_item(self, item):
-        yearfiles = [
-            os.path.join(US_REFERENCE_PARSED_PATH, x)
-            for x in list_dir(US_REFERENCE_PARSED_PATH, ".xml")
-            if str(item) in x
-        ]
-        if self.regulations:
-            yearfiles += [
-                os.path.join(US_REG_REFERENCE_PARSED_PATH, x)
-                for x in list_dir(US_REG_REFERENCE_PARSED_PATH, ".xml")
-                if str(item) in x
-            ]
         data = []
-        for file in yearfiles:
-            with open(file, encoding="utf8") as f:
-                file_elem = lxml.etree.parse(f)
-            for node in file_elem.xpath("//*[@citekey]"):
-                data.append([node.attrib["key"], node.attrib["citekey"]])
-            if self.detailed_crossreferences:
-                for node in file_elem.xpath("//*[@citekey_detailed]"):
-                    for citekey in node.attrib["citekey_detailed"].split(","):
-                        data.append([node.attrib["key"], citekey])
-        df = pd.DataFrame(data, columns=["key", "citekey"])
-        destination_file = f"{self.dest}/{get_filename(item)}"
-        df.to_csv(destination_file, index=False)
+        for file in get_snapshot_files(item, self.regulations):
+            file_elem = parse_file(file)
+            data.extend(get_lookup_rows(file_elem, self.detailed_crossreferences))
+        save_lookup(data, self.dest, item, self.columnar_format)
 
 
 def get_filename(year):
     return f"{year}.csv"
+
+
+def get_snapshot_files(snapshot, regulations):
+    """
+    Returns: paths of the parsed files of a snapshot
+    """
+    yearfiles = list_snapshot_files(US_REFERENCE_PARSED_PATH, ".xml", snapshot)
+    if regulations:
+        yearfiles += list_snapshot_files(US_REG_REFERENCE_PARSED_PATH, ".xml", snapshot)
+    return yearfiles
+
+
+def parse_file(path):
+    with open(path, encoding="utf8") as f:
+        return lxml.etree.parse(f)
+
+
+def get_lookup_rows(file_elem, detailed_crossreferences):
+    """
+    Returns: a list of [key, citekey] of all elements with a citekey
+    """
+    data = []
+    for node in file_elem.xpath("//*[@citekey]"):
+        data.append([node.attrib["key"], node.attrib["citekey"]])
+    if detailed_crossreferences:
+        for node in file_elem.xpath("//*[@citekey_detailed]"):
+            for citekey in node.attrib["citekey_detailed"].split(","):
+                data.append([node.attrib["key"], citekey])
+    return data
+
+
+def save_lookup(data, dest, snapshot, columnar_format):
+    df = pd.DataFrame(data, columns=["key", "citekey"])
+    destination_file = f"{dest}/{get_filename(snapshot)}"
+    df.to_csv(destination_file, index=False)
+    export_columnar(df, destination_file, columnar_format, ["key"])
@@ -0,0 +1,72 @@
+import os
+
+from quantlaw.utils.files import ensure_exists
+
+from statics import US_CROSSREFERENCE_EDGELIST_PATH, US_REG_CROSSREFERENCE_EDGELIST_PATH
+from statutes_pipeline_steps.us_crossreference_edgelist import (
+    get_references,
+    resolve_references,
+)
+from statutes_pipeline_steps.us_crossreference_lookup import (
+    UsCrossreferenceLookup,
+    get_filename,
+    get_lookup_rows,
+    get_snapshot_files,
+    parse_file,
+    save_lookup,
+)
+from utils.citekey_resolver import CitekeyResolver, print_resolver_stats
+from utils.edgelist_writer import EdgelistWriter
+
+
+class UsCrossreferenceLookupEdgelist(UsCrossreferenceLookup):
+    """
+    Combines UsCrossreferenceLookup and UsCrossreferenceEdgelist. Each file is parsed
+    once: Citekeys and references are collected from all files of a snapshot and the
+    references are resolved after the lookup of the snapshot is complete. The lookup
+    and the edgelist are written like by the separate steps.
+    """
+
+    def get_items(self, overwrite, snapshots) -> list:
+        ensure_exists(self.edgelist_dest)
+        snapshots = super().get_items(True, snapshots)
+
+        if not overwrite:
+            existing_files = set(os.listdir(self.dest)) & set(
+                os.listdir(self.edgelist_dest)
+            )
+            snapshots = [s for s in snapshots if get_filename(s) not in existing_files]
+
+        return snapshots
+
+    @property
+    def edgelist_dest(self):
+        return (
+            US_REG_CROSSREFERENCE_EDGELIST_PATH
+            if self.regulations
+            else US_CROSSREFERENCE_EDGELIST_PATH
+        ) + ("/detailed" if self.detailed_crossreferences else "")
+
+    def execute_item(self, item):
+        data = []
+        references = []
+        for file in get_snapshot_files(item, self.regulations):
+            file_elem = parse_file(file)
+            data.extend(get_lookup_rows(file_elem, self.detailed_crossreferences))
+            references.extend(get_references(file_elem, self.detailed_crossreferences))
+        save_lookup(data, self.dest, item, self.columnar_format)
+
+        # Rows with empty values are skipped like missing values of the lookup csv
+        resolver = CitekeyResolver(
+            (key, citekey) for key, citekey in data if key and citekey
+        )
+        with EdgelistWriter(
+            f"{self.edgelist_dest}/{get_filename(item)}",
+            self.columnar_format,
+            write_empty=False,
+        ) as writer:
+            writer.add_edges(resolve_references(references, resolver))
+        return item, resolver.get_stats()
+
+    def finish_execution(self, results):
+        print_resolver_stats(results)
@@ -2,8 +2,7 @@ import itertools
 import multiprocessing
 import os
 
-import bs4
-from quantlaw.utils.beautiful_soup import create_soup, save_soup
+from lxml import etree
 from quantlaw.utils.files import ensure_exists, list_dir
 from regex import regex
 
@@ -18,7 +17,7 @@ from statics import (
     US_XML_PATH,
 )
 from statutes_pipeline_steps.us_reference_reg import find_authority_references
-from utils.common import RegulationsPipelineStep
+from utils.common import RegulationsPipelineStep, save_tree
 
 
 class UsReferenceAreasStep(RegulationsPipelineStep):
@@ -43,14 +42,14 @@ class UsReferenceAreasStep(RegulationsPipelineStep):
         dest = (
             US_REG_REFERENCE_AREAS_PATH if self.regulations else US_REFERENCE_AREAS_PATH
         )
-        soup = create_soup(f"{src}/{item}")
-        logs = find_references(soup, usc_pattern, {"pattern": "block"})
-        logs += find_references(soup, inline_pattern, {"pattern": "inline"})
+        tree = etree.parse(f"{src}/{item}")
+        logs = find_references(tree, usc_pattern, {"pattern": "block"})
+        logs += find_references(tree, inline_pattern, {"pattern": "inline"})
 
         if self.regulations:
-            logs += find_authority_references(soup, usc_pattern)
+            logs += find_authority_references(tree, usc_pattern)
 
-        save_soup(soup, f"{dest}/{item}")
+        save_tree(tree, f"{dest}/{item}")
         return logs
 
     def finish_execution(self, results):
@@ -149,48 +148,64 @@ inline_pattern = regex.compile(inline_pattern_string, flags=regex.IGNORECASE)
 ###########
 
 
-def add_tag(string, pos, end, tag):
+following_of_pattern = regex.compile(r"\s?,?of\b")
+
+
+def wrap_matches(string, pattern, attrs, logs):
+    """
+    Splits a string at the matches of a pattern.
+    Returns the text preceding the first reference and a list of reference elements.
+    The text following each reference is set as its tail.
     """
-    Wraps part of a string a given tag
+    pre_text = string
+    ref_elems = []
+    last_match_end = 0
+    for match in pattern.finditer(string):
+        if following_of_pattern.match(string, match.end()):
+            continue
+        ref_elem = etree.Element("reference", attrs)
+        ref_elem.text = match[0]
+        if ref_elems:
+            ref_elems[-1].tail = string[last_match_end : match.start()]
+        else:
+            pre_text = string[: match.start()]
+        last_match_end = match.end()
+        ref_elems.append(ref_elem)
+
+        logs.append(f"{string[match.end():][:50]} --- {match[0]}")  # For debug
+
+    if ref_elems:
+        ref_elems[-1].tail = string[last_match_end:]
+    return pre_text, ref_elems
+
+
+def find_references_in_text_elem(text_elem, pattern, attrs, logs):
     """
-    tag.string = string[pos:end]
-    return [
-        bs4.element.NavigableString(string[:pos]),
-        tag,
-        bs4.element.NavigableString(string[end:]),
-    ]
+    Marks the references in the text and tails directly contained in a text element.
+    Only the element itself is modified. Hence, it can be called on elements of a
+    streaming parse as soon as they are completed.
+    """
+    children = list(text_elem)
+
+    if text_elem.text:
+        text_elem.text, ref_elems = wrap_matches(text_elem.text, pattern, attrs, logs)
+        for idx, ref_elem in enumerate(ref_elems):
+            text_elem.insert(idx, ref_elem)
+
+    for child in children:
+        if child.tail:
+            child.tail, ref_elems = wrap_matches(child.tail, pattern, attrs, logs)
+            for ref_elem in reversed(ref_elems):
+                child.addnext(ref_elem)
 
 
-def find_references(soup, pattern, attrs):
+def find_references(tree, pattern, attrs):
     """
-    Finds the references in the soup and marks them a tag
+    Finds the references in the tree and marks them a tag
     """
     logs = []  # For debug
 
-    text_tags = list(soup.find_all("text"))
-    for text_tag in text_tags:
-        for text_tag_string in list(text_tag.contents):
-            if type(text_tag_string) is not bs4.element.NavigableString:
-                continue
-            tag_cursor = text_tag_string
-            last_match_end = 0
-            matches = pattern.finditer(text_tag_string)
-            for match in list(matches):
-                if regex.match(r"\s?,?of\b", text_tag_string[match.end() :]):
-                    continue
-                ref_tag = soup.new_tag("reference", **attrs)
-                pre_text, ref_tag, post_text = add_tag(
-                    text_tag_string, match.start(), match.end(), ref_tag
-                )
-
-                pre_text = pre_text[last_match_end:]
-                last_match_end = match.end()
-
-                tag_cursor.replace_with(ref_tag)
-                ref_tag.insert_before(pre_text)
-                ref_tag.insert_after(post_text)
-                tag_cursor = post_text
-
-                logs.append(f"{post_text[:50]} --- {match[0]}")  # For debug
+    for text_elem in list(tree.iter("text")):
+        find_references_in_text_elem(text_elem, pattern, attrs, logs)
 
     return logs  # For debug
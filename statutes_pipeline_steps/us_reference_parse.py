@@ -3,9 +3,10 @@ import json
 import multiprocessing
 import os
 from builtins import Exception
+from functools import lru_cache
 
 import regex
-from quantlaw.utils.beautiful_soup import create_soup, save_soup
+from quantlaw.utils.beautiful_soup import create_soup
 from quantlaw.utils.files import ensure_exists, list_dir
 
 from statics import (
@@ -18,12 +19,17 @@ from statics import (
     US_REG_REFERENCE_PARSED_LOG_PATH,
     US_REG_REFERENCE_PARSED_PATH,
 )
-from utils.common import RegulationsPipelineStep
+from utils.common import RegulationsPipelineStep, save_soup
+from utils.parse_cache import get_parse_cache
 
 
 class UsReferenceParseStep(RegulationsPipelineStep):
     max_number_of_processes = max(int(multiprocessing.cpu_count() / 2), 1)
 
+    def __init__(self, parse_cache_path=None, *args, **kwargs):
+        self.parse_cache_path = parse_cache_path
+        super().__init__(*args, **kwargs)
+
     def get_items(self, overwrite) -> list:
         src = (
             US_REG_REFERENCE_AREAS_PATH if self.regulations else US_REFERENCE_AREAS_PATH
@@ -54,16 +60,24 @@ class UsReferenceParseStep(RegulationsPipelineStep):
             else US_REFERENCE_PARSED_PATH
         )
 
+        parse_cache = get_parse_cache(PARSE_CACHE_NAMESPACE, self.parse_cache_path)
+
         soup = create_soup(f"{src}/{item}")
 
         this_title = self.get_title_from_filename(item)
         try:
-            logs = parse_references(soup, this_title, this_usc=not self.regulations)
-            logs += parse_authority_references(soup)
+            logs = parse_references(
+                soup,
+                this_title,
+                this_usc=not self.regulations,
+                parse_cache=parse_cache,
+            )
+            logs += parse_authority_references(soup, parse_cache=parse_cache)
         except Exception:
             print(item)
             raise
         save_soup(soup, f"{dest}/{item}")
+        parse_cache.flush()
         return logs
 
     def finish_execution(self, results):
@@ -95,10 +109,16 @@ class UsReferenceParseStep(RegulationsPipelineStep):
 # Functions
 ###########
 
+# Change the version if the parse results change to invalidate persisted results
+PARSE_CACHE_NAMESPACE = "us_reference_parse_1"
+
+
+leading_digits_pattern = regex.compile(r"^\d*")
+
 
 def sortable_paragraph_number(string):
     MIN_DIGITS = 4
-    digits = len(regex.match(r"^\d*", string)[0])
+    digits = len(leading_digits_pattern.match(string)[0])
     if not digits:
         return string
     return "0 " * (MIN_DIGITS - digits) + string
@@ -124,15 +144,19 @@ sub_split_pattern = regex.compile(
 )
 
 
+enum_type_patterns = [
+    regex.compile(r"[a-z]"),
+    regex.compile(r"\d+"),
+    regex.compile(r"[A-Z]"),
+    regex.compile(r"[xvi]x{0,4}v?i{0,4}"),
+    regex.compile(r"[XVI]X{0,4}V?I{0,4}"),
+    regex.compile(r"([a-z])\1"),
+]
+
+
+@lru_cache(maxsize=4096)
 def get_enum_types(string):
-    return (
-        bool(regex.fullmatch(r"[a-z]", string)),
-        bool(regex.fullmatch(r"\d+", string)),
-        bool(regex.fullmatch(r"[A-Z]", string)),
-        bool(regex.fullmatch(r"[xvi]x{0,4}v?i{0,4}", string)),
-        bool(regex.fullmatch(r"[XVI]X{0,4}V?I{0,4}", string)),
-        bool(regex.fullmatch(r"([a-z])\1", string)),
-    )
+    return tuple(bool(pattern.fullmatch(string)) for pattern in enum_type_patterns)
 
 
 def enum_types_match(x, y):
@@ -187,46 +211,68 @@ def split_block_reference(reference_str, debug_context=None):
     return usc, title, sub_text
 
 
-def parse_references(soup, this_title, this_usc):
+def parse_reference_string(pattern, reference_str, this_title, this_usc):
+    """
+    Parses the string of a reference area.
+
+    Returns: The part of the string containing the sections and the parsed references
+        as JSON string.
+    """
+    # Split into title and subtitle
+    last_usc = None
+    last_title = None
+    if pattern == "block":
+        usc, title, sub_text = split_block_reference(
+            reference_str, debug_context=reference_str
+        )
+        text_parts = split_pattern_inline.split(sub_text)
+        if len(text_parts) == 2:
+            last_title, last_usc = extract_title_inline(
+                text_parts[1].strip(), this_title, this_usc
+            )
+            sub_text = text_parts[0]
+        elif len(text_parts) > 2:
+            raise Exception(reference_str)
+
+    elif pattern == "inline":
+        text_parts = split_pattern_inline.split(reference_str)
+        if len(text_parts) == 2:
+            title, usc = extract_title_inline(
+                text_parts[1].strip(), this_title, this_usc
+            )
+            sub_text = text_parts[0]
+        elif len(text_parts) == 1:
+            title = this_title
+            sub_text = text_parts[0].strip()
+            usc = this_usc
+        else:
+            raise Exception(reference_str)
+    else:
+        raise Exception(f"{reference_str} has not matching pattern")
+
+    references = parse_reference_text(sub_text)
+    add_title_to_reference(references, title, usc, last_title, last_usc)
+
+    return sub_text, json.dumps(references, ensure_ascii=False)
+
+
+def parse_references(soup, this_title, this_usc, parse_cache=None):
     test_list = []  # For debug
     for ref_tag in soup.find_all("reference"):
-        # Split into title and subtitle
-        last_usc = None
-        last_title = None
-        if ref_tag["pattern"] == "block":
-            usc, title, sub_text = split_block_reference(
-                ref_tag.string, debug_context=ref_tag
-            )
-            text_parts = split_pattern_inline.split(sub_text)
-            if len(text_parts) == 2:
-                last_title, last_usc = extract_title_inline(
-                    text_parts[1].strip(), this_title, this_usc
-                )
-                sub_text = text_parts[0]
-            elif len(text_parts) > 2:
-                raise Exception(str(ref_tag))
-
-        elif ref_tag["pattern"] == "inline":
-            text_parts = split_pattern_inline.split(ref_tag.string)
-            if len(text_parts) == 2:
-                title, usc = extract_title_inline(
-                    text_parts[1].strip(), this_title, this_usc
+        args = (ref_tag["pattern"], ref_tag.string, this_title, this_usc)
+        try:
+            if parse_cache:
+                sub_text, parsed = parse_cache.get_or_compute(
+                    args, parse_reference_string, *args
                 )
-                sub_text = text_parts[0]
-            elif len(text_parts) == 1:
-                title = this_title
-                sub_text = text_parts[0].strip()
-                usc = this_usc
             else:
-                raise Exception(str(ref_tag))
-        else:
-            raise Exception(f"{str(ref_tag)} has not matching pattern")
-
-        references = parse_reference_text(sub_text)
-        add_title_to_reference(references, title, usc, last_title, last_usc)
+                sub_text, parsed = parse_reference_string(*args)
+        except Exception:
+            print(str(ref_tag))
+            raise
 
-        ref_tag["parsed"] = json.dumps(references, ensure_ascii=False)
-        test_list.append(f"{sub_text} -- {json.dumps(references, ensure_ascii=False)}")
+        ref_tag["parsed"] = parsed
+        test_list.append(f"{sub_text} -- {parsed}")
     return test_list
 
 
@@ -247,43 +293,63 @@ def add_title_to_reference(references, title, usc, last_title=None, last_usc=Non
         references[-1][0] = title_str
 
 
-def parse_reference_text(sub_text):
-    # Preformat ranges
-    for match in regex.finditer(
-        r"(\d+[a-z]{0,3})[\-\–\—](\d+[a-z]{0,3})",
-        sub_text,
-        flags=regex.IGNORECASE,
-    ):
-        if sortable_paragraph_number(match[1]) <= sortable_paragraph_number(match[2]):
-            sub_text = (
-                f"{sub_text[:match.start()]}{match[1]} through "
-                f"{match[2]}{sub_text[match.end():]}"
+range_pattern = regex.compile(
+    r"(\d+[a-z]{0,3})[\-\–\—](\d+[a-z]{0,3})", flags=regex.IGNORECASE
+)
+reference_part_pattern = regex.compile(
+    r"(?:§+|sec\.|sections?\b|(?:sub)?parts?\b)?\s*"
+    r"(\d+[a-z]{0,3}(?:[\-\–\—\.]\d+[a-z]{0,3})?)"
+    r"\s?"
+    r"((?:\((?:\d*[a-z]{0,4})\))*)"
+    r"("
+    r" et\.? seq\.?|"
+    r" and following"
+    r")?",
+    flags=regex.IGNORECASE,
+)
+sub_sections_split_pattern = regex.compile(r"[\(\)]+")
+
+
+def expand_ranges(sub_text):
+    """
+    Replaces ranges like "1-3" with "1 through 3" if the range is ascending.
+    """
+    ranges = [
+        match
+        for match in range_pattern.finditer(sub_text)
+        if sortable_paragraph_number(match[1]) <= sortable_paragraph_number(match[2])
+    ]
+    # The offsets of the matches refer to the original text, whereas the text is
+    # modified after the first replacement. This is kept for multiple ranges so that
+    # the results equal those of previous versions.
+    for match in ranges:
+        sub_text = "".join(
+            (
+                sub_text[: match.start()],
+                match[1],
+                " through ",
+                match[2],
+                sub_text[match.end() :],
             )
+        )
+    return sub_text
+
+
+def parse_reference_text(sub_text):
+    sub_text = expand_ranges(sub_text)
 
     sub_text = sub_text.replace(" and following", " et. seq.").strip()
 
     references = []
-    text_sub_splitted = sub_split_pattern.split(sub_text)
-    for test_text in text_sub_splitted:
-        match = regex.fullmatch(
-            r"(?:§+|sec\.|sections?\b|(?:sub)?parts?\b)?\s*"
-            r"(\d+[a-z]{0,3}(?:[\-\–\—\.]\d+[a-z]{0,3})?)"
-            r"\s?"
-            r"((?:\((?:\d*[a-z]{0,4})\))*)"
-            r"("
-            r" et\.? seq\.?|"
-            r" and following"
-            r")?",
-            test_text,
-            flags=regex.IGNORECASE,
-        )
+    for test_text in sub_split_pattern.split(sub_text):
+        match = reference_part_pattern.fullmatch(test_text)
         if not match:
-            # test_list.append(f'{test_text} -- {sub_text} -- {file}')
             continue
         sections = [match[1]]
-        sub_sections = regex.split(r"[\(\)]+", match[2])
-        sub_sections = [o for o in sub_sections if len(o)]
-        sections.extend(sub_sections)
+        if match[2]:
+            sections.extend(
+                o for o in sub_sections_split_pattern.split(match[2]) if len(o)
+            )
 
         if sections[0]:
             references.append(sections)
@@ -1,7 +1,8 @@
 import json
 
 from bs4 import BeautifulSoup
-from regex.regex import Match
+from lxml import etree
+from regex import Pattern
 
 from statutes_pipeline_steps.us_reference_parse import (
     add_title_to_reference,
@@ -10,27 +11,43 @@ from statutes_pipeline_steps.us_reference_parse import (
 )
 
 
-def find_authority_references(soup: BeautifulSoup, pattern: Match):
+def find_authority_references_in_elem(elem, pattern: Pattern):
+    auth_text = elem.attrib["auth_text"]
+    matches = [m[0] for m in pattern.finditer(auth_text)]
+    elem.attrib["auth_text_areas"] = json.dumps(matches, ensure_ascii=False)
+
+
+def find_authority_references(tree: etree._ElementTree, pattern: Pattern):
     logs = []
 
-    for tag in soup.find_all(auth_text=True):
-        auth_text = tag.attrs["auth_text"]
-        matches = [m[0] for m in pattern.finditer(auth_text)]
-        tag.attrs["auth_text_areas"] = json.dumps(matches, ensure_ascii=False)
+    for elem in tree.xpath("//*[@auth_text]"):
+        find_authority_references_in_elem(elem, pattern)
     return logs
 
 
-def parse_authority_references(soup: BeautifulSoup):
+def parse_authority_area(auth_area, debug_context=None):
+    usc, title, sub_text = split_block_reference(auth_area, debug_context=debug_context)
+    references = parse_reference_text(sub_text)
+    add_title_to_reference(references, title, usc)
+    return references
+
+
+def parse_authority_references(soup: BeautifulSoup, parse_cache=None):
     logs = []
     for tag in soup.find_all(auth_text_areas=True):
         auth_areas = json.loads(tag.attrs["auth_text_areas"])
         auth_parsed = []
         for auth_area in auth_areas:
-            usc, title, sub_text = split_block_reference(
-                auth_area, debug_context=tag.attrs["auth_text"]
-            )
-            references = parse_reference_text(sub_text)
-            add_title_to_reference(references, title, usc)
+            debug_context = tag.attrs["auth_text"]
+            if parse_cache:
+                references = parse_cache.get_or_compute(
+                    ("authority", auth_area),
+                    parse_authority_area,
+                    auth_area,
+                    debug_context,
+                )
+            else:
+                references = parse_authority_area(auth_area, debug_context)
             auth_parsed.append(references)
         tag.attrs["auth_text_parsed"] = json.dumps(auth_parsed, ensure_ascii=False)
     return logs
@@ -0,0 +1,50 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from utils.column_buffers import MISSING, ColumnBuffers
+
+
+class TestColumnBuffers(unittest.TestCase):
+    def test_add_rows(self):
+        nodes = ColumnBuffers(["key", "level", "type"], ["level"], capacity=2)
+        nodes.add_rows(dict(key=["root"], level=[-1]))
+        nodes.add_rows(dict(key=["a", "b"], level=[0, None], type=["item", "item"]))
+        edges = ColumnBuffers(["u", "v"], interned=nodes)
+        edges.add_rows(dict(u=["root", "a"], v=["a", "c"]))
+
+        self.assertEqual(nodes.num_rows, 3)
+        self.assertGreaterEqual(nodes.capacity, 3)
+        self.assertEqual(list(nodes), ["key", "level", "type"])
+        self.assertEqual(nodes["key"], ["root", "a", "b"])
+        self.assertEqual(nodes["level"], [-1, 0, None])
+        self.assertEqual(nodes["type"], [None, "item", "item"])
+        self.assertEqual(edges["v"], ["a", "c"])
+
+        # Values are interned once in the shared table
+        self.assertEqual(nodes.values, ["root", "a", "b", "item", "c"])
+        self.assertEqual(edges.get_codes("u").tolist(), [0, 1])
+        self.assertEqual(nodes.get_code("item"), 3)
+        self.assertEqual(nodes.get_code("subseqitem"), MISSING)
+
+    def test_to_csv(self):
+        nodes = ColumnBuffers(["key", "level", "heading"], ["level"])
+        nodes.add_rows(dict(key=["root"], level=[-1]))
+        nodes.add_rows(
+            dict(key=["a", "b", "c"], level=[0, 1, 1], heading=["A", "", "C"])
+        )
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "nodes.csv.gz")
+            # Chunks smaller than the table
+            nodes.to_csv(path, chunk_size=3)
+            with gzip.open(path, "rt") as f:
+                self.assertEqual(
+                    f.read(), "key,level,heading\nroot,-1,\na,0,A\nb,1,\nc,1,C\n"
+                )
+
+            path = os.path.join(folder, "empty.csv")
+            ColumnBuffers(["u", "v"]).to_csv(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), "u,v\n")
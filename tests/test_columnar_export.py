@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from utils.columnar_export import (
+    COLUMNAR_FORMATS,
+    export_columnar,
+    get_columnar_path,
+    load_columnar,
+)
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestColumnarExport(unittest.TestCase):
+    def test_get_columnar_path(self):
+        self.assertEqual(
+            "a/2010.nodes.parquet", get_columnar_path("a/2010.nodes.csv.gz", "parquet")
+        )
+        self.assertEqual("a/2010.arrow", get_columnar_path("a/2010.csv", "arrow"))
+        self.assertEqual(
+            "a/2010_2011.arrow", get_columnar_path("a/2010_2011.json", "arrow")
+        )
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_export_columnar(self):
+        columns = dict(key=["a", "b", "a"], level=[1, None, 2])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "test.csv")
+            for columnar_format, extension in COLUMNAR_FORMATS.items():
+                export_columnar(columns, path, columnar_format, ["key"])
+                table = load_columnar(os.path.join(tmp_dir, f"test{extension}"))
+                self.assertEqual(columns, table.to_pydict())
+                self.assertTrue(pyarrow.types.is_dictionary(table.schema[0].type))
+
+    def test_export_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_columnar(dict(key=["a"]), os.path.join(tmp_dir, "test.csv"), None)
+            self.assertEqual([], os.listdir(tmp_dir))
@@ -1,7 +1,21 @@
 import argparse
+import os
+import tempfile
 import unittest
 
-from utils.common import str_to_bool
+from bs4 import BeautifulSoup
+
+from utils.common import save_soup, str_to_bool
+
+SOUP_DOCUMENTS = [
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<document key="a_b" heading="x &amp; &lt;y&gt;">\n\n\n'
+    '<item a="1">\n\n<seqitem>t\n\n\n\nx<text>a&amp;b\n\n</text></seqitem>\n\n</item>'
+    "<item/>\n<!-- c -->\n</document>\n",
+    "<document/>",
+    "<document>\n<item>\n\n</item>\n\n\n\n\n</document>",
+    '<x:document xmlns:x="http://e"><x:item k="v">t</x:item></x:document>',
+]
 
 
 class TestCommon(unittest.TestCase):
@@ -12,3 +26,22 @@ class TestCommon(unittest.TestCase):
         self.assertTrue(str_to_bool(True))
         with self.assertRaises(argparse.ArgumentTypeError):
             str_to_bool("hell!")
+
+    def test_save_soup(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "test.xml")
+            for document in SOUP_DOCUMENTS:
+                with self.subTest(document=document):
+                    soup = BeautifulSoup(document, "lxml-xml")
+
+                    save_soup(soup, path)
+                    with open(path, encoding="utf8") as f:
+                        self.assertEqual(str(soup), f.read())
+
+                    save_soup(
+                        soup, path, stylesheet="style.css", collapse_newlines=True
+                    )
+                    output_lines = str(soup).replace("\n\n", "\n").split("\n")
+                    output_lines.insert(1, '<?xml-stylesheet href="style.css"?>')
+                    with open(path, encoding="utf8") as f:
+                        self.assertEqual("\n".join(output_lines), f.read())
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from statutes_pipeline_steps import (
+    de_crossreference_edgelist,
+    us_crossreference_edgelist,
+)
+from statutes_pipeline_steps.us_authority_edgelist import UsAuthorityEdgelist
+from utils.citekey_resolver import CitekeyResolver
+
+LOOKUP_ROWS = [
+    ("a", "usc_1"),
+    ("b", "usc_1_2"),
+    ("c", "usc_1_2"),
+    ("d", "GG_1"),
+]
+
+
+class TestCrossreferenceEdgelist(unittest.TestCase):
+    def test_citekey_resolver(self):
+        resolver = CitekeyResolver(LOOKUP_ROWS)
+        self.assertEqual(resolver.resolve("usc_1_2"), "b")
+        self.assertIsNone(resolver.resolve("usc_2"))
+        self.assertEqual(resolver.resolve_longest_prefix(["usc", "1", "3"]), "a")
+        self.assertIsNone(resolver.resolve_longest_prefix(["usc"]))
+        self.assertEqual(resolver.get_stats(), dict(resolved=2, ambiguous=1, missed=2))
+
+    def test_resolve_longest_prefix(self):
+        resolver = CitekeyResolver(LOOKUP_ROWS + [("e", "usc_1_2_a_b")])
+        # Components may contain underscores
+        self.assertEqual(resolver.resolve_longest_prefix(["usc", "1_2", "a_b"]), "e")
+        self.assertEqual(resolver.resolve_longest_prefix(["usc", "1_2", "a"]), "b")
+        self.assertEqual(resolver.resolve_longest_prefix(["usc", "1", "2_a"]), "a")
+        self.assertIsNone(resolver.resolve_longest_prefix(["usc", "1"], min_length=3))
+
+    def test_us_resolve_references(self):
+        references = [
+            ("x", ["usc", "1", "2", "3"]),
+            ("x", ["usc", "1", "3"]),
+            ("y", ["usc", "2"]),
+        ]
+        resolver = CitekeyResolver(LOOKUP_ROWS)
+        self.assertEqual(
+            us_crossreference_edgelist.resolve_references(references, resolver),
+            [["x", "b"], ["x", "a"]],
+        )
+        self.assertEqual(resolver.get_stats()["missed"], 1)
+
+    def test_de_resolve_references(self):
+        references = [("x", ["GG", "1", "2"]), ("y", ["GG", "2"])]
+        resolver = CitekeyResolver(LOOKUP_ROWS)
+        self.assertEqual(
+            de_crossreference_edgelist.resolve_references(references, resolver),
+            [("x", "d")],
+        )
+
+    def test_us_authority_edgelist(self):
+        # Only the authority references are edges, not the references in the text
+        references = json.dumps([["usc", "1", "2"]]).replace('"', "&quot;")
+        authorities = json.dumps([[["GG", "1", "3"]]]).replace('"', "&quot;")
+        xml = (
+            '<document key="doc">'
+            f'<seqitem key="s1" auth_text_parsed="{authorities}">'
+            f'<text><reference parsed="{references}">1 U.S.C. 2</reference></text>'
+            "</seqitem>"
+            "</document>"
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            xml_path = os.path.join(folder, "cfr01_2001.xml")
+            with open(xml_path, "w") as f:
+                f.write(xml)
+            with open(os.path.join(folder, "2001.csv"), "w") as f:
+                f.write("key,citekey\nb,usc_1_2\nd,GG_1\n")
+
+            class TestUsAuthorityEdgelist(UsAuthorityEdgelist):
+                dest = os.path.join(folder, "edgelist")
+                lookup = folder
+
+            os.makedirs(TestUsAuthorityEdgelist.dest)
+
+            step = TestUsAuthorityEdgelist(False, regulations=True)
+            with mock.patch.object(
+                us_crossreference_edgelist,
+                "get_snapshot_files",
+                return_value=[xml_path],
+            ):
+                step.execute_item("2001")
+
+            with open(os.path.join(folder, "edgelist", "2001.csv")) as f:
+                self.assertEqual(f.read(), "out_node,in_node\ns1,d\n")
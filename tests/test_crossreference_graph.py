@@ -0,0 +1,63 @@
+import unittest
+
+from statutes_pipeline_steps.crossreference_graph import (
+    EDGE_COLUMNS,
+    NODE_COLUMNS,
+    NUMERIC_NODE_COLUMNS,
+    build_seqitem_graph,
+)
+from utils.column_buffers import ColumnBuffers
+
+
+class TestCrossreferenceGraph(unittest.TestCase):
+    def test_build_seqitem_graph(self):
+        nodes = ColumnBuffers(NODE_COLUMNS, NUMERIC_NODE_COLUMNS, capacity=2)
+        nodes.add_rows(dict(key=["root"], level=[-1], law_name=["root"]))
+        nodes.add_rows(
+            dict(
+                key=["a", "a_1", "a_1_1"],
+                level=[0, 1, 2],
+                citekey=["", "A 1", None],
+                type=["document", "seqitem", "subseqitem"],
+                chars_n=[10, 5, 2],
+            ),
+        )
+        edges = ColumnBuffers(EDGE_COLUMNS, interned=nodes)
+        edges.add_rows(
+            dict(
+                u=["root", "a", "a_1", "a_1"],
+                v=["a", "a_1", "a_1_1", "a"],
+                edge_type=["containment", "containment", "containment", "reference"],
+            )
+        )
+
+        G = build_seqitem_graph(2020, nodes, edges)
+
+        self.assertEqual("2020", G.graph["name"])
+        self.assertEqual(["root", "a", "a_1"], list(G.nodes))
+        self.assertEqual(dict(key="root", level=-1, law_name="root"), G.nodes["root"])
+        self.assertEqual(
+            dict(key="a_1", level=1, citekey="A 1", type="seqitem", chars_n=5.0),
+            G.nodes["a_1"],
+        )
+        self.assertIsInstance(G.nodes["a_1"]["chars_n"], float)
+        self.assertNotIn("citekey", G.nodes["a"])
+        self.assertEqual(
+            [
+                ("root", "a", {"edge_type": "containment"}),
+                ("a", "a_1", {"edge_type": "containment"}),
+                ("a_1", "a", {"edge_type": "reference"}),
+            ],
+            list(G.edges(data=True)),
+        )
+
+    def test_build_seqitem_graph_without_subseqitems(self):
+        nodes = ColumnBuffers(NODE_COLUMNS, NUMERIC_NODE_COLUMNS)
+        nodes.add_rows(dict(key=["root", "a"], level=[-1, 0], type=[None, "document"]))
+        edges = ColumnBuffers(EDGE_COLUMNS, interned=nodes)
+        edges.add_rows(dict(u=["root"], v=["a"], edge_type=["containment"]))
+
+        G = build_seqitem_graph(2020, nodes, edges)
+
+        self.assertEqual(["root", "a"], list(G.nodes))
+        self.assertEqual(1, G.number_of_edges())
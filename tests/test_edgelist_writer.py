@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.edgelist_writer import EdgelistWriter
+
+
+class TestEdgelistWriter(unittest.TestCase):
+    def test_equals_to_csv(self):
+        blocks = [[("a", "b"), ("a,1", 'c"2')], [], [("d", None)]]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "edges.csv")
+            with EdgelistWriter(path) as writer:
+                for block in blocks:
+                    writer.add_edges(block)
+
+            expected_path = os.path.join(folder, "expected.csv")
+            pd.DataFrame(
+                [edge for block in blocks for edge in block],
+                columns=["out_node", "in_node"],
+            ).to_csv(expected_path, index=False)
+
+            with open(path) as f, open(expected_path) as f_expected:
+                self.assertEqual(f.read(), f_expected.read())
+
+    def test_empty(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "edges.csv")
+            with EdgelistWriter(path, write_empty=False) as writer:
+                writer.add_edges([])
+            self.assertFalse(os.path.exists(path))
+
+            with EdgelistWriter(path) as writer:
+                writer.add_edges([])
+            with open(path) as f:
+                self.assertEqual(f.read(), "out_node,in_node\n")
+
+    def test_error(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "edges.csv")
+            with self.assertRaises(ValueError):
+                with EdgelistWriter(path) as writer:
+                    writer.add_edges([("a", "b")])
+                    raise ValueError()
+            self.assertFalse(os.path.exists(path))
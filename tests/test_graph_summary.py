@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from statutes_pipeline_steps.graph_summary import GraphSummaryStep, summarize_graph
+
+NODES = pd.DataFrame(
+    dict(
+        key=["root", "a", "a_1", "a_1_1", "a_2", "b", "b_1"],
+        level=[-1, 0, 1, 2, 1, 0, 1],
+        type=[
+            None,
+            "document",
+            "seqitem",
+            "subseqitem",
+            "seqitem",
+            "document",
+            "seqitem",
+        ],
+        law_name=["root", "A", "A", "A", "A", "B", "B"],
+        tokens_n=[None, 10, 6, 2, 4, 5, 5],
+        chars_n=[None, 50, 30, 10, 20, 25, 25],
+    )
+)
+EDGES = pd.DataFrame(
+    dict(
+        u=["root", "root", "a", "a_1", "a", "b", "a_1", "a_1", "a_1_1", "b_1"],
+        v=["a", "b", "a_1", "a_1_1", "a_2", "b_1", "b_1", "b_1", "b_1", "a_2"],
+        edge_type=["containment"] * 6 + ["reference"] * 4,
+    )
+)
+
+
+class TestGraphSummary(unittest.TestCase):
+    def test_summarize_graph(self):
+        summary = summarize_graph(NODES, EDGES)
+
+        node_counts = summary["node_counts"].set_index(["type", "level"]).nodes_n
+        self.assertEqual(node_counts["seqitem", 1], 3)
+        self.assertEqual(node_counts["document", 0], 2)
+
+        laws = summary["laws"].set_index("law_name")
+        self.assertEqual(laws.loc["A", "nodes_n"], 4)
+        self.assertEqual(laws.loc["A", "seqitems_n"], 2)
+        self.assertEqual(laws.loc["A", "tokens_n"], 10)
+        self.assertEqual(laws.loc["A", "reference_edges_out"], 3)
+        self.assertEqual(laws.loc["A", "reference_edges_in"], 1)
+        self.assertEqual(laws.loc["B", "reference_edges_in"], 3)
+        self.assertEqual(laws.loc["B", "authority_edges_out"], 0)
+
+        # References of subseqitems are not part of the seqitem graph
+        degrees = summary["degrees"].set_index("key")
+        self.assertEqual(degrees.loc["a_1", "out_degree"], 2)
+        self.assertEqual(degrees.loc["b_1", "in_degree"], 2)
+        self.assertEqual(degrees.loc["a_2", "in_degree"], 1)
+        self.assertEqual(degrees.loc["a_2", "out_degree"], 0)
+
+    def test_incremental_update(self):
+        with tempfile.TemporaryDirectory() as source:
+            destination = os.path.join(source, "summary")
+            for snapshot in ["2019", "2020"]:
+                NODES.to_csv(f"{source}/{snapshot}.nodes.csv.gz", index=False)
+                EDGES.to_csv(f"{source}/{snapshot}.edges.csv.gz", index=False)
+
+            step = GraphSummaryStep(source, destination, processes=1)
+            items = step.get_items(False, None)
+            self.assertEqual(items, ["2019", "2020"])
+            step.execute_items(items)
+            self.assertEqual(step.get_items(False, None), [])
+
+            # A rebuilt graph is summarized again
+            os.utime(f"{source}/2020.edges.csv.gz", (1e10, 1e10))
+            self.assertEqual(step.get_items(False, None), ["2020"])
+
+            index = pd.read_csv(f"{destination}/index.laws.csv.gz", dtype=str)
+            self.assertEqual(list(index.snapshot), ["2019", "2019", "2020", "2020"])
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from statutes_pipeline_steps.hierarchy_graph import build_graph, load_hierarchy_graph
+from utils.hierarchy_arrays import HierarchyArrays
+
+XML = (
+    '<document key="d" level="0" heading="Law" abbr_1="L">'
+    '<item key="i" level="1">'
+    '<seqitem key="s1" level="2"><text>a b  b</text><!-- c d --> e</seqitem>'
+    '<seqitem key="s2" level="2"><text>f</text><text>g\xa0h</text></seqitem>'
+    "</item>"
+    "</document>"
+)
+
+
+class TestHierarchyGraph(unittest.TestCase):
+    def test_build_graph(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "test.xml")
+            with open(path, "w", encoding="utf8") as f:
+                f.write(XML)
+            G = build_graph(path)
+
+        for key, text in [
+            ("d", "a b  b  e f g\xa0h"),
+            ("i", "a b  b  e f g\xa0h"),
+            ("s1", "a b  b  e"),
+            ("s2", "f g\xa0h"),
+        ]:
+            node = G.nodes[key]
+            self.assertEqual(len(text), node["chars_n"])
+            self.assertEqual(len("".join(text.split())), node["chars_nowhites"])
+            self.assertEqual(len(text.split()), node["tokens_n"])
+            self.assertEqual(len(set(text.split())), node["tokens_unique"])
+
+        self.assertEqual("1,2", G.nodes["s2"]["texts_tokens_n"])
+        self.assertEqual("1,2", G.nodes["s2"]["texts_chars_n"])
+        self.assertEqual("3", G.nodes["s1"]["texts_tokens_n"])
+        self.assertNotIn("texts_tokens_n", G.nodes["i"])
+
+    def test_hierarchy_arrays(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "test.xml")
+            with open(path, "w", encoding="utf8") as f:
+                f.write(XML)
+            G = build_graph(path)
+
+            arrays_path = os.path.join(tmp_dir, "test.npz")
+            HierarchyArrays.from_graph(G).save(arrays_path)
+            loaded = load_hierarchy_graph(arrays_path)
+
+        self.assertEqual(G.graph, loaded.graph)
+        self.assertEqual(list(G.edges), list(loaded.edges))
+        self.assertEqual(
+            [(n, list(d.items())) for n, d in G.nodes(data=True)],
+            [(n, list(d.items())) for n, d in loaded.nodes(data=True)],
+        )
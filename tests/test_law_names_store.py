@@ -0,0 +1,29 @@
+import pickle
+import tempfile
+import unittest
+
+from utils.law_names_store import LawNamesStore
+
+
+class TestLawNamesStore(unittest.TestCase):
+    def test_store(self):
+        dated_law_names = {
+            "20190101": {"bgb": "BGB", "strafgesetzbuch": "StGB"},
+            "20180101": {"bgb": "BGB", "bürgerlich gesetzbuch": "BGB"},
+            "20200101": {},
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            LawNamesStore.write(tmp_dir, dated_law_names)
+            store = LawNamesStore(tmp_dir)
+
+            self.assertEqual(sorted(dated_law_names), list(store))
+            self.assertEqual(dated_law_names, dict(store.items()))
+            self.assertNotIn("20170101", store)
+            with self.assertRaises(KeyError):
+                store["20210101"]
+
+            store["20190101"]["grundgesetz"] = "GG"
+            self.assertNotIn("grundgesetz", store["20190101"])
+
+            unpickled = pickle.loads(pickle.dumps(store))
+            self.assertEqual(dated_law_names, dict(unpickled.items()))
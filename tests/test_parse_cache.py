@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+from utils.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def test_lru(self):
+        cache = ParseCache("test", maxsize=2)
+        cache.set(("a",), 1)
+        cache.set(("b",), 2)
+        cache.get(("a",))
+        cache.set(("c",), 3)
+        self.assertEqual(1, cache.get(("a",)))
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(3, cache.get_or_compute(("c",), lambda: 4))
+        self.assertEqual(5, cache.get_or_compute(("d",), lambda x: x, 5))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache.sqlite")
+            cache = ParseCache("test", path=path)
+            cache.set(("§ 3 Abs. 1", 42, True), ["x", [["3", "1"]]])
+            cache.flush()
+
+            cache = ParseCache("test", path=path)
+            self.assertEqual(["x", [["3", "1"]]], cache.get(("§ 3 Abs. 1", 42, True)))
+            self.assertIsNone(cache.get(("§ 3 Abs. 1", 42, False)))
+            self.assertIsNone(
+                ParseCache("other", path=path).get(("§ 3 Abs. 1", 42, True))
+            )
@@ -0,0 +1,26 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.snapshot_cache import SnapshotCache
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def test_get(self):
+        loaded = []
+
+        def load(snapshot):
+            loaded.append(snapshot)
+            return dict(snapshot=snapshot)
+
+        cache = SnapshotCache(load, 2)
+        for snapshot in ["2000", "2001", "2001", "2002", "2001", "2000"]:
+            self.assertEqual(cache.get(snapshot), dict(snapshot=snapshot))
+        self.assertEqual(loaded, ["2000", "2001", "2002", "2000"])
+        self.assertEqual(list(cache.entries), ["2001", "2000"])
+
+    def test_concurrent_get(self):
+        loaded = []
+        cache = SnapshotCache(loaded.append, 10)
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(cache.get, ["2000", "2001"] * 20))
+        self.assertEqual(sorted(loaded), ["2000", "2001"])
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from utils.snapshot_file_index import get_snapshot_file_index, list_snapshot_files
+
+
+class TestSnapshotFileIndex(unittest.TestCase):
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for filename in [
+                "usc01_2001.xml",
+                "usc02_2001.xml",
+                "usc2001_1999.xml",
+                "usc01_2002.gpickle",
+            ]:
+                open(os.path.join(folder, filename), "w").close()
+
+            self.assertEqual(
+                get_snapshot_file_index(folder, ".xml"),
+                {
+                    "2001": ["usc01_2001.xml", "usc02_2001.xml"],
+                    "1999": ["usc2001_1999.xml"],
+                },
+            )
+            self.assertEqual(
+                list_snapshot_files(folder, (".xml", ".gpickle"), 2002),
+                [os.path.join(folder, "usc01_2002.gpickle")],
+            )
+
+            # The index is updated if files are added, even within the timestamp
+            # granularity of the file system, i.e. without a new modification time
+            mtime = os.stat(folder).st_mtime_ns
+            open(os.path.join(folder, "usc03_2001.xml"), "w").close()
+            os.utime(folder, ns=(mtime, mtime))
+            self.assertEqual(len(list_snapshot_files(folder, ".xml", "2001")), 3)
+
+    def test_index_reused(self):
+        with tempfile.TemporaryDirectory() as folder:
+            open(os.path.join(folder, "usc01_2001.xml"), "w").close()
+            # The folder was last modified long ago
+            os.utime(folder, (1, 1))
+            index = get_snapshot_file_index(folder, ".xml")
+            self.assertIs(get_snapshot_file_index(folder, ".xml"), index)
+
+            # A modification changes the modification time of the folder
+            open(os.path.join(folder, "usc02_2001.xml"), "w").close()
+            self.assertEqual(len(list_snapshot_files(folder, ".xml", "2001")), 2)
@@ -0,0 +1,218 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from multiprocessing import Pool
+
+from statutes_pipeline_steps.snapshot_mapping_edgelist import (
+    SnapshotMappingEdgelistStep,
+    compare_mappings,
+    map_similar_text_common_neighbors,
+    map_similar_text_lsh,
+)
+from utils.snapshot_texts_store import SnapshotTextsStore
+
+
+def write_snapshots(source, count):
+    """
+    Writes snapshots of a law whose texts change a little from year to year.
+    """
+    keys = [f"k_{i}" for i in range(30)]
+    citekeys = [f"GG_{i // 3}" if i % 2 else None for i in range(30)]
+    texts = [
+        f"Absatz {i} des Gesetzes regelt den Gegenstand Nummer {i * 7 % 30} "
+        f"mit einem laengeren Text zur Bedeutung {i % 4}"
+        for i in range(30)
+    ]
+    snapshots = [str(2000 + year) for year in range(count)]
+    for year, snapshot in enumerate(snapshots):
+        SnapshotTextsStore.write(
+            os.path.join(source, snapshot),
+            [f"{k}_{year}" for k in keys],
+            citekeys,
+            texts,
+        )
+        texts = [
+            t + " geaendert" if i % 5 == year % 5 else t for i, t in enumerate(texts)
+        ]
+    return snapshots
+
+
+class TestComposeIntervals(unittest.TestCase):
+    def test_compose_mappings(self):
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "source")
+            destination = os.path.join(folder, "destination")
+            os.makedirs(destination)
+            for snapshot in ["2000", "2001", "2002"]:
+                SnapshotTextsStore.write(
+                    os.path.join(source, snapshot), ["a_0"], [None], ["text"]
+                )
+            for filename, mapping in [
+                ("2000_2001.json", {"a_0": "b_0", "a_1": "b_1", "a_2": "b_2"}),
+                ("2001_2002.json", {"b_0": "c_0", "b_2": "c_2"}),
+            ]:
+                with open(os.path.join(destination, filename), "w") as f:
+                    json.dump(mapping, f)
+
+            step = SnapshotMappingEdgelistStep(
+                source, destination, 2, "de", compose_intervals=True
+            )
+            items = step.get_items(True, None)
+            self.assertEqual(items, [("2000", "2002")])
+            self.assertEqual(
+                step.get_adjacent_items(items),
+                [("2000", "2001"), ("2001", "2002")],
+            )
+            self.assertEqual(
+                step.compose_mappings(items[0]), {"a_0": "c_0", "a_2": "c_2"}
+            )
+
+    def test_compare_mappings(self):
+        self.assertEqual(
+            compare_mappings(
+                {"a": "x", "b": "y", "c": "z"}, {"a": "x", "b": "z", "d": "w"}
+            ),
+            dict(same=1, different=1, only_composed=1, only_direct=1),
+        )
+
+
+class TestExecuteItems(unittest.TestCase):
+    def test_snapshot_chains(self):
+        loaded = []
+
+        class CountingStep(SnapshotMappingEdgelistStep):
+            def load_snapshot_texts(self, snapshot):
+                loaded.append(snapshot)
+                return super().load_snapshot_texts(snapshot)
+
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "source")
+            destination = os.path.join(folder, "destination")
+            snapshots = write_snapshots(source, 5)
+            step = CountingStep(
+                source, destination, 2, "de", concurrent_items=1, processes=1
+            )
+            items = step.get_items(True, None)
+            step.execute_items(items)
+
+            # Each chain of pairs is mapped before the next one starts
+            self.assertEqual(loaded, ["2000", "2002", "2004", "2001", "2003"])
+            self.assertEqual(sorted(loaded), snapshots)
+            self.assertEqual(
+                sorted(os.listdir(destination)),
+                ["2000_2002.json", "2001_2003.json", "2002_2004.json"],
+            )
+
+    def test_processes(self):
+        results = []
+        for processes in [1, 3]:
+            with tempfile.TemporaryDirectory() as folder:
+                source = os.path.join(folder, "source")
+                destination = os.path.join(folder, "destination")
+                write_snapshots(source, 4)
+                step = SnapshotMappingEdgelistStep(
+                    source, destination, 1, "de", lsh=True, processes=processes
+                )
+                step.execute_items(step.get_items(True, None))
+                result = {}
+                for filename in sorted(os.listdir(destination)):
+                    with open(os.path.join(destination, filename)) as f:
+                        result[filename] = json.load(f)
+                results.append(result)
+
+        self.assertEqual(len(results[0]), 3)
+        self.assertTrue(all(results[0].values()))
+        self.assertEqual(results[1], results[0])
+
+
+class TestMapSimilarTextCommonNeighbors(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(1)
+        words = [
+            "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6))
+            for _ in range(50)
+        ]
+        self.keys1 = [f"a_{i}_0" for i in range(60)]
+        self.keys2 = [f"a_{i}_1" for i in range(60)]
+        self.texts1 = {
+            k: " ".join(rnd.choice(words) for _ in range(12)) for k in self.keys1
+        }
+        self.texts2 = {
+            k2: f"{self.texts1[k1]} {rnd.choice(words)}"
+            for k1, k2 in zip(self.keys1, self.keys2)
+        }
+
+    def map(self, lookahead, pool=None):
+        # Only every tenth node is mapped at the start. The nodes in between can
+        # only be mapped after the nodes next to them.
+        new_mappings = dict(zip(self.keys1[::10], self.keys2[::10]))
+        map_similar_text_common_neighbors(
+            new_mappings,
+            self.keys1,
+            self.keys2,
+            self.texts1,
+            self.texts2,
+            set(self.keys1) - new_mappings.keys(),
+            set(self.keys2) - set(new_mappings.values()),
+            radius=3,
+            pool=pool,
+            lookahead=lookahead,
+        )
+        return new_mappings
+
+    def test_lookahead_and_pool(self):
+        mappings = self.map(lookahead=1)
+        self.assertEqual(mappings, dict(zip(self.keys1, self.keys2)))
+        self.assertEqual(self.map(lookahead=1000), mappings)
+        with Pool(2) as pool:
+            self.assertEqual(self.map(lookahead=1, pool=pool), mappings)
+            self.assertEqual(self.map(lookahead=1000, pool=pool), mappings)
+
+
+class TestMapSimilarTextLsh(unittest.TestCase):
+    text = (
+        "Die Bundesregierung wird ermaechtigt, durch Rechtsverordnung mit "
+        "Zustimmung des Bundesrates das Naehere zu regeln."
+    )
+    texts1 = {
+        "a_1": text,
+        "a_2": text.replace("Naehere", "Weitere"),
+        "a_3": "Kurzer Text.",
+    }
+    texts2 = {
+        "b_1": text.replace("regeln", "bestimmen und die Behoerden zu benennen"),
+        "b_2": "Kurzer Text.",
+        "b_3": text.replace("Naehere", "Weitere").replace("regeln", "ordnen"),
+    }
+
+    def map(self, min_text_length):
+        new_mappings = {}
+        remaining_keys1 = set(self.texts1)
+        remaining_keys2 = set(self.texts2)
+        map_similar_text_lsh(
+            new_mappings,
+            list(self.texts1),
+            list(self.texts2),
+            self.texts1,
+            self.texts2,
+            remaining_keys1,
+            remaining_keys2,
+            min_text_length=min_text_length,
+        )
+        self.assertEqual(remaining_keys1, self.texts1.keys() - new_mappings.keys())
+        self.assertEqual(
+            remaining_keys2, self.texts2.keys() - set(new_mappings.values())
+        )
+        return new_mappings
+
+    def test_map_similar_text_lsh(self):
+        # a_1 is most similar to b_3, but a_2 and b_3 are even more similar and
+        # mapped first. Hence, a_1 is mapped to b_1.
+        self.assertEqual(list(self.map(20).items()), [("a_2", "b_3"), ("a_1", "b_1")])
+        # Short texts are only mapped with a lower min_text_length
+        self.assertEqual(
+            list(self.map(10).items()),
+            [("a_3", "b_2"), ("a_2", "b_3"), ("a_1", "b_1")],
+        )
@@ -1,8 +1,10 @@
 import random
 import re
 import string
+import tempfile
 from unittest import TestCase
 
+from statutes_pipeline_steps.snapshot_mapping_index import get_file_texttags
 from utils.string_list_contains import StringContainsAlign
 
 
@@ -54,3 +56,46 @@ class StringContainsAlignTestCase(TestCase):
         res = aligner.run(reversed=True)
 
         self.assertTrue(0 < len(res) < 102)
+
+    def test_align_rare_tokens(self):
+        aligner = StringContainsAlign()
+        aligner.text_list_0 = ["a der die rare b", "a der die unknown b", "der"]
+        aligner.text_list_1 = [
+            "der die und",
+            "x a der die rare b y",
+            "a der die rare b",
+            "rare der die",
+        ]
+        aligner.create_index()
+
+        self.assertEqual(
+            aligner.run(), [(0, 1), (0, 2), (2, 0), (2, 1), (2, 2), (2, 3)]
+        )
+        self.assertEqual(aligner.run(reversed=True), [(2, 0)])
+
+
+class GetFileTexttagsTestCase(TestCase):
+    def test_get_file_texttags(self):
+        xml = (
+            '<document key="d">'
+            "<text>Präambel</text>"
+            '<seqitem key="s1" citekey="A_1">'
+            "<text>Erster  <reference>Satz</reference></text> tail"
+            "<!-- comment -->"
+            '<subseqitem key="s1_1"><text>(1) Absatz\n eins</text></subseqitem>'
+            "<text>Zweiter</text>"
+            "</seqitem>"
+            "</document>"
+        )
+        with tempfile.NamedTemporaryFile("w", suffix=".xml") as f:
+            f.write(xml)
+            f.flush()
+            self.assertEqual(
+                get_file_texttags(f.name),
+                [
+                    ("d_0", None, "präambel"),
+                    ("s1_0", "A_1", "erster satz tail"),
+                    ("s1_1_0", "A_1", "(1) absatz eins"),
+                    ("s1_1", "A_1", "zweiter"),
+                ],
+            )
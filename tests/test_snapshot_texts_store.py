@@ -0,0 +1,25 @@
+import tempfile
+import unittest
+
+from utils.snapshot_texts_store import SnapshotTextsStore, get_text_hash
+
+
+class TestSnapshotTextsStore(unittest.TestCase):
+    def test_write_and_load(self):
+        keys = ["a_0", "a_1", "b_0"]
+        citekeys = ["A_1", None, "A_1"]
+        texts = ["erster text", "", "zweiter text äöü"]
+        with tempfile.TemporaryDirectory() as path:
+            self.assertFalse(SnapshotTextsStore.exists(path))
+            SnapshotTextsStore.write(path, keys, citekeys, texts)
+            self.assertTrue(SnapshotTextsStore.exists(path))
+
+            store = SnapshotTextsStore(path)
+            self.assertEqual(len(store), 3)
+            self.assertEqual(list(store.keys), keys)
+            self.assertEqual(store.get_citekeys(), citekeys)
+            self.assertEqual(store.texts[2], "zweiter text äöü")
+            self.assertEqual(store.text_lengths.tolist(), [11, 0, 16])
+            self.assertEqual(
+                store.text_hashes.tolist(), [get_text_hash(t) for t in texts]
+            )
@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+from collections import Counter
+
+import networkx as nx
+
+from statutes_pipeline_steps.temporal_graph import map_graph_nodes, select_unique_pairs
+from utils.temporal_graph_store import TemporalGraphStore, TemporalGraphStoreWriter
+
+
+def make_graph(name, nodes, containment, references):
+    G = nx.MultiDiGraph(name=name)
+    G.add_nodes_from((key, dict(key=key, **attrs)) for key, attrs in nodes.items())
+    G.add_edges_from((u, v, dict(edge_type="containment")) for u, v in containment)
+    G.add_edges_from((u, v, dict(edge_type="reference")) for u, v in references)
+    return G
+
+
+class TestTemporalGraphStore(unittest.TestCase):
+    def test_roundtrip(self):
+        states = [
+            (
+                "2019",
+                {0: dict(key="a", level=0), 1: dict(key="a_1", level=1)},
+                Counter({(0, 1, "containment"): 1}),
+            ),
+            (
+                "2020",
+                {
+                    0: dict(key="a", level=0, heading="A"),
+                    1: dict(key="a_2", level=1),
+                    2: dict(key="a_3", level=1),
+                },
+                Counter({(0, 1, "containment"): 1, (0, 2, "containment"): 1}),
+            ),
+            (
+                "2021",
+                {0: dict(key="a", level=0), 2: dict(key="a_3", level=1)},
+                Counter({(0, 2, "containment"): 1, (2, 0, "reference"): 2}),
+            ),
+        ]
+        with tempfile.TemporaryDirectory() as path:
+            writer = TemporalGraphStoreWriter(path)
+            for snapshot, nodes, edges in states:
+                writer.add_snapshot(snapshot, nodes, edges, dict(name=snapshot))
+            writer.close()
+
+            store = TemporalGraphStore(path)
+            self.assertEqual(store.snapshots, ["2019", "2020", "2021"])
+
+            for snapshot, nodes, edges in states:
+                self.assertEqual(
+                    store.get_state(snapshot), (nodes, edges, dict(name=snapshot))
+                )
+
+            changes = store.get_changes("2021")
+            self.assertEqual(changes["nodes_removed"], [1])
+            self.assertEqual(changes["nodes_changed"], {0: ({}, ["heading"])})
+
+            G = store.materialize("2021")
+            self.assertEqual(set(G.nodes), {"a", "a_3"})
+            self.assertEqual(G.number_of_edges("a_3", "a"), 2)
+            self.assertEqual(G.graph["name"], "2021")
+
+    def test_select_unique_pairs(self):
+        votes = Counter({("a", "x"): 3, ("b", "x"): 2, ("b", "y"): 1, ("a", "y"): 1})
+        self.assertEqual(select_unique_pairs(votes), {"a": "x", "b": "y"})
+
+    def test_map_graph_nodes(self):
+        G1 = make_graph(
+            "2019",
+            {"root": {}, "l1": {}, "l1_1": {}, "l1_2": {}},
+            [("root", "l1"), ("l1", "l1_1"), ("l1", "l1_2")],
+            [],
+        )
+        G2 = make_graph(
+            "2020",
+            {"root": {}, "l2": {}, "l2_1": {}, "l2_2": {}},
+            [("root", "l2"), ("l2", "l2_1"), ("l2", "l2_2")],
+            [],
+        )
+        # Texts of the subseqitem l1_2_1 belong to the seqitem l1_2
+        text_mapping = {"l1_1_0": "l2_2_0", "l1_1_1": "l2_2_1", "l1_2_1_0": "l2_1_0"}
+        parent_keys1 = {"l1_2_1": "l1_2"}
+
+        mapping = map_graph_nodes(text_mapping, G1, G2, parent_keys1, {})
+        self.assertEqual(
+            mapping, {"l1_1": "l2_2", "l1_2": "l2_1", "l1": "l2", "root": "root"}
+        )
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from utils.text_lsh import (
+    get_lsh_candidates,
+    get_minhash_signatures,
+    get_shingle_hashes,
+)
+
+
+class TestTextLsh(unittest.TestCase):
+    def test_candidates(self):
+        texts1 = [
+            "Die Bundesregierung wird ermaechtigt, durch Rechtsverordnung zu regeln.",
+            "Das Nähere regelt ein Bundesgesetz über die Errichtung der Behörde.",
+            "Dieses Gesetz tritt am Tage nach der Verkündung in Kraft.",
+        ]
+        texts2 = [
+            "Dieses Gesetz tritt am Tag nach der Verkündung in Kraft.",
+            "Eine völlig andere Vorschrift ohne Bezug zu den übrigen Texten.",
+            "Die Bundesregierung wird ermächtigt, durch Rechtsverordnung zu regeln.",
+        ]
+        signatures1 = get_minhash_signatures(texts1)
+        signatures2 = get_minhash_signatures(texts2)
+        self.assertEqual(signatures1.shape, (3, 64))
+        self.assertTrue(np.array_equal(signatures1, get_minhash_signatures(texts1)))
+
+        self.assertEqual(get_lsh_candidates(signatures1, signatures2), [(0, 2), (2, 0)])
+        self.assertEqual(
+            get_lsh_candidates(signatures1, signatures2, max_bucket_size=0), []
+        )
+
+    def test_signatures_estimate_jaccard_similarity(self):
+        text1 = "Die Bundesregierung wird ermaechtigt, das Naehere zu regeln."
+        text2 = "Die Bundesregierung wird ermaechtigt, das Naehere zu bestimmen."
+        shingles1 = set(get_shingle_hashes(text1).tolist())
+        shingles2 = set(get_shingle_hashes(text2).tolist())
+        jaccard = len(shingles1 & shingles2) / len(shingles1 | shingles2)
+
+        signatures = get_minhash_signatures([text1, text2], num_perm=1024)
+        estimate = (signatures[0] == signatures[1]).mean()
+        self.assertAlmostEqual(estimate, jaccard, delta=0.05)
@@ -0,0 +1,47 @@
+import random
+import unittest
+
+import textdistance
+
+from utils.text_similarity import jaro_winkler, jaro_winkler_batch
+
+
+class TestTextSimilarity(unittest.TestCase):
+    def get_pairs(self):
+        rnd = random.Random(0)
+        pairs = [
+            ("", ""),
+            ("abc", ""),
+            ("abc", "abc"),
+            ("martha", "marhta"),
+            ("dixon", "dicksonx"),
+            ("aaaa", "aa"),
+            ("Absatz 1 Satz 2", "Absatz 2 Satz 1"),
+        ]
+        for _ in range(2000):
+            alphabet = "ab c"[: rnd.randint(1, 4)]
+            pairs.append(
+                tuple(
+                    "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20)))
+                    for _ in range(2)
+                )
+            )
+        return pairs
+
+    def test_equals_textdistance(self):
+        for s1, s2 in self.get_pairs():
+            self.assertEqual(
+                jaro_winkler(s1, s2), textdistance.jaro_winkler(s1, s2), (s1, s2)
+            )
+
+    def test_threshold(self):
+        pairs = self.get_pairs()
+        expected = [textdistance.jaro_winkler(s1, s2) for s1, s2 in pairs]
+        for threshold in [0.8, 0.9]:
+            for score, expected_score in zip(
+                jaro_winkler_batch(pairs, threshold), expected
+            ):
+                if expected_score > threshold:
+                    self.assertEqual(score, expected_score)
+                else:
+                    self.assertLessEqual(score, threshold)
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from lxml import etree
+
+from statutes_pipeline_steps.us_reference_areas import (
+    find_references,
+    inline_pattern,
+    usc_pattern,
+)
+from statutes_pipeline_steps.us_reference_reg import find_authority_references
+from utils.common import save_tree
+
+# Markup of the reference areas tagged with BeautifulSoup before the step used lxml.
+# The block pass runs before the inline pass on the same tree.
+GOLDEN_REFERENCE_AREAS = [
+    # Several matches in the text of an element
+    (
+        "<text>See 42 U.S.C. 1983 and 5 U.S.C. 552a(b)(3) of this title.</text>",
+        '<text>See <reference pattern="block">42 U.S.C. 1983 </reference>and '
+        '<reference pattern="block">5 U.S.C. 552a(b)(3) of this title</reference>.'
+        "</text>",
+    ),
+    # Matches in the text and in the tail of a child
+    (
+        "<text>Under 42 U.S.C. 1983<i>note</i> and 7 U.S.C. 12, or 8 U.S.C. 1101."
+        "</text>",
+        '<text>Under <reference pattern="block">42 U.S.C. 1983</reference>'
+        '<i>note</i> and <reference pattern="block">7 U.S.C. 12</reference>, or '
+        '<reference pattern="block">8 U.S.C. 1101</reference>.</text>',
+    ),
+    # Matches followed by "of" are skipped
+    (
+        "<text>As in 42 U.S.C. 1983 of the Act and 7 U.S.C. 12, of the Act and "
+        "8 U.S.C. 3.</text>",
+        "<text>As in 42 U.S.C. 1983 of the Act and "
+        '<reference pattern="block">7 U.S.C. 12</reference>, of the Act and '
+        '<reference pattern="block">8 U.S.C. 3</reference>.</text>',
+    ),
+    # The inline pass matches in the tails of the block references
+    (
+        "<text>Under 42 U.S.C. 1983 and section 5 of this title.</text>",
+        '<text>Under <reference pattern="block">42 U.S.C. 1983 </reference>and '
+        '<reference pattern="inline">section 5 of this title</reference>.</text>',
+    ),
+    (
+        "<text>See section 3 hereof and section 4(a), as in section 2.<p>x</p>"
+        "See section 5 of the Act, § 6, and sec. 7.</text>",
+        '<text>See <reference pattern="inline">section 3 </reference>hereof and '
+        '<reference pattern="inline">section 4(a)</reference>, as in '
+        '<reference pattern="inline">section 2</reference>.<p>x</p>'
+        "See section 5 of the Act, "
+        '<reference pattern="inline">§ 6, and sec. 7</reference>.</text>',
+    ),
+    # The inline pass does not match in the block references
+    (
+        "<text>See 42 U.S.C. Sec. 1983.</text>",
+        '<text>See <reference pattern="block">42 U.S.C. Sec. 1983</reference>.'
+        "</text>",
+    ),
+    # Only text and tails directly contained in text elements are matched
+    (
+        "<text>No reference.<i>40 CFR part 60 here</i></text>",
+        "<text>No reference.<i>40 CFR part 60 here</i></text>",
+    ),
+    (
+        '<seqitem auth_text="5 U.S.C. 301; 42 U.S.C. 1983 and 1985.">'
+        "<text>§ 1.1 of this part</text></seqitem>",
+        '<seqitem auth_text="5 U.S.C. 301; 42 U.S.C. 1983 and 1985." '
+        'auth_text_areas="[&quot;5 U.S.C. 301&quot;, '
+        '&quot;42 U.S.C. 1983 and 1985&quot;]">'
+        '<text><reference pattern="inline">§ 1.1 of this part</reference></text>'
+        "</seqitem>",
+    ),
+]
+
+
+def find_reference_areas(xml):
+    tree = etree.ElementTree(etree.fromstring(f"<document>{xml}</document>"))
+    find_references(tree, usc_pattern, {"pattern": "block"})
+    find_references(tree, inline_pattern, {"pattern": "inline"})
+    find_authority_references(tree, usc_pattern)
+    return tree
+
+
+class TestUsReferenceAreas(unittest.TestCase):
+    def test_find_references_golden(self):
+        for xml, expected in GOLDEN_REFERENCE_AREAS:
+            with self.subTest(xml=xml):
+                tree = find_reference_areas(xml)
+                self.assertEqual(
+                    f"<document>{expected}</document>",
+                    etree.tostring(tree, encoding="unicode"),
+                )
+
+    def test_save_tree(self):
+        xml, expected = GOLDEN_REFERENCE_AREAS[-1]
+        tree = find_reference_areas(xml)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "cfr01_2001.xml")
+            save_tree(tree, path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(
+                    "<?xml version='1.0' encoding='UTF-8'?>\n"
+                    f"<document>{expected}</document>",
+                    f.read(),
+                )
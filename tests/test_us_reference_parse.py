@@ -0,0 +1,250 @@
+import json
+import unittest
+
+from statutes_pipeline_steps.us_reference_parse import (
+    parse_reference_string,
+    parse_reference_text,
+)
+
+# Results of the parser before it was optimized. Some results are not meaningful
+# (e.g. for multiple ranges), but parsing must not change.
+GOLDEN_REFERENCE_TEXTS = [
+    ("1983", [["1983"]]),
+    ("1983(a)", [["1983", "a"]]),
+    ("1983(a)(1)(B)(ii)", [["1983", "a", "1", "B", "ii"]]),
+    ("§ 3", [["3"]]),
+    ("§§ 3, 4, and 5", [["3"], ["4"], ["5"]]),
+    ("sec. 12", [["12"]]),
+    ("sections 101 and 102", [["101"], ["102"]]),
+    ("section 101 et seq.", [["101"]]),
+    ("101 et. seq.", [["101"]]),
+    ("101 and following", [["101"]]),
+    ("subpart 7", [["7"]]),
+    ("part 12", [["12"]]),
+    ("parts 12 through 14", [["12"], ["14"]]),
+    ("1-3", [["1"], ["3"]]),
+    ("5-3", [["5-3"]]),
+    ("1–3", [["1"], ["3"]]),
+    ("1—3", [["1"], ["3"]]),
+    ("300a-300c", [["300a"], ["300c"]]),
+    ("300c-300a", [["300c-300a"]]),
+    ("1-3 and 5-7", [["7"], ["5-7"]]),
+    ("101–105, 201-203(a) and 300a-300c", [["203300a"], ["300a-300c"]]),
+    ("5-3 and 6-8", [["5-3"], ["6"], ["8"]]),
+    ("12(a)-(c)", []),
+    ("1.1204(b)", [["1.1204", "b"]]),
+    ("1.12-1.14", []),
+    ("552a(b)(3)", [["552a", "b", "3"]]),
+    ("552a(b)(3)(A)", [["552a", "b", "3", "A"]]),
+    ("10(a)(1), (2), and (3)", [["10", "a", "1"]]),
+    ("10(a)(1) and (b)", [["10", "a", "1"]]),
+    ("3 or 4", [["3"], ["4"]]),
+    ("3; 4", [["3"], ["4"]]),
+    ("3 through 7", [["3"], ["7"]]),
+    ("3 thru 7", []),
+    ("3 to 7", [["3"], ["7"]]),
+    ("7 U.S.C.", []),
+    ("", []),
+    ("  101  ", [["101"]]),
+    ("2000e-2(a)", [["2000e-2", "a"]]),
+    ("2000e–16", [["2000e–16"]]),
+    ("101(a)(1)(A)(i)(I)", [["101", "a", "1", "A", "i", "I"]]),
+    ("101(aa)", [["101", "aa"]]),
+    ("101(iv)", [["101", "iv"]]),
+    ("101(IV)", [["101", "IV"]]),
+    ("5(xx)", [["5", "xx"]]),
+    ("§101", [["101"]]),
+    ("§ 101 (a)", [["101", "a"]]),
+    ("Sec. 1", [["1"]]),
+    ("SECTION 4", [["4"]]),
+    ("12a", [["12a"]]),
+    ("12abc", [["12abc"]]),
+    ("12abcd", []),
+    ("1a-1c", [["1a"], ["1c"]]),
+    ("1a—2", [["1a"], ["2"]]),
+    ("12.3", [["12.3"]]),
+    ("12-13(a) and (b)", [["12"], ["13", "a"]]),
+    ("4(b), (c) and (d)", [["4", "b"]]),
+    ("4, 5(a), 6(b)(2)", [["4"], ["5", "a"], ["6", "b", "2"]]),
+    ("4 and following", [["4"]]),
+    ("4 and 5 and following", [["4"], ["5"]]),
+]
+
+GOLDEN_REFERENCE_STRINGS = [
+    ("block", "42 U.S.C. 1983", 5, True, "1983", [["42", "1983"]]),
+    ("block", "42 U.S.C. 1983", 40, False, "1983", [["42", "1983"]]),
+    (
+        "block",
+        "42 U.S.C. 1983 and 1985",
+        5,
+        True,
+        "1983 and 1985",
+        [["42", "1983"], ["42", "1985"]],
+    ),
+    (
+        "block",
+        "42 U.S.C. 1983 and 1985",
+        40,
+        False,
+        "1983 and 1985",
+        [["42", "1983"], ["42", "1985"]],
+    ),
+    (
+        "block",
+        "5 U.S.C. 552a(b)(3) of this title",
+        5,
+        True,
+        "552a(b)(3)",
+        [["5", "552a", "b", "3"]],
+    ),
+    (
+        "block",
+        "5 U.S.C. 552a(b)(3) of this title",
+        40,
+        False,
+        "552a(b)(3)",
+        [["5", "552a", "b", "3"]],
+    ),
+    ("block", "47 CFRSec. 1.1204(b)", 5, True, "1.1204(b)", [["cfr47", "1.1204", "b"]]),
+    (
+        "block",
+        "47 CFRSec. 1.1204(b)",
+        40,
+        False,
+        "1.1204(b)",
+        [["cfr47", "1.1204", "b"]],
+    ),
+    ("block", "40 CFR part 60 of title 42", 5, True, "part 60", [["cfr40", "60"]]),
+    ("block", "40 CFR part 60 of title 42", 40, False, "part 60", [["cfr40", "60"]]),
+    ("block", "12 C.F.R. 4.5", 5, True, "4.5", [["cfr12", "4.5"]]),
+    ("block", "12 C.F.R. 4.5", 40, False, "4.5", [["cfr12", "4.5"]]),
+    (
+        "block",
+        "42 USC 1983 of title 5 of the Code of Federal Regulations",
+        5,
+        True,
+        "1983",
+        [["42", "1983"]],
+    ),
+    (
+        "block",
+        "42 USC 1983 of title 5 of the Code of Federal Regulations",
+        40,
+        False,
+        "1983",
+        [["42", "1983"]],
+    ),
+    (
+        "block",
+        "26 U.S.C. 1-3 and 5-7",
+        5,
+        True,
+        "1-3 and 5-7",
+        [["26", "7"], ["26", "5-7"]],
+    ),
+    (
+        "block",
+        "26 U.S.C. 1-3 and 5-7",
+        40,
+        False,
+        "1-3 and 5-7",
+        [["26", "7"], ["26", "5-7"]],
+    ),
+    ("inline", "section 5 of this title", 5, True, "section 5", [["5", "5"]]),
+    ("inline", "section 5 of this title", 40, False, "section 5", [["cfr40", "5"]]),
+    (
+        "inline",
+        "section 5(a) and (b) of this title",
+        5,
+        True,
+        "section 5(a) and (b)",
+        [["5", "5", "a"]],
+    ),
+    (
+        "inline",
+        "section 5(a) and (b) of this title",
+        40,
+        False,
+        "section 5(a) and (b)",
+        [["cfr40", "5", "a"]],
+    ),
+    (
+        "inline",
+        "sections 3 and 4",
+        5,
+        True,
+        "sections 3 and 4",
+        [["5", "3"], ["5", "4"]],
+    ),
+    (
+        "inline",
+        "sections 3 and 4",
+        40,
+        False,
+        "sections 3 and 4",
+        [["cfr40", "3"], ["cfr40", "4"]],
+    ),
+    ("inline", "section 12 of title 7", 5, True, "section 12", [["7", "12"]]),
+    ("inline", "section 12 of title 7", 40, False, "section 12", [["cfr7", "12"]]),
+    ("inline", "\u00a7 1.1 of this part", 5, True, "\u00a7 1.1", [["5", "1.1"]]),
+    ("inline", "\u00a7 1.1 of this part", 40, False, "\u00a7 1.1", [["cfr40", "1.1"]]),
+    (
+        "inline",
+        "section 12 of title 7 of the Code of the United States",
+        5,
+        True,
+        "section 12",
+        [["7", "12"]],
+    ),
+    (
+        "inline",
+        "section 12 of title 7 of the Code of the United States",
+        40,
+        False,
+        "section 12",
+        [["7", "12"]],
+    ),
+    (
+        "inline",
+        "section 5 of title 40 of the Code of Federal Regulations",
+        5,
+        True,
+        "section 5",
+        [["cfr40", "5"]],
+    ),
+    (
+        "inline",
+        "section 5 of title 40 of the Code of Federal Regulations",
+        40,
+        False,
+        "section 5",
+        [["cfr40", "5"]],
+    ),
+    ("inline", "section 101 et seq.", 5, True, "section 101 et seq.", [["5", "101"]]),
+    (
+        "inline",
+        "section 101 et seq.",
+        40,
+        False,
+        "section 101 et seq.",
+        [["cfr40", "101"]],
+    ),
+    ("inline", "subpart 7", 5, True, "subpart 7", [["5", "7"]]),
+    ("inline", "subpart 7", 40, False, "subpart 7", [["cfr40", "7"]]),
+]
+
+
+class TestUsReferenceParse(unittest.TestCase):
+    def test_parse_reference_text_golden(self):
+        for text, expected in GOLDEN_REFERENCE_TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(expected, parse_reference_text(text))
+
+    def test_parse_reference_string_golden(self):
+        for pattern, string, title, usc, sub_text, expected in GOLDEN_REFERENCE_STRINGS:
+            with self.subTest(string=string, title=title, usc=usc):
+                result_sub_text, parsed = parse_reference_string(
+                    pattern, string, title, usc
+                )
+                self.assertEqual(sub_text, result_sub_text)
+                self.assertEqual(expected, json.loads(parsed))
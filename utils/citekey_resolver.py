@@ -0,0 +1,124 @@
+import pandas as pd
+
+
+def load_lookup_rows(path):
+    """
+    Returns: a list of (key, citekey) tuples of a crossreference lookup csv file.
+        Rows with missing values are skipped.
+    """
+    df = pd.read_csv(path, dtype=str).dropna()
+    return list(zip(df.key, df.citekey))
+
+
+class CitekeyResolver:
+    """
+    Resolves citekeys to the keys of the nodes with these citekeys. If multiple nodes
+    have the same citekey, the citekey is ambiguous and resolved to the first node.
+
+    The resolver counts resolved references, resolved references with an ambiguous
+    citekey and missed references to report them after a snapshot is processed.
+
+    Args:
+        lookup_rows: iterable of (key, citekey) pairs, e.g. of a crossreference lookup
+    """
+
+    def __init__(self, lookup_rows):
+        self.keys = {}
+        self.ambiguous_citekeys = set()
+        for key, citekey in lookup_rows:
+            if citekey in self.keys:
+                self.ambiguous_citekeys.add(citekey)
+            else:
+                self.keys[citekey] = key
+        self.resolved_n = 0
+        self.ambiguous_n = 0
+        self.missed_n = 0
+        self._trie = None
+
+    @classmethod
+    def load(cls, path):
+        return cls(load_lookup_rows(path))
+
+    def resolve(self, citekey):
+        """
+        Returns: the key of the first node with the citekey or None
+        """
+        key = self.keys.get(citekey)
+        self._count(citekey, key)
+        return key
+
+    def resolve_longest_prefix(self, components, min_length=2):
+        """
+        Resolves the longest prefix of the citekey components with at least
+        min_length components that is a known citekey. The result equals probing
+        "_".join(components[:cutoff]) for decreasing cutoffs, but the prefixes are
+        matched in a single walk through a trie of the citekeys.
+
+        Returns: the key of the first node with this citekey or None
+        """
+        if self._trie is None:
+            self._trie = self._build_trie()
+
+        citekey = key = None
+        node = self._trie
+        for length, component in enumerate(components, 1):
+            if "_" in component:  # Components may contain underscores themselves
+                for part in component.split("_"):
+                    node = node.get(part)
+                    if node is None:
+                        break
+            else:
+                node = node.get(component)
+            if node is None:
+                break
+            if length >= min_length and None in node:
+                candidate = node[None]
+                if self.keys[candidate]:
+                    citekey = candidate
+                    key = self.keys[candidate]
+        self._count(citekey, key)
+        return key
+
+    def _build_trie(self):
+        """
+        Returns: a trie of the parts of the citekeys split at underscores. Each node is
+            a dict of parts and child nodes. Nodes at the end of a citekey store it
+            with the key None.
+        """
+        trie = {}
+        for citekey in self.keys:
+            node = trie
+            for part in citekey.split("_"):
+                node = node.setdefault(part, {})
+            node[None] = citekey
+        return trie
+
+    def _count(self, citekey, key):
+        if key:
+            self.resolved_n += 1
+            if citekey in self.ambiguous_citekeys:
+                self.ambiguous_n += 1
+        else:
+            self.missed_n += 1
+
+    def get_stats(self):
+        return dict(
+            resolved=self.resolved_n,
+            ambiguous=self.ambiguous_n,
+            missed=self.missed_n,
+        )
+
+
+def print_resolver_stats(results):
+    """
+    Prints the stats of the resolvers of several snapshots.
+
+    Args:
+        results: list of tuples of snapshots and the stats of their resolvers
+    """
+    for snapshot, stats in results:
+        print(
+            f"{snapshot}: {stats['resolved']} references resolved "
+            f"({stats['ambiguous']} with ambiguous citekeys), "
+            f"{stats['missed']} not resolved"
+        )
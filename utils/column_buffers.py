@@ -0,0 +1,164 @@
+import gzip
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+# Code of missing values
+MISSING = -1
+
+
+class ColumnBuffers(Mapping):
+    """
+    Table of typed columns that rows are appended to in blocks.
+
+    Integer columns are stored in int64 arrays with a boolean array marking missing
+    values. The values of the other columns are interned in a table shared by all
+    columns, e.g. to store keys in node and edge columns only once, and stored as
+    int32 arrays of codes, in which None is encoded as -1. The arrays are
+    preallocated and their capacity is doubled if rows do not fit.
+
+    As a mapping, the buffers return the values of a column as list, in which
+    missing values are None.
+
+    Args:
+        columns: names of the columns in order
+        int_columns: names of the columns with integer values
+        capacity: number of rows allocated initially
+        interned: other buffers to share the table of interned values with
+    """
+
+    def __init__(self, columns, int_columns=(), capacity=1024, interned=None):
+        self.columns = list(columns)
+        self.int_columns = set(int_columns)
+        self.num_rows = 0
+        self.capacity = capacity
+        self.arrays = {}
+        self.missing = {}
+        for column in self.columns:
+            if column in self.int_columns:
+                self.arrays[column] = np.zeros(capacity, dtype=np.int64)
+                self.missing[column] = np.ones(capacity, dtype=bool)
+            else:
+                self.arrays[column] = np.full(capacity, MISSING, dtype=np.int32)
+        if interned is None:
+            self.value_codes = {}
+            self.values = []
+        else:
+            self.value_codes = interned.value_codes
+            self.values = interned.values
+        self._decoded = None
+
+    def __getitem__(self, column):
+        if column in self.int_columns:
+            values = self.get_ints(column).tolist()
+            for idx in np.flatnonzero(self.get_missing(column)).tolist():
+                values[idx] = None
+            return values
+        return self.decode(self.get_codes(column)).tolist()
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def reserve(self, num_rows):
+        """
+        Grows the arrays to hold at least num_rows rows.
+        """
+        if num_rows <= self.capacity:
+            return
+        capacity = max(num_rows, 2 * self.capacity)
+        for column, array in self.arrays.items():
+            fill_value = 0 if column in self.int_columns else MISSING
+            grown = np.full(capacity, fill_value, dtype=array.dtype)
+            grown[: self.num_rows] = array[: self.num_rows]
+            self.arrays[column] = grown
+        for column, array in self.missing.items():
+            grown = np.ones(capacity, dtype=bool)
+            grown[: self.num_rows] = array[: self.num_rows]
+            self.missing[column] = grown
+        self.capacity = capacity
+
+    def intern(self, values):
+        """
+        Returns: an int32 array of the codes of the values. Values not interned yet
+            are added to the table.
+        """
+        value_codes = self.value_codes
+        for value in values:
+            if value is not None and value not in value_codes:
+                value_codes[value] = len(self.values)
+                self.values.append(value)
+        return np.fromiter(
+            (MISSING if value is None else value_codes[value] for value in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+
+    def get_code(self, value):
+        """
+        Returns: the code of an interned value or -1 if it is not interned
+        """
+        return self.value_codes.get(value, MISSING)
+
+    def add_rows(self, columns):
+        """
+        Appends rows given as dict of column names and lists of values. Missing
+        columns are filled with missing values.
+        """
+        length = len(next(iter(columns.values())))
+        self.reserve(self.num_rows + length)
+        rows = slice(self.num_rows, self.num_rows + length)
+        for column, values in columns.items():
+            if column in self.int_columns:
+                missing = [v is None or v != v for v in values]
+                self.arrays[column][rows] = [
+                    0 if is_missing else v for v, is_missing in zip(values, missing)
+                ]
+                self.missing[column][rows] = missing
+            else:
+                self.arrays[column][rows] = self.intern(values)
+        self.num_rows += length
+
+    def get_codes(self, column):
+        return self.arrays[column][: self.num_rows]
+
+    def get_ints(self, column):
+        return self.arrays[column][: self.num_rows]
+
+    def get_missing(self, column):
+        return self.missing[column][: self.num_rows]
+
+    def decode(self, codes):
+        """
+        Returns: an object array of the values of the codes. Missing values are None.
+        """
+        if self._decoded is None or len(self._decoded) != len(self.values) + 1:
+            # The last element is returned for the code -1
+            self._decoded = np.empty(len(self.values) + 1, dtype=object)
+            for idx, value in enumerate(self.values):
+                self._decoded[idx] = value
+        return self._decoded[codes]
+
+    def to_csv(self, path, chunk_size=100000):
+        """
+        Writes the table to a csv file, gzipped if the path ends with .gz. The rows
+        are written in chunks to decode only a part of the values at a time.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8", newline="") as f:
+            for start in range(0, max(self.num_rows, 1), chunk_size):
+                rows = slice(start, min(start + chunk_size, self.num_rows))
+                chunk = {}
+                for column in self.columns:
+                    if column in self.int_columns:
+                        chunk[column] = pd.arrays.IntegerArray(
+                            self.get_ints(column)[rows], self.get_missing(column)[rows]
+                        )
+                    else:
+                        chunk[column] = pd.Series(
+                            self.decode(self.get_codes(column)[rows]), dtype=object
+                        )
+                pd.DataFrame(chunk).to_csv(f, header=start == 0, index=False)
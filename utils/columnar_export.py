@@ -0,0 +1,89 @@
+import os
+
+# Columnar formats tables can be exported to in addition to csv and json files.
+# Arrow IPC files can be memory-mapped, Parquet files are smaller.
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+EXPORTED_EXTENSIONS = [".csv.gz", ".csv", ".json"]
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError(
+            "pyarrow is required to export columnar formats: pip install pyarrow"
+        ) from err
+    return pyarrow
+
+
+def get_columnar_path(path, columnar_format):
+    """
+    Returns: the path of the columnar export of a csv or json file
+    """
+    for extension in EXPORTED_EXTENSIONS:
+        if path.endswith(extension):
+            path = path[: -len(extension)]
+            break
+    return path + COLUMNAR_FORMATS[columnar_format]
+
+
+def export_columnar(columns, path, columnar_format, dictionary_columns=()):
+    """
+    Exports a table to a columnar format next to its csv or json file.
+
+    Args:
+        columns: pandas DataFrame or dict of column names and lists of values.
+            Missing values (None or NaN) are exported as nulls.
+        path: path of the csv or json file
+        columnar_format: key of COLUMNAR_FORMATS or None to skip the export
+        dictionary_columns: names of columns to dictionary-encode, e.g. keys that
+            occur in many rows
+    """
+    if not columnar_format:
+        return
+    pa = import_pyarrow()
+
+    arrays = {}
+    for column in columns:
+        values = list(columns[column])
+        try:
+            array = pa.array(values, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):  # Mixed types
+            array = pa.array(
+                [str(v) if v is not None and v == v else None for v in values]
+            )
+        if column in dictionary_columns:
+            array = array.dictionary_encode()
+        arrays[column] = array
+    table = pa.table(arrays)
+
+    columnar_path = get_columnar_path(path, columnar_format)
+    try:
+        if columnar_format == "parquet":
+            pa.parquet.write_table(table, columnar_path)
+        else:
+            with pa.OSFile(columnar_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+    except Exception:  # Clean file if error
+        if os.path.exists(columnar_path):
+            os.remove(columnar_path)
+        raise
+
+
+def load_columnar(path, columns=None):
+    """
+    Loads an exported table as pyarrow Table. Arrow files are memory-mapped.
+
+    Args:
+        columns: names of the columns to load. Default: all columns
+    """
+    pa = import_pyarrow()
+    if path.endswith(COLUMNAR_FORMATS["parquet"]):
+        return pa.parquet.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        return table.select(columns) if columns else table
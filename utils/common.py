@@ -1,9 +1,9 @@
 import argparse
 import os
-import pickle
 import shutil
 from collections import Counter
 
+import bs4
 import pandas as pd
 from quantlaw.utils.files import ensure_exists
 from quantlaw.utils.pipeline import PipelineStep
@@ -16,6 +16,7 @@ from statics import (
     DE_REG_LAW_NAMES_COMPILED_PATH,
     DE_REG_LAW_NAMES_PATH,
 )
+from utils.law_names_store import LawNamesStore
 
 ##########
 # Pipeline
@@ -39,6 +40,143 @@ def str_to_bool(v):
         raise argparse.ArgumentTypeError("Boolean value expected.")
 
 
+###########
+# XML files
+###########
+
+
+def save_tree(tree, path):
+    """
+    Writes an lxml ElementTree to a file at a given path.
+    """
+    try:
+        tree.write(path, encoding="utf-8", xml_declaration=True)
+    except Exception:  # Clean file if error
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+# Tags whose contents are serialized child by child when saving a soup. Other tags are
+# small enough to be serialized at once.
+STREAMED_SOUP_TAGS = {"document", "item"}
+
+# Cannot occur in XML documents
+_SOUP_PLACEHOLDER = "\x00"
+
+
+def save_soup(soup, path, stylesheet=None, collapse_newlines=False):
+    """
+    Writes a BeautifulSoup object or a string to a file at a given path.
+
+    The output equals str(soup), but large tags are serialized and written piece by
+    piece instead of building the whole document in memory.
+
+    Args:
+        stylesheet: If set, a stylesheet processing instruction with this href is
+            inserted as the second line.
+        collapse_newlines: Replace double newlines by single ones, i.e.
+            str.replace("\\n\\n", "\\n").
+    """
+    try:
+        with open(path, "w", encoding="utf8") as f:
+            writer = _SoupWriter(f, stylesheet, collapse_newlines)
+            if isinstance(soup, str):
+                writer.write(soup)
+            else:
+                _write_soup_element(soup, writer)
+            writer.close()
+    except Exception:  # Clean file if error
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def _write_soup_element(element, writer):
+    if isinstance(element, bs4.element.NavigableString):
+        writer.write(element.output_ready())
+    elif isinstance(element, bs4.BeautifulSoup) or (
+        element.name in STREAMED_SOUP_TAGS and element.contents
+    ):
+        opening, closing = _get_enclosing_markup(element)
+        writer.write(opening)
+        for child in element.children:
+            _write_soup_element(child, writer)
+        writer.write(closing)
+    else:
+        writer.write(element.decode())
+
+
+def _get_enclosing_markup(element):
+    """
+    Returns: The markup str(element) adds before and after the contents of the element.
+        It is obtained by serializing an empty copy of the element with a placeholder
+        as only child.
+    """
+    if isinstance(element, bs4.BeautifulSoup):
+        shell = bs4.BeautifulSoup("", "lxml-xml")
+    else:
+        shell = bs4.element.Tag(
+            name=element.name,
+            namespace=element.namespace,
+            prefix=element.prefix,
+            attrs=element.attrs,
+            is_xml=True,
+        )
+    shell.append(bs4.element.NavigableString(_SOUP_PLACEHOLDER))
+    opening, closing = shell.decode().split(_SOUP_PLACEHOLDER)
+    return opening, closing
+
+
+class _SoupWriter:
+    """
+    Writes pieces of a serialized soup to a file. Double newlines are collapsed across
+    the boundaries of pieces and the stylesheet is inserted after the first line.
+    """
+
+    def __init__(self, f, stylesheet, collapse_newlines):
+        self.f = f
+        self.stylesheet = stylesheet
+        self.collapse_newlines = collapse_newlines
+        self.pending_newlines = 0
+
+    def write(self, text):
+        if not self.collapse_newlines:
+            self._write(text)
+            return
+
+        stripped = text.lstrip("\n")
+        self.pending_newlines += len(text) - len(stripped)
+        if not stripped:
+            return
+        self._write_pending_newlines()
+        body = stripped.rstrip("\n")
+        self.pending_newlines = len(stripped) - len(body)
+        self._write(body.replace("\n\n", "\n"))
+
+    def close(self):
+        self._write_pending_newlines()
+        if self.stylesheet:
+            # The document has a single line
+            self.f.write("\n" + self._get_stylesheet_line())
+
+    def _write_pending_newlines(self):
+        # Like str.replace a sequence of n newlines is replaced by ceil(n / 2) ones.
+        self._write("\n" * ((self.pending_newlines + 1) // 2))
+        self.pending_newlines = 0
+
+    def _write(self, text):
+        if self.stylesheet and "\n" in text:
+            end_of_line = text.index("\n") + 1
+            stylesheet_line = self._get_stylesheet_line()
+            text = f"{text[:end_of_line]}{stylesheet_line}\n{text[end_of_line:]}"
+            self.stylesheet = None
+        self.f.write(text)
+
+    def _get_stylesheet_line(self):
+        return f'<?xml-stylesheet href="{self.stylesheet}"?>'
+
+
 ########################
 # Generic Data Wrangling
 ########################
@@ -90,11 +228,13 @@ def load_law_names(regulations):
 
 
 def load_law_names_compiled(regulations):
-    with open(
-        DE_REG_LAW_NAMES_COMPILED_PATH if regulations else DE_LAW_NAMES_COMPILED_PATH,
-        "rb",
-    ) as f:
-        return pickle.load(f)
+    """
+    Returns: A memory-mapped LawNamesStore. It is read-only, but the dicts of stemmed
+        law names it returns for a date are new objects that can be modified.
+    """
+    return LawNamesStore(
+        DE_REG_LAW_NAMES_COMPILED_PATH if regulations else DE_LAW_NAMES_COMPILED_PATH
+    )
 
 
 def get_stemmed_law_names_for_filename(filename, law_names):
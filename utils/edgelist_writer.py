@@ -0,0 +1,65 @@
+import csv
+import os
+
+from utils.columnar_export import export_columnar
+
+EDGELIST_COLUMNS = ["out_node", "in_node"]
+
+
+class EdgelistWriter:
+    """
+    Writes an edgelist csv file block by block, e.g. the edges of one file after
+    another. The output equals DataFrame.to_csv(path, index=False) of all edges.
+
+    Use as context manager. If an error occurs, the incomplete file is removed.
+
+    Args:
+        path: path of the csv file
+        columnar_format: key of COLUMNAR_FORMATS to additionally export the edgelist
+            to or None
+        write_empty: If False, no file is written for an edgelist without edges.
+    """
+
+    def __init__(self, path, columnar_format=None, write_empty=True):
+        self.path = path
+        self.columnar_format = columnar_format
+        self.write_empty = write_empty
+        self.edges_n = 0
+        # Edges are only kept in memory for the columnar export
+        self.columns = (
+            {column: [] for column in EDGELIST_COLUMNS} if columnar_format else None
+        )
+        self.f = open(path, "w", newline="", encoding="utf8")
+        self.writer = csv.writer(self.f, lineterminator="\n")
+        self.writer.writerow(EDGELIST_COLUMNS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:  # Clean file if error
+            self.f.close()
+            os.remove(self.path)
+
+    def add_edges(self, edges):
+        """
+        Args:
+            edges: list of (out_node, in_node) pairs
+        """
+        self.writer.writerows(edges)
+        self.edges_n += len(edges)
+        if self.columns:
+            for out_node, in_node in edges:
+                self.columns["out_node"].append(out_node)
+                self.columns["in_node"].append(in_node)
+
+    def close(self):
+        self.f.close()
+        if not self.edges_n and not self.write_empty:
+            os.remove(self.path)
+        else:
+            export_columnar(
+                self.columns, self.path, self.columnar_format, EDGELIST_COLUMNS
+            )
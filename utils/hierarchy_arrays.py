@@ -0,0 +1,196 @@
+import networkx as nx
+import numpy as np
+
+from utils.string_table import StringTable, intern_strings
+
+# Node attributes of hierarchy graphs in the order they are added by build_graph.
+# parent_key is not stored but derived from the parent indices.
+HIERARCHY_STRING_ATTRS = [
+    "citekey",
+    "heading",
+    "type",
+    "document_type",
+    "abbr_1",
+    "abbr_2",
+    "legislators",
+    "contributors",
+    "subject_areas",
+    "texts_tokens_n",
+    "texts_chars_n",
+]
+HIERARCHY_INT_ATTRS = [
+    "level",
+    "chars_n",
+    "chars_nowhites",
+    "tokens_n",
+    "tokens_unique",
+]
+HIERARCHY_ATTRS_ORDER = [
+    "key",
+    "citekey",
+    "heading",
+    "parent_key",
+    "level",
+    "type",
+    "document_type",
+    "abbr_1",
+    "abbr_2",
+    "legislators",
+    "contributors",
+    "subject_areas",
+    "chars_n",
+    "chars_nowhites",
+    "tokens_n",
+    "tokens_unique",
+    "texts_tokens_n",
+    "texts_chars_n",
+]
+
+# Code of attributes a node does not have
+MISSING = -1
+
+
+class HierarchyArrays:
+    """
+    Columnar representation of a hierarchy graph.
+
+    The nodes are stored in the order of the graph. The tree structure is given by the
+    index of the parent of each node. String attributes are interned in a single
+    StringTable and stored as arrays of indices, in which missing attributes are
+    encoded as -1. Numeric attributes are stored as integer arrays. The format
+    assumes that, like in graphs generated by build_graph, nodes are identified by
+    their key and have the attributes parent_key and HIERARCHY_INT_ATTRS.
+    """
+
+    def __init__(self, strings, keys, parents, string_columns, int_columns, name):
+        self.strings = strings
+        self.keys = keys
+        self.parents = parents
+        self.string_columns = string_columns
+        self.int_columns = int_columns
+        self.name = name
+        self._decoded_strings = None
+
+    @classmethod
+    def from_graph(cls, G):
+        nodes = list(G.nodes)
+        node_indices = {node: idx for idx, node in enumerate(nodes)}
+        parents = np.full(len(nodes), -1, dtype=np.int32)
+        for u, v in G.edges():
+            parents[node_indices[v]] = node_indices[u]
+
+        # Interning all columns at once shares strings like keys and citekeys
+        node_attrs = [d for n, d in G.nodes(data=True)]
+        strings, codes = intern_strings(
+            [G.graph.get("name", "")]
+            + nodes
+            + [
+                d[attr]
+                for attr in HIERARCHY_STRING_ATTRS
+                for d in node_attrs
+                if attr in d
+            ]
+        )
+        name = int(codes[0]) if "name" in G.graph else MISSING
+        keys = codes[1 : len(nodes) + 1]
+
+        string_columns = {}
+        pos = len(nodes) + 1
+        for attr in HIERARCHY_STRING_ATTRS:
+            present = np.array([attr in d for d in node_attrs], dtype=bool)
+            column = np.full(len(nodes), MISSING, dtype=np.int32)
+            column[present] = codes[pos : pos + present.sum()]
+            pos += present.sum()
+            string_columns[attr] = column
+
+        int_columns = {
+            attr: np.array([d[attr] for d in node_attrs], dtype=np.int64)
+            for attr in HIERARCHY_INT_ATTRS
+        }
+        return cls(strings, keys, parents, string_columns, int_columns, name)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                StringTable(data["strings_data"], data["strings_offsets"]),
+                data["keys"],
+                data["parents"],
+                {attr: data[f"str_{attr}"] for attr in HIERARCHY_STRING_ATTRS},
+                {attr: data[f"int_{attr}"] for attr in HIERARCHY_INT_ATTRS},
+                int(data["name"]),
+            )
+
+    def save(self, path):
+        """
+        Saves the arrays to a compressed .npz file at a given path.
+        """
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                strings_data=self.strings.data,
+                strings_offsets=self.strings.offsets,
+                keys=self.keys,
+                parents=self.parents,
+                name=np.array(self.name, dtype=np.int32),
+                **{f"str_{k}": v for k, v in self.string_columns.items()},
+                **{f"int_{k}": v for k, v in self.int_columns.items()},
+            )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_graph_name(self, default=None):
+        return default if self.name == MISSING else self.strings[self.name]
+
+    def decode(self, codes):
+        """
+        Returns: a list of the strings of the codes. Missing values are None.
+        """
+        if self._decoded_strings is None:
+            self._decoded_strings = list(self.strings)
+        strings = self._decoded_strings
+        return [None if code == MISSING else strings[code] for code in codes.tolist()]
+
+    def get_columns(self):
+        """
+        Returns: a dict of all node attributes as lists
+        """
+        keys = self.decode(self.keys)
+        columns = dict(key=keys)
+        columns["parent_key"] = [
+            keys[parent] if parent != MISSING else ""
+            for parent in self.parents.tolist()
+        ]
+        for attr, codes in self.string_columns.items():
+            columns[attr] = self.decode(codes)
+        for attr, values in self.int_columns.items():
+            columns[attr] = values.tolist()
+        return {attr: columns[attr] for attr in HIERARCHY_ATTRS_ORDER}
+
+    def get_edges(self):
+        """
+        Returns: a list of (parent key, child key) tuples in the order of the edges of
+            the networkx graph, i.e. grouped by parents.
+        """
+        keys = self.decode(self.keys)
+        children = np.argsort(self.parents, kind="stable")
+        children = children[self.parents[children] != MISSING]
+        return [(keys[self.parents[idx]], keys[idx]) for idx in children.tolist()]
+
+    def to_graph(self):
+        """
+        Returns: the hierarchy graph as networkx DiGraph
+        """
+        columns = self.get_columns()
+        G = nx.DiGraph()
+        for idx, key in enumerate(columns["key"]):
+            node_attrs = {}
+            for attr, values in columns.items():
+                if values[idx] is not None:
+                    node_attrs[attr] = values[idx]
+            G.add_node(key, **node_attrs)
+        G.add_edges_from(self.get_edges())
+        if self.name != MISSING:
+            G.graph["name"] = self.get_graph_name()
+        return G
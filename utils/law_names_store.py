@@ -0,0 +1,78 @@
+import os
+from collections.abc import Mapping
+
+import numpy as np
+from quantlaw.utils.files import ensure_exists
+
+from utils.string_table import StringTable, intern_strings
+
+
+class LawNamesStore(Mapping):
+    """
+    Read-only mapping of dates to dicts of stemmed law names and their citekeys.
+
+    The data is stored in a folder of .npy files: an interned string table of all names
+    and citekeys, the sorted dates, and for each date a slice of an array of
+    (name, citekey) string indices. The files are memory-mapped. Hence, workers share
+    the data with each other and the parent process. When pickled, only the path is
+    transferred and the files are mapped again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        self.strings = StringTable.load(self.path, "strings")
+        self.dates = np.load(os.path.join(self.path, "dates.npy"), mmap_mode="r")
+        self.date_offsets = np.load(
+            os.path.join(self.path, "date_offsets.npy"), mmap_mode="r"
+        )
+        self.entries = np.load(os.path.join(self.path, "entries.npy"), mmap_mode="r")
+
+    def __getstate__(self):
+        return dict(path=self.path)
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._open()
+
+    def __getitem__(self, date):
+        idx = np.searchsorted(self.dates, date.encode("ascii"))
+        if idx == len(self.dates) or self.dates[idx].decode("ascii") != date:
+            raise KeyError(date)
+        entries = self.entries[self.date_offsets[idx] : self.date_offsets[idx + 1]]
+        return {
+            self.strings[name_idx]: self.strings[citekey_idx]
+            for name_idx, citekey_idx in entries.tolist()
+        }
+
+    def __iter__(self):
+        for date in self.dates:
+            yield date.decode("ascii")
+
+    def __len__(self):
+        return len(self.dates)
+
+    @staticmethod
+    def write(path, dated_law_names):
+        """
+        Saves a dict of dates to dicts of stemmed law names and citekeys at path.
+        """
+        ensure_exists(path)
+        dates = sorted(dated_law_names)
+
+        date_offsets = np.zeros(len(dates) + 1, dtype=np.int64)
+        np.cumsum([len(dated_law_names[d]) for d in dates], out=date_offsets[1:])
+
+        strings, codes = intern_strings(
+            s
+            for date in dates
+            for name_and_citekey in dated_law_names[date].items()
+            for s in name_and_citekey
+        )
+
+        strings.save(path, "strings")
+        np.save(os.path.join(path, "dates.npy"), np.array(dates, dtype="S"))
+        np.save(os.path.join(path, "date_offsets.npy"), date_offsets)
+        np.save(os.path.join(path, "entries.npy"), codes.reshape(-1, 2))
@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+
+try:
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:  # Python 3.7
+    from importlib_metadata import PackageNotFoundError, version
+
+from quantlaw.utils.files import ensure_exists
+
+
+class ParseCache:
+    """
+    Memoizes the results of parsing citation strings.
+
+    Results are kept in a bounded LRU within the process. If a path is given, they are
+    additionally persisted in a SQLite database that is shared by all processes and
+    subsequent runs.
+
+    Keys are tuples that must contain all context the parse result depends on (e.g.
+    the title and whether the reference is in the US Code). The namespace should
+    contain the version of the parser so that results of different versions are not
+    mixed. Values must be JSON serializable and are not copied. Hence, they must not
+    be modified by the caller.
+    """
+
+    def __init__(self, namespace, maxsize=100000, path=None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._pending = {}
+        self._connection = None
+
+    def get(self, key):
+        """
+        Returns: The cached value or None if the key is not cached.
+        """
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return self._lru[key]
+
+        value = self._get_stored(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._add_to_lru(key, value)
+        return value
+
+    def set(self, key, value):
+        self._add_to_lru(key, value)
+        if self.path:
+            self._pending[key] = value
+
+    def get_or_compute(self, key, func, *args):
+        """
+        Returns the cached value of a key. If it is not cached, it is computed by
+        calling func with args and cached afterwards.
+        Exceptions raised by func are not cached.
+        """
+        value = self.get(key)
+        if value is None:
+            value = func(*args)
+            self.set(key, value)
+        return value
+
+    def flush(self):
+        """
+        Writes pending values to the database.
+        """
+        if not self._pending:
+            return
+        connection = self._get_connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO parse_cache VALUES (?, ?, ?)",
+                [
+                    (self.namespace, self._serialize_key(k), json.dumps(v))
+                    for k, v in self._pending.items()
+                ],
+            )
+        self._pending = {}
+
+    def _add_to_lru(self, key, value):
+        self._lru[key] = value
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def _get_stored(self, key):
+        if not self.path:
+            return None
+        if key in self._pending:
+            return self._pending[key]
+        row = (
+            self._get_connection()
+            .execute(
+                "SELECT value FROM parse_cache WHERE namespace = ? AND key = ?",
+                (self.namespace, self._serialize_key(key)),
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def _get_connection(self):
+        # Connections are opened lazily as they cannot be shared between processes
+        if self._connection is None:
+            ensure_exists(os.path.dirname(self.path) or ".")
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "namespace TEXT, key TEXT, value TEXT, PRIMARY KEY (namespace, key))"
+            )
+        return self._connection
+
+    @staticmethod
+    def _serialize_key(key):
+        return json.dumps(key, ensure_ascii=False)
+
+
+_parse_caches = {}
+
+
+def get_parse_cache(namespace, path=None):
+    """
+    Returns: The ParseCache of the current process for the namespace and path.
+        Pipeline steps are pickled for each worker task. Hence, the caches are kept on
+        the module level to be reused across the items processed by a worker.
+    """
+    cache_id = (namespace, path)
+    if cache_id not in _parse_caches:
+        _parse_caches[cache_id] = ParseCache(namespace, path=path)
+    return _parse_caches[cache_id]
+
+
+def get_package_version(package):
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
@@ -1,7 +1,9 @@
 import re
 
 from bs4 import BeautifulSoup, NavigableString
-from quantlaw.utils.beautiful_soup import create_soup, save_soup
+from quantlaw.utils.beautiful_soup import create_soup
+
+from utils.common import save_soup
 
 
 def simplify_gii_xml(source, destination):
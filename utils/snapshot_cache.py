@@ -0,0 +1,41 @@
+import threading
+from collections import OrderedDict
+
+
+class SnapshotCache:
+    """
+    Keeps the data of the most recently used snapshots, e.g. to reuse the data of
+    the later snapshot of a pair for the next pair of consecutive snapshots.
+
+    The cache can be shared by threads. Each snapshot is loaded only once at a time,
+    even if several threads request it concurrently.
+
+    Args:
+        load: function that loads the data of a snapshot
+        size: maximum number of snapshots kept
+    """
+
+    def __init__(self, load, size):
+        self.load = load
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.snapshot_locks = {}
+
+    def get(self, snapshot):
+        with self.lock:
+            snapshot_lock = self.snapshot_locks.setdefault(snapshot, threading.Lock())
+
+        with snapshot_lock:
+            with self.lock:
+                if snapshot in self.entries:
+                    self.entries.move_to_end(snapshot)
+                    return self.entries[snapshot]
+
+            data = self.load(snapshot)
+
+            with self.lock:
+                self.entries[snapshot] = data
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+            return data
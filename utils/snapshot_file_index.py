@@ -0,0 +1,54 @@
+import os
+import time
+
+from quantlaw.utils.files import list_dir
+
+# Indexes by folder and extensions with the modification time of the folder and the
+# time the index was built
+_snapshot_file_indexes = {}
+
+# Files added within the timestamp granularity of the file system might not change
+# the modification time of the folder. Hence, an index is only reused if the folder
+# was last modified well before the index was built. 2 seconds cover the coarsest
+# common granularity (FAT).
+RACY_INTERVAL_NS = 2 * 10**9
+
+
+def get_snapshot_of_filename(filename):
+    """
+    Returns: the snapshot of a file named like {title}_{snapshot}.{extension}, e.g.
+        2001 for usc01_2001.xml
+    """
+    return filename.split(".")[0].split("_")[-1]
+
+
+def get_snapshot_file_index(folder, extensions):
+    """
+    Returns: a dict mapping the snapshots of the files in a folder to the sorted
+        names of their files. The index is built once per process and folder and
+        rebuilt if files were added to or removed from the folder since. Folders
+        modified shortly before the index was built are listed again each time.
+
+    Args:
+        folder: path of the folder
+        extensions: extension or tuple of extensions of the files to index
+    """
+    mtime = os.stat(folder).st_mtime_ns
+    cached = _snapshot_file_indexes.get((folder, extensions))
+    if cached and cached[0] == mtime and cached[1] - mtime > RACY_INTERVAL_NS:
+        return cached[2]
+
+    built = time.time_ns()
+    index = {}
+    for filename in list_dir(folder, extensions):
+        index.setdefault(get_snapshot_of_filename(filename), []).append(filename)
+    _snapshot_file_indexes[(folder, extensions)] = mtime, built, index
+    return index
+
+
+def list_snapshot_files(folder, extensions, snapshot):
+    """
+    Returns: the sorted paths of the files of a snapshot in a folder
+    """
+    index = get_snapshot_file_index(folder, extensions)
+    return [os.path.join(folder, f) for f in index.get(str(snapshot), [])]
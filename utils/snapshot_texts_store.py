@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+import numpy as np
+from quantlaw.utils.files import ensure_exists
+
+from utils.string_table import StringTable, intern_strings
+
+# Code of texts without citekey
+MISSING = -1
+
+
+def get_text_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class SnapshotTextsStore:
+    """
+    Read-only columnar store of the leaf texts of a snapshot with their keys and
+    citekeys as used to map snapshots.
+
+    The data is stored in a folder of .npy files: string tables of the keys and the
+    texts, an interned string table of the citekeys with the citekey index of each
+    text (-1 if the text has no citekey), the length of each text and a 16 byte
+    BLAKE2b hash of each text. The files are memory-mapped. Hence, only the texts
+    accessed are read and decoded. Texts can be compared for equality by their
+    hashes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = StringTable.load(path, "keys")
+        self.texts = StringTable.load(path, "texts")
+        self.citekeys = StringTable.load(path, "citekeys")
+        self.citekey_codes = np.load(
+            os.path.join(path, "citekey_codes.npy"), mmap_mode="r"
+        )
+        self.text_lengths = np.load(
+            os.path.join(path, "text_lengths.npy"), mmap_mode="r"
+        )
+        self.text_hashes = np.load(os.path.join(path, "text_hashes.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_citekeys(self):
+        """
+        Returns: a list of the citekey of each text or None
+        """
+        citekeys = list(self.citekeys)
+        return [
+            citekeys[code] if code != MISSING else None
+            for code in self.citekey_codes.tolist()
+        ]
+
+    @staticmethod
+    def exists(path):
+        # The hashes are written last
+        return os.path.exists(os.path.join(path, "text_hashes.npy"))
+
+    @staticmethod
+    def write(path, keys, citekeys, texts):
+        """
+        Saves the keys, citekeys and texts of a snapshot at path.
+
+        Args:
+            keys: list of keys
+            citekeys: list of citekeys or None
+            texts: list of texts
+        """
+        ensure_exists(path)
+        StringTable.from_strings(keys).save(path, "keys")
+        StringTable.from_strings(texts).save(path, "texts")
+
+        citekey_strings, citekey_codes = intern_strings(c for c in citekeys if c)
+        codes = np.full(len(citekeys), MISSING, dtype=np.int32)
+        codes[np.array([bool(c) for c in citekeys], dtype=bool)] = citekey_codes
+        citekey_strings.save(path, "citekeys")
+        np.save(os.path.join(path, "citekey_codes.npy"), codes)
+
+        np.save(
+            os.path.join(path, "text_lengths.npy"),
+            np.array([len(t) for t in texts], dtype=np.int64),
+        )
+        np.save(
+            os.path.join(path, "text_hashes.npy"),
+            np.array([get_text_hash(t) for t in texts], dtype="S16"),
+        )
@@ -1,4 +1,5 @@
-from collections import defaultdict
+from array import array
+from bisect import bisect_left
 
 
 class StringContainsAlign:
@@ -7,7 +8,11 @@ class StringContainsAlign:
     that the string (needle) of the first list  is contained in the string
     (haystack) in the second list.
     This class optimizes performance by splitting the strings to compare into
-    tokens to preselect possible candidates that might contain the needle
+    tokens to preselect possible candidates that might contain the needle.
+
+    Tokens are interned to integers. The index stores a sorted array of the indices
+    of the strings containing a token. Candidates are preselected starting with the
+    rarest token of the needle, so that the candidate list is short from the start.
     """
 
     def __init__(
@@ -23,25 +28,36 @@ class StringContainsAlign:
         self.min_text_length = min_text_length
         self.text_list_0 = text_list_0
         self.text_list_1 = text_list_1
+        self.token_ids = None
         self.index_0 = None
         self.index_1 = None
 
     def create_index(self):
         assert self.text_list_0
         assert self.text_list_1
+        self.token_ids = {}
         self.index_0 = self._text_list_to_token_index(self.text_list_0)
         self.index_1 = self._text_list_to_token_index(self.text_list_1)
 
     def clean_index(self):
+        self.token_ids = None
         self.index_0 = None
         self.index_1 = None
 
     def _text_list_to_token_index(self, text_list):
-        token_index = defaultdict(set)
+        """
+        Returns: a dict mapping token ids to sorted arrays of the indices of the texts
+            containing the token
+        """
+        token_index = {}
         for i, text in enumerate(text_list):
-            text_tokens = text.split(self.sep)
-            for token in text_tokens:
-                token_index[token].add(i)
+            for token in set(text.split(self.sep)):
+                token_id = self.token_ids.setdefault(token, len(self.token_ids))
+                postings = token_index.get(token_id)
+                if postings is None:
+                    token_index[token_id] = array("l", [i])
+                else:
+                    postings.append(i)
         return token_index
 
     def run(self, reversed=False):
@@ -64,13 +80,26 @@ class StringContainsAlign:
                 needle_tokens = needle_tokens[1:-1]
 
             if needle_tokens:
-                candidates = index_haystack[needle_tokens[0]]
-                for token in needle_tokens[1:]:
-                    candidates = candidates.intersection(index_haystack[token])
-
+                postings_list = [
+                    index_haystack.get(self.token_ids.get(token))
+                    for token in set(needle_tokens)
+                ]
+                if None in postings_list:  # A token is in no haystack
+                    continue
+                postings_list.sort(key=len)
+
+                candidates = postings_list[0]
+                for postings in postings_list[1:]:
                     # For performence
                     if len(candidates) <= 1:
                         break
+
+                    postings_len = len(postings)
+                    candidates = [
+                        c
+                        for c in candidates
+                        if contains_sorted(postings, c, postings_len)
+                    ]
             else:
                 candidates = range(len(text_list_haystack))
 
@@ -80,3 +109,11 @@ class StringContainsAlign:
                     result.append((needle_index, haystack_index))
 
         return result
+
+
+def contains_sorted(values, value, values_len):
+    """
+    Returns: True if the sorted sequence values of length values_len contains value
+    """
+    idx = bisect_left(values, value)
+    return idx < values_len and values[idx] == value
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+
+class StringTable:
+    """
+    Read-only sequence of strings stored as one UTF-8 buffer and an array of offsets.
+    Tables can be saved as .npy files and loaded memory-mapped. In that case, the
+    strings are shared by all processes reading the table and only the strings
+    accessed are decoded.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    @classmethod
+    def load(cls, folder, name, mmap=True):
+        mmap_mode = "r" if mmap else None
+        return cls(
+            np.load(os.path.join(folder, f"{name}.data.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(folder, f"{name}.offsets.npy"), mmap_mode=mmap_mode),
+        )
+
+    def save(self, folder, name):
+        np.save(os.path.join(folder, f"{name}.data.npy"), self.data)
+        np.save(os.path.join(folder, f"{name}.offsets.npy"), self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return self.get_bytes(idx).decode("utf-8")
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def get_bytes(self, idx):
+        return self.data[self.offsets[idx] : self.offsets[idx + 1]].tobytes()
+
+
+def intern_strings(strings):
+    """
+    Interns a sequence of strings.
+
+    Returns: A StringTable of the unique strings in order of their first appearance and
+        an array with the index of each string in the table.
+    """
+    string_codes = {}
+    codes = np.fromiter(
+        (string_codes.setdefault(s, len(string_codes)) for s in strings),
+        dtype=np.int32,
+    )
+    return StringTable.from_strings(string_codes.keys()), codes
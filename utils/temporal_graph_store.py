@@ -0,0 +1,177 @@
+import gzip
+import json
+import os
+import pickle
+from collections import Counter
+
+import networkx as nx
+from quantlaw.utils.files import ensure_exists
+
+INDEX_FILENAME = "index.json"
+
+
+def get_delta_filename(snapshot):
+    return f"{snapshot}.delta.pickle.gz"
+
+
+class TemporalGraphStore:
+    """
+    Crossreference graphs of consecutive snapshots stored as changes to the previous
+    snapshot. The changes of the first snapshot are relative to an empty graph and
+    contain the base snapshot in full.
+
+    Nodes are identified across snapshots by persistent integer ids. Their keys of
+    each snapshot are stored in the node attribute "key". Edges are identified by
+    (id of u, id of v, edge_type) and counted, as crossreference graphs may contain
+    multiple edges between two nodes.
+
+    Changes are dicts with the following entries:
+        nodes_added: dict of ids and attributes of new nodes
+        nodes_removed: list of ids of removed nodes
+        nodes_changed: dict of ids and a tuple of the changed or added attributes
+            and the names of the removed attributes
+        edges_changed: dict of (u, v, edge_type) and the change of their count
+        graph: attributes of the graph
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILENAME)) as f:
+            self.snapshots = json.load(f)["snapshots"]
+
+    def get_changes(self, snapshot):
+        with gzip.open(os.path.join(self.path, get_delta_filename(snapshot))) as f:
+            return pickle.load(f)
+
+    def iter_changes(self, start=None, end=None):
+        """
+        Yields tuples of snapshots and their changes in chronological order.
+
+        Args:
+            start: first snapshot to include. Default: the base snapshot.
+            end: last snapshot to include. Default: the last snapshot.
+        """
+        snapshots = self.snapshots
+        if start is not None:
+            snapshots = snapshots[snapshots.index(start) :]
+        if end is not None:
+            snapshots = snapshots[: snapshots.index(end) + 1]
+        for snapshot in snapshots:
+            yield snapshot, self.get_changes(snapshot)
+
+    def get_state(self, snapshot):
+        """
+        Returns: a tuple of the nodes (dict of ids and attributes), the edges
+            (Counter of (u, v, edge_type)) and the graph attributes of a snapshot.
+        """
+        nodes = {}
+        edges = Counter()
+        graph_attrs = {}
+        for _, changes in self.iter_changes(end=snapshot):
+            apply_changes(nodes, edges, changes)
+            graph_attrs = changes["graph"]
+        return nodes, edges, graph_attrs
+
+    def materialize(self, snapshot, node_ids=False):
+        """
+        Returns: the crossreference graph of a snapshot as MultiDiGraph. It equals the
+            original graph except for the order of nodes and edges.
+
+        Args:
+            node_ids: If True, the nodes are labeled with their persistent ids
+                instead of their keys.
+        """
+        nodes, edges, graph_attrs = self.get_state(snapshot)
+        labels = {
+            node_id: node_id if node_ids else attrs.get("key", node_id)
+            for node_id, attrs in nodes.items()
+        }
+        G = nx.MultiDiGraph(**graph_attrs)
+        G.add_nodes_from((labels[node_id], attrs) for node_id, attrs in nodes.items())
+        G.add_edges_from(
+            (labels[u], labels[v], dict(edge_type=edge_type))
+            for (u, v, edge_type), count in edges.items()
+            for _ in range(count)
+        )
+        return G
+
+
+class TemporalGraphStoreWriter:
+    """
+    Writes a TemporalGraphStore. Snapshots must be added in chronological order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.snapshots = []
+        self.nodes = {}
+        self.edges = Counter()
+        ensure_exists(path)
+
+    def add_snapshot(self, snapshot, nodes, edges, graph_attrs):
+        """
+        Args:
+            nodes: dict of persistent node ids and node attributes
+            edges: Counter of (u, v, edge_type) with persistent node ids
+            graph_attrs: dict of graph attributes
+        """
+        changes = get_changes(self.nodes, self.edges, nodes, edges)
+        changes["graph"] = dict(graph_attrs)
+        with gzip.open(
+            os.path.join(self.path, get_delta_filename(snapshot)), "wb"
+        ) as f:
+            pickle.dump(changes, f)
+        self.snapshots.append(snapshot)
+        self.nodes = nodes
+        self.edges = edges
+
+    def close(self):
+        # The index is written last. Hence, incomplete stores have no index.
+        with open(os.path.join(self.path, INDEX_FILENAME), "w") as f:
+            json.dump(dict(snapshots=self.snapshots), f)
+
+
+def get_changes(old_nodes, old_edges, new_nodes, new_edges):
+    nodes_changed = {}
+    for node_id in new_nodes.keys() & old_nodes.keys():
+        old_attrs = old_nodes[node_id]
+        new_attrs = new_nodes[node_id]
+        if old_attrs != new_attrs:
+            nodes_changed[node_id] = (
+                {
+                    k: v
+                    for k, v in new_attrs.items()
+                    if k not in old_attrs or old_attrs[k] != v
+                },
+                [k for k in old_attrs if k not in new_attrs],
+            )
+
+    edges_changed = Counter(new_edges)
+    edges_changed.subtract(old_edges)
+
+    return dict(
+        nodes_added={
+            node_id: attrs
+            for node_id, attrs in new_nodes.items()
+            if node_id not in old_nodes
+        },
+        nodes_removed=[node_id for node_id in old_nodes if node_id not in new_nodes],
+        nodes_changed=nodes_changed,
+        edges_changed={edge: count for edge, count in edges_changed.items() if count},
+    )
+
+
+def apply_changes(nodes, edges, changes):
+    for node_id in changes["nodes_removed"]:
+        del nodes[node_id]
+    for node_id, attrs in changes["nodes_added"].items():
+        nodes[node_id] = dict(attrs)
+    for node_id, (changed_attrs, removed_attrs) in changes["nodes_changed"].items():
+        attrs = nodes[node_id]
+        attrs.update(changed_attrs)
+        for attr in removed_attrs:
+            del attrs[attr]
+    for edge, count in changes["edges_changed"].items():
+        edges[edge] += count
+        if edges[edge] <= 0:
+            del edges[edge]
@@ -0,0 +1,88 @@
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+# Smallest prime above 2**32. The hash functions only permute values below it.
+PRIME = 4294967311
+
+
+def get_shingle_hashes(text, shingle_size=5):
+    """
+    Returns: an array of the distinct 32 bit hashes of the character shingles of a
+        text. Texts shorter than shingle_size are a single shingle.
+    """
+    shingles = {
+        text[i : i + shingle_size] for i in range(max(len(text) - shingle_size + 1, 1))
+    }
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def get_permutations(num_perm, seed=1):
+    """
+    Returns: the parameters a and b of the hash functions (a * x + b) % prime used
+        as permutations
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def get_minhash_signatures(texts, num_perm=64, shingle_size=5, seed=1):
+    """
+    Returns: an array with a MinHash signature of num_perm values per text. The
+        share of equal values of two signatures estimates the Jaccard similarity of
+        the character shingles of the texts.
+    """
+    a, b = get_permutations(num_perm, seed)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = get_shingle_hashes(text, shingle_size)
+        # a, b and the hashes are below 2**32. Hence, the products do not overflow.
+        signatures[i] = ((np.outer(hashes, a) + b) % PRIME).min(axis=0)
+    return signatures
+
+
+def get_lsh_candidates(signatures1, signatures2, bands=16, max_bucket_size=50):
+    """
+    Proposes pairs of similar texts of two lists by locality-sensitive hashing. The
+    signatures are split into bands. Texts of both lists with an identical band are
+    candidates. With 16 bands of 4 values, pairs with a Jaccard similarity of 0.5
+    are proposed with a probability of about 0.65 and pairs with 0.8 with a
+    probability of almost 1.
+
+    Args:
+        signatures1: MinHash signatures of the first list
+        signatures2: MinHash signatures of the second list
+        bands: number of bands. Must divide the length of the signatures.
+        max_bucket_size: Buckets with more texts of a list are skipped, as they
+            contain frequent boilerplate texts rather than distinctive matches.
+
+    Returns: a sorted list of pairs of indices of the first and the second list
+    """
+    num_perm = signatures1.shape[1]
+    assert num_perm == signatures2.shape[1]
+    assert num_perm % bands == 0
+    rows = num_perm // bands
+
+    candidates = set()
+    for band in range(bands):
+        columns = slice(band * rows, (band + 1) * rows)
+        buckets = defaultdict(lambda: ([], []))
+        for side, signatures in enumerate([signatures1, signatures2]):
+            for idx, band_values in enumerate(signatures[:, columns]):
+                buckets[band_values.tobytes()][side].append(idx)
+        for indices1, indices2 in buckets.values():
+            if (
+                indices1
+                and indices2
+                and len(indices1) <= max_bucket_size
+                and len(indices2) <= max_bucket_size
+            ):
+                candidates.update((i, j) for i in indices1 for j in indices2)
+    return sorted(candidates)
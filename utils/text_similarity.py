@@ -0,0 +1,86 @@
+def jaro_winkler(s1, s2, threshold=None, prefix_weight=0.1):
+    """
+    Computes the Jaro-Winkler similarity of two strings. The result equals
+    textdistance.jaro_winkler(s1, s2).
+
+    textdistance searches matching characters for each character of s1 in a window of
+    s2, which takes quadratic time for long texts. Instead, the positions of each
+    character in s2 are consumed in order: A position before the window of a
+    character of s1 is also before the windows of all subsequent characters. Hence,
+    the first unmatched position in the window is found in amortized constant time.
+
+    Args:
+        threshold: If set, 0.0 may be returned for strings whose similarity cannot
+            exceed the threshold due to their lengths. Scores above the threshold
+            are exact.
+    """
+    if s1 == s2:
+        return 1
+    if not s1 or not s2:
+        return 0
+
+    s1_len = len(s1)
+    s2_len = len(s2)
+    min_len = min(s1_len, s2_len)
+
+    if threshold is not None:
+        # Upper bound if all characters of the shorter string match in order
+        bound = (min_len / s1_len + min_len / s2_len + 1) / 3
+        if bound > 0.7:
+            bound += min(min_len, 4) * prefix_weight * (1.0 - bound)
+        if bound <= threshold:
+            return 0.0
+
+    search_range = max(max(s1_len, s2_len) // 2 - 1, 0)
+
+    s2_positions = {}
+    for j, s2_ch in enumerate(s2):
+        s2_positions.setdefault(s2_ch, []).append(j)
+    next_indices = dict.fromkeys(s2_positions, 0)
+
+    # Matched characters in the order of s1 and the matched positions in s2
+    s1_matches = []
+    s2_flags = [False] * s2_len
+    for i, s1_ch in enumerate(s1):
+        positions = s2_positions.get(s1_ch)
+        if positions is None:
+            continue
+        idx = next_indices[s1_ch]
+        low = i - search_range
+        while idx < len(positions) and positions[idx] < low:
+            idx += 1
+        if idx < len(positions) and positions[idx] <= i + search_range:
+            s2_flags[positions[idx]] = True
+            s1_matches.append(s1_ch)
+            idx += 1
+        next_indices[s1_ch] = idx
+
+    common_chars = len(s1_matches)
+    if not common_chars:
+        return 0.0
+
+    s2_matches = [s2_ch for s2_ch, flag in zip(s2, s2_flags) if flag]
+    trans_count = sum(a != b for a, b in zip(s1_matches, s2_matches)) // 2
+
+    # Same order of operations as textdistance to get identical floats
+    weight = common_chars / s1_len + common_chars / s2_len
+    weight += (common_chars - trans_count) / common_chars
+    weight /= 3
+
+    if weight <= 0.7:
+        return weight
+
+    j = min(min_len, 4)
+    i = 0
+    while i < j and s1[i] == s2[i]:
+        i += 1
+    if i:
+        weight += i * prefix_weight * (1.0 - weight)
+    return weight
+
+
+def jaro_winkler_batch(pairs, threshold=None):
+    """
+    Returns: a list of the Jaro-Winkler similarities of pairs of strings
+    """
+    return [jaro_winkler(s1, s2, threshold) for s1, s2 in pairs]